@@ -4,147 +4,100 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 
-# Configuration Selenium optimisée pour stockdex AVANT l'import
-from selenium_config import setup_stockdx_selenium
-# Appliquer la configuration optimisée pour stockdex
-setup_stockdx_selenium()
-
-from stockdex import Ticker as StockdexTicker
-import requests
+import os
+import numbers
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from database import db_manager, cache_manager, cache_api_response, get_cache_key
+from typing import Optional
+from database import db_manager, cache_manager, cache_api_response, get_cache_key, background_refresher, CACHE_TTL, CACHE_STALE_TTL
+from data_providers import (
+    INDEX_CONFIG, get_index_provider, get_quote_provider, get_russell_2000_symbols, get_statements_provider,
+    parse_index_symbols
+)
+from dcf_kernel import dcf_kernel
+from async_io import run_blocking
+import metrics
 
 # --- Configurations ---
-INDEX_CONFIG = {
-    'CAC 40 (France)': { 'url': 'https://en.wikipedia.org/wiki/CAC_40', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '.PA' },
-    'S&P 500 (USA)': { 'url': 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'table_index': 0, 'ticker_col': 'Symbol', 'suffix': '' },
-    'NASDAQ 100 (USA)': { 'url': 'https://en.wikipedia.org/wiki/Nasdaq-100', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '' },
-    'DAX (Germany)': { 'url': 'https://en.wikipedia.org/wiki/DAX', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '.DE' },
-    'Dow Jones (USA)': { 'url': 'https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average', 'table_index': 1, 'ticker_col': 'Ticker', 'suffix': '' },
-    'Russell 2000 (USA)': { 'url': 'https://en.wikipedia.org/wiki/Russell_2000_Index', 'table_index': 0, 'ticker_col': 'Symbol', 'suffix': '' }
-}
+# Nombre maximum de requêtes Yahoo Finance simultanées pendant un screening
+SCREENING_MAX_WORKERS = int(os.getenv("SCREENING_MAX_WORKERS", "16"))
 
-def get_russell_2000_symbols() -> list:
-    """Récupère les holdings du Russell 2000 via l'ETF IWM (iShares Russell 2000 ETF)"""
-    try:
-        # Essayer d'abord avec yahooquery
-        try:
-            from yahooquery import Ticker
-            iwm = Ticker("IWM")
-            holdings_info = iwm.fund_holding_info
-            
-            if holdings_info and 'IWM' in holdings_info:
-                holdings_data = holdings_info['IWM']
-                if 'holdings' in holdings_data:
-                    symbols = []
-                    for holding in holdings_data['holdings']:
-                        if 'symbol' in holding:
-                            symbol = str(holding['symbol']).strip()
-                            if symbol and len(symbol) <= 5 and symbol.replace('.', '').isalnum():
-                                symbols.append(symbol)
-                    
-                    if symbols:
-                        print(f"Récupéré {len(symbols)} symboles du Russell 2000 via IWM (yahooquery)")
-                        return symbols[:100]  # Limiter à 100 pour les tests
-        except ImportError:
-            print("yahooquery non disponible, tentative avec yfinance...")
-        except Exception as e:
-            print(f"Erreur avec yahooquery: {e}")
-        
-        # Fallback avec yfinance pour obtenir des informations de base
-        import yfinance as yf
-        iwm = yf.Ticker("IWM")
-        
-        # Essayer d'obtenir des informations sur l'ETF
-        info = iwm.info
-        if info:
-            print("Informations IWM récupérées, mais pas de holdings détaillés disponibles")
-            
-    except Exception as e:
-        print(f"Erreur lors de la récupération des holdings IWM: {e}")
-    
-    # Fallback avec des symboles Russell 2000 connus
-    print("Utilisation du fallback avec des symboles Russell 2000 connus")
-    return [
-        "ACIW", "ADTN", "AMED", "AMKR", "ANET", "ARWR", "AVAV", "BCRX", "BMRN", "CARG",
-        "CBSH", "CCOI", "CGNX", "CHDN", "CIEN", "CLNE", "COKE", "CREE", "CROX", "CSGS",
-        "CTXS", "CVBF", "CWST", "DCOM", "DIOD", "DSGX", "EEFT", "EGOV", "ENSG", "EPAM",
-        "EXPO", "FFIV", "FIVN", "FORM", "FRME", "GMED", "GTLS", "HALO", "HCSG", "HELE",
-        "HOMB", "HUBG", "ICUI", "IIVI", "INDB", "INOV", "IPAR", "ISRG", "ITRI", "JKHY"
-    ]
+# Durée de vie (secondes) de l'instantané des données brutes d'un indice
+SCREENING_SNAPSHOT_TTL = int(os.getenv("SCREENING_SNAPSHOT_TTL", "900"))
+
+# Screening en flux : taille du premier lot (doublée ensuite jusqu'à la taille de lot du fournisseur),
+# lots récupérés en parallèle et intervalle maximum sans message (keepalive, secondes)
+SCREENING_STREAM_FIRST_CHUNK = int(os.getenv("SCREENING_STREAM_FIRST_CHUNK", "10"))
+SCREENING_STREAM_WORKERS = int(os.getenv("SCREENING_STREAM_WORKERS", "4"))
+SCREENING_STREAM_KEEPALIVE = float(os.getenv("SCREENING_STREAM_KEEPALIVE", "10"))
 
-def get_index_symbols(index_name: str) -> list:
-    """Récupère les symboles pour un indice donné de manière robuste avec un logging d'erreur."""
+# Fournisseurs de données (voir data_providers) : cotations par lots (yahooquery si disponible,
+# sinon yfinance), composition des indices (Wikipedia) et états financiers (stockdex)
+quote_provider = get_quote_provider(max_workers=SCREENING_MAX_WORKERS)
+index_provider = get_index_provider()
+statements_provider = get_statements_provider()
+
+def get_index_symbols(index_name: str, report: Optional[dict] = None) -> list:
+    """
+    Récupère les symboles pour un indice donné de manière robuste avec un logging d'erreur.
+    `report` reçoit la source des symboles : 'cache' ou celle du fournisseur ('wikipedia', 'russell',
+    'fixtures'), 'none' si aucune.
+    """
+    report = report if report is not None else {}
+    report['source'] = 'none'
     if index_name not in INDEX_CONFIG:
         print(f"Erreur: L'indice '{index_name}' n'est pas dans INDEX_CONFIG.")
         return []
     
-    # Cas spécial pour Russell 2000
-    if index_name == 'Russell 2000 (USA)':
-        # Vérifier le cache en base de données d'abord
-        cached_symbols = db_manager.get_cached_index_symbols(index_name, max_age_hours=24)
-        if cached_symbols:
-            print(f"Symboles récupérés du cache pour {index_name}")
-            return cached_symbols
-        
-        symbols = get_russell_2000_symbols()
-        if symbols:
-            # Sauvegarder en cache
-            db_manager.cache_index_symbols(index_name, symbols)
-        return symbols
-    
     # Vérifier le cache en base de données d'abord
     cached_symbols = db_manager.get_cached_index_symbols(index_name, max_age_hours=24)
     if cached_symbols:
         print(f"Symboles récupérés du cache pour {index_name}")
+        report['source'] = 'cache'
         return cached_symbols
     
-    config = INDEX_CONFIG[index_name]
-    
     try:
-        # Tente de lire les tables de la page Wikipedia
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(config['url'], headers=headers)
-        response.raise_for_status()
-        all_tables = pd.read_html(response.text)
-        
-        # Vérifie si l'index de la table est valide
-        if config['table_index'] >= len(all_tables):
-            print(f"Erreur: L'index de table {config['table_index']} est invalide pour {index_name}. Tables trouvées: {len(all_tables)}")
-            return []
-            
-        df = all_tables[config['table_index']]
-
-        # Vérifie si la colonne du ticker existe
-        if config['ticker_col'] not in df.columns:
-            print(f"Erreur: La colonne '{config['ticker_col']}' n'a pas été trouvée pour {index_name}. Colonnes disponibles: {list(df.columns)}")
-            return []
-
-        raw_tickers = df[config['ticker_col']].tolist()
-        final_symbols = []
-        for ticker in raw_tickers:
-            t = str(ticker).split(' ')[0]
-            if config['suffix'] == '':
-                t = t.replace('.', '-', 1)
-            
-            if config['suffix'] and not t.endswith(config['suffix']):
-                final_symbols.append(t + config['suffix'])
-            else:
-                final_symbols.append(t)
-        
-        # Sauvegarder en cache
-        db_manager.cache_index_symbols(index_name, final_symbols)
-        print(f"Symboles mis en cache pour {index_name}: {len(final_symbols)} symboles")
-        
+        final_symbols = index_provider.get_index_constituents(index_name, report)
+        if final_symbols:
+            # Sauvegarder en cache
+            db_manager.cache_index_symbols(index_name, final_symbols)
+            print(f"Symboles mis en cache pour {index_name}: {len(final_symbols)} symboles")
         return final_symbols
         
     except Exception as e:
         # Affiche l'erreur réelle dans le terminal du backend pour un débogage facile
         print(f"ERREUR CRITIQUE lors du scraping pour {index_name}: {e}")
         return []
+
+
+async def get_index_symbols_async(index_name: str, report: Optional[dict] = None) -> list:
+    """
+    Variante asynchrone de get_index_symbols : le fournisseur télécharge la composition sans bloquer
+    la boucle (client HTTP partagé pour Wikipedia), SQLite passe par l'exécuteur d'E/S.
+    """
+    report = report if report is not None else {}
+    report['source'] = 'none'
+    if index_name not in INDEX_CONFIG:
+        print(f"Erreur: L'indice '{index_name}' n'est pas dans INDEX_CONFIG.")
+        return []
+    
+    cached_symbols = await run_blocking(db_manager.get_cached_index_symbols, index_name, max_age_hours=24)
+    if cached_symbols:
+        print(f"Symboles récupérés du cache pour {index_name}")
+        report['source'] = 'cache'
+        return cached_symbols
+    
+    try:
+        final_symbols = await index_provider.get_index_constituents_async(index_name, report)
+        if final_symbols:
+            await run_blocking(db_manager.cache_index_symbols, index_name, final_symbols)
+            print(f"Symboles mis en cache pour {index_name}: {len(final_symbols)} symboles")
+        return final_symbols
+    except Exception as e:
+        print(f"ERREUR CRITIQUE lors du scraping pour {index_name}: {e}")
+        return []
+
 # --- NOUVELLES FONCTIONS POUR LE DCF AVANCÉ ---
 
 RISK_FREE_RATE_TICKER = "^TNX" # US 10-Year Treasury Note
@@ -152,61 +105,278 @@ MARKET_RETURN = 0.085 # Hypothèse de retour moyen du marché (S&P 500 historiqu
 
 # --- Fonction Principale d'Orchestration ---
 
-def perform_screening(index_name: str, criteria: dict) -> list:
-    """Orchestre le processus de screening complet."""
+def perform_screening(index_name: str, criteria: dict, use_snapshot: bool = True,
+                      symbols: Optional[list] = None, symbol_report: Optional[dict] = None) -> list:
+    """
+    Orchestre le processus de screening complet.
+    La durée de chaque étape est enregistrée avec le screening (colonne `timings`).
+    `symbols` / `symbol_report` : symboles déjà résolus par l'appelant (get_index_symbols_async)
+    et le rapport de cette résolution ; ils ne sont alors pas résolus une seconde fois.
+    """
     start_time = time.time()
+    timings = {}
     
-    symbols = get_index_symbols(index_name)
-    if not symbols:
+    stock_data_list = get_index_snapshot(index_name, use_snapshot=use_snapshot, timings=timings,
+                                         symbols=symbols, symbol_report=symbol_report)
+    if not stock_data_list:
         return []
     
-    all_results = []
-    for symbol in symbols:
-        data = get_stock_data(symbol)
-        if data:
-            result = calculate_value(data, criteria)
-            if result:
-                all_results.append(result)
-    
-    # Trier les résultats par score décroissant
-    all_results.sort(key=lambda x: x['score'], reverse=True)
+    # Notation vectorisée et tri par score décroissant
+    scoring_start = time.perf_counter()
+    all_results = score_stocks(stock_data_list, criteria)
+    timings['scoring'] = {'seconds': round(time.perf_counter() - scoring_start, 4), 'stocks': len(stock_data_list)}
     
     # Sauvegarder les résultats en base
-    execution_time = time.time() - start_time
+    save_screening(index_name, criteria, all_results, time.time() - start_time, timings)
+    return all_results
+
+
+def save_screening(index_name: str, criteria: dict, results: list, execution_time: float,
+                   timings: Optional[dict] = None):
+    """Sauvegarde un screening dans l'historique, retourne son ID (None en cas d'erreur)."""
+    if timings is not None:
+        timings['total_seconds'] = round(execution_time, 4)
     try:
         screening_id = db_manager.save_screening_result(
             index_name=index_name,
             criteria=criteria,
-            results=all_results,
-            execution_time=execution_time
+            results=results,
+            execution_time=execution_time,
+            timings=timings
         )
         print(f"Screening sauvegardé avec l'ID {screening_id} - Temps d'exécution: {execution_time:.2f}s")
+        return screening_id
     except Exception as e:
         print(f"Erreur lors de la sauvegarde du screening: {e}")
+        return None
+
+
+def summarize_latencies(latencies: dict) -> dict:
+    """Distribution des latences de récupération par symbole (secondes)"""
+    values = np.fromiter(latencies.values(), dtype=float, count=len(latencies))
+    if not values.size:
+        return {'count': 0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        'count': int(values.size), 'min': round(float(values.min()), 4), 'p50': round(float(p50), 4),
+        'p90': round(float(p90), 4), 'p99': round(float(p99), 4), 'max': round(float(values.max()), 4),
+        'mean': round(float(values.mean()), 4)
+    }
+
+
+def fetch_timings(seconds: float, batch_reports: list, latencies: dict) -> dict:
+    """Étape de récupération : durée, part servie par le cache et distribution des latences par symbole"""
+    symbols = sum(report.get('symbols', 0) for report in batch_reports)
+    cache_hits = sum(report.get('cache_hits', 0) for report in batch_reports)
+    return {
+        'source': 'provider',
+        'provider': batch_reports[0].get('provider') if batch_reports else quote_provider.name,
+        'seconds': round(seconds, 4),
+        'symbols': symbols,
+        'cache_hits': cache_hits,
+        'stale': sum(report.get('stale', 0) for report in batch_reports),
+        'fetched': sum(report.get('fetched', 0) for report in batch_reports),
+        'cache_hit_ratio': round(cache_hits / symbols, 4) if symbols else None,
+        'latency': summarize_latencies(latencies)
+    }
+
+
+def stream_chunks(symbols: list, first_size: int, max_size: int) -> list:
+    """Découpe les symboles en lots croissants : un premier lot court pour des résultats rapides, puis doublés."""
+    chunks, size, position = [], max(1, first_size), 0
+    while position < len(symbols):
+        chunks.append(symbols[position:position + size])
+        position += size
+        size = min(size * 2, max(max_size, first_size))
+    return chunks
+
+
+def iter_screening(index_name: str, criteria: dict, use_snapshot: bool = True):
+    """
+    Version en flux de perform_screening. Génère des événements au fur et à mesure :
+    - {'type': 'stock', 'data': résultat noté} dès qu'un lot de données arrive
+    - {'type': 'keepalive'} si aucun lot n'est arrivé depuis SCREENING_STREAM_KEEPALIVE secondes
+    - {'type': 'summary', ...} en dernier, avec tous les résultats triés par score décroissant
+      et la durée de chaque étape (`timings`)
+    """
+    start_time = time.time()
+    timings, scoring_seconds = {}, 0.0
+    snapshot_key = get_cache_key('screening_snapshot', index_name)
+    lookup_start = time.perf_counter()
+    snapshot = cache_manager.get(snapshot_key) if use_snapshot else None
     
-    return all_results
+    if snapshot:
+        print(f"Instantané en cache utilisé pour {index_name} ({len(snapshot)} symboles)")
+        timings.update(snapshot_timings(time.perf_counter() - lookup_start, len(snapshot)))
+        scoring_start = time.perf_counter()
+        snapshot_results = score_stocks(snapshot, criteria)
+        scoring_seconds += time.perf_counter() - scoring_start
+        for result in snapshot_results:
+            yield {'type': 'stock', 'data': result}
+        stock_data_list = snapshot
+    else:
+        resolution_start, symbol_report = time.perf_counter(), {}
+        symbols = get_index_symbols(index_name, report=symbol_report)
+        timings['symbol_resolution'] = dict(symbol_report, seconds=round(time.perf_counter() - resolution_start, 4),
+                                            symbols=len(symbols))
+        chunks = stream_chunks(symbols, SCREENING_STREAM_FIRST_CHUNK, quote_provider.batch_size)
+        chunk_data = [None] * len(chunks)
+        batch_reports, latencies = [{} for _ in chunks], {}
+        fetch_start = time.perf_counter()
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, min(SCREENING_STREAM_WORKERS, len(chunks)))) as executor:
+                pending = {executor.submit(get_stock_data_batch, chunk, report=batch_reports[i]): i
+                           for i, chunk in enumerate(chunks)}
+                while pending:
+                    done, _ = wait(pending, timeout=SCREENING_STREAM_KEEPALIVE, return_when=FIRST_COMPLETED)
+                    if not done:
+                        yield {'type': 'keepalive'}
+                        continue
+                    for future in done:
+                        index = pending.pop(future)
+                        chunk_list, chunk_latencies = future.result()
+                        latencies.update(chunk_latencies)
+                        chunk_data[index] = [data for data in chunk_list if data]
+                        scoring_start = time.perf_counter()
+                        chunk_results = score_stocks(chunk_data[index], criteria)
+                        scoring_seconds += time.perf_counter() - scoring_start
+                        for result in chunk_results:
+                            yield {'type': 'stock', 'data': result}
+        timings['fetch'] = fetch_timings(time.perf_counter() - fetch_start - scoring_seconds, batch_reports, latencies)
+        
+        # Instantané dans l'ordre des symboles de l'indice, comme get_index_snapshot
+        stock_data_list = [data for chunk in chunk_data if chunk for data in chunk]
+        if stock_data_list:
+            cache_manager.set(snapshot_key, stock_data_list, ttl=SCREENING_SNAPSHOT_TTL)
+    
+    scoring_start = time.perf_counter()
+    all_results = score_stocks(stock_data_list, criteria) if stock_data_list else []
+    scoring_seconds += time.perf_counter() - scoring_start
+    timings['scoring'] = {'seconds': round(scoring_seconds, 4), 'stocks': len(stock_data_list)}
+    execution_time = time.time() - start_time
+    screening_id = save_screening(index_name, criteria, all_results, execution_time, timings) if all_results else None
+    yield {
+        'type': 'summary',
+        'screening_id': screening_id,
+        'total_results': len(all_results),
+        'execution_time': execution_time,
+        'timings': timings,
+        'results': all_results
+    }
+
 
+def snapshot_timings(seconds: float, count: int) -> dict:
+    """Étapes de résolution et de récupération quand l'instantané en cache de l'indice est réutilisé"""
+    return {
+        'symbol_resolution': {'source': 'snapshot', 'seconds': round(seconds, 4), 'symbols': count},
+        'fetch': {'source': 'snapshot', 'seconds': 0.0, 'symbols': count, 'cache_hits': count,
+                  'cache_hit_ratio': 1.0 if count else None}
+    }
 
 
-@cache_api_response
+def get_index_snapshot(index_name: str, use_snapshot: bool = True, timings: Optional[dict] = None,
+                       symbols: Optional[list] = None, symbol_report: Optional[dict] = None) -> list:
+    """
+    Retourne les données brutes de tous les symboles d'un indice.
+    L'instantané est conservé dans cache_manager pendant SCREENING_SNAPSHOT_TTL secondes :
+    un nouveau screening du même indice avec d'autres critères ne refait que la notation.
+    `timings` reçoit la durée de résolution des symboles et de récupération des données.
+    `symbols` : liste déjà résolue par l'appelant (décrite par `symbol_report`), utilisée telle quelle.
+    """
+    timings = timings if timings is not None else {}
+    snapshot_key = get_cache_key('screening_snapshot', index_name)
+    lookup_start = time.perf_counter()
+    if use_snapshot:
+        snapshot = cache_manager.get(snapshot_key)
+        if snapshot:
+            print(f"Instantané en cache utilisé pour {index_name} ({len(snapshot)} symboles)")
+            timings.update(snapshot_timings(time.perf_counter() - lookup_start, len(snapshot)))
+            return snapshot
+    
+    if symbols is None:
+        resolution_start, symbol_report = time.perf_counter(), {}
+        symbols = get_index_symbols(index_name, report=symbol_report)
+        timings['symbol_resolution'] = dict(symbol_report, seconds=round(time.perf_counter() - resolution_start, 4),
+                                            symbols=len(symbols))
+    else:
+        timings['symbol_resolution'] = dict(symbol_report or {'source': 'caller'})
+        timings['symbol_resolution'].setdefault('symbols', len(symbols))
+    if not symbols:
+        return []
+    
+    fetch_start, batch_report = time.perf_counter(), {}
+    stock_data_list, latencies = get_stock_data_batch(symbols, report=batch_report)
+    timings['fetch'] = fetch_timings(time.perf_counter() - fetch_start, [batch_report], latencies)
+    if latencies:
+        sorted_latencies = sorted(latencies.values())
+        print(f"Données récupérées pour {len(symbols)} symboles - "
+              f"latence médiane: {sorted_latencies[len(sorted_latencies) // 2]:.2f}s, "
+              f"max: {sorted_latencies[-1]:.2f}s")
+    
+    snapshot = [data for data in stock_data_list if data]
+    if snapshot:
+        cache_manager.set(snapshot_key, snapshot, ttl=SCREENING_SNAPSHOT_TTL)
+    return snapshot
+
+def invalidate_index_snapshot(index_name: str):
+    """Supprime l'instantané d'un indice pour forcer un nouveau téléchargement."""
+    cache_manager.delete(get_cache_key('screening_snapshot', index_name))
+
+def get_stock_data_batch(symbols: list, provider=None, report: Optional[dict] = None) -> tuple:
+    """
+    Récupère les données de plusieurs symboles via le fournisseur de cotations par lots.
+    Les symboles déjà en cache (clé `get_stock_data`) ne sont pas redemandés.
+    `report` reçoit le fournisseur et le nombre de symboles servis par le cache, périmés ou demandés.
+    
+    Returns:
+        Tuple (liste des données dans l'ordre de `symbols`, dictionnaire {symbole: latence en secondes})
+    """
+    provider = provider or quote_provider
+    cached, latencies, missing, stale = {}, {}, [], []
+    for symbol in symbols:
+        lookup_start = time.time()
+        data, is_stale = cache_manager.get_entry(get_cache_key('get_stock_data', symbol))
+        if data:
+            cached[symbol] = data
+            latencies[symbol] = time.time() - lookup_start
+            if is_stale:
+                stale.append(symbol)
+        else:
+            missing.append(symbol)
+    if report is not None:
+        report.update(provider=provider.name, symbols=len(symbols), cache_hits=len(cached),
+                      stale=len(stale), fetched=len(missing))
+    
+    def fetch_and_cache(batch_symbols):
+        records, fetch_latencies = provider.get_quotes(batch_symbols)
+        for symbol, data in records.items():
+            if data:
+                cache_manager.set(get_cache_key('get_stock_data', symbol), data,
+                                  ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL)
+        return records, fetch_latencies
+    
+    # Les données périmées sont servies telles quelles et rafraîchies en arrière-plan
+    if stale:
+        background_refresher.schedule(get_cache_key('get_stock_data_batch', *stale), lambda: fetch_and_cache(stale))
+    
+    fetched = {}
+    if missing:
+        fetched, fetch_latencies = fetch_and_cache(missing)
+        latencies.update(fetch_latencies)
+        print(f"{len(missing)} symboles demandés à {provider.name} ({len(cached)} depuis le cache)")
+    
+    return [cached.get(symbol) or fetched.get(symbol) for symbol in symbols], latencies
+
+@cache_api_response(stale_ttl=CACHE_STALE_TTL)
 def get_stock_data(symbol: str) -> dict:
     """Récupère les données financières clés pour un symbole."""
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        if not info or 'symbol' not in info: return None
-        
-        current_price = info.get('currentPrice', info.get('regularMarketPreviousClose'))
-        if not current_price: return None
-
-        return {
-            'symbol': info.get('symbol'), 'company_name': info.get('longName', 'N/A'),
-            'currency': info.get('currency', 'USD'), 'current_price': current_price,
-            'market_cap': info.get('marketCap', 0), 'pe_ratio': info.get('trailingPE'),
-            'pb_ratio': info.get('priceToBook'), 'debt_to_equity': info.get('debtToEquity'),
-            'roe': info.get('returnOnEquity'), 'dividend_yield': info.get('dividendYield', 0),
-            'eps': info.get('trailingEps'), 'bvps': info.get('bookValue')
-        }
+        with metrics.upstream_call(quote_provider.name, "get_stock_data") as call:
+            records, _ = quote_provider.get_quotes([symbol])
+            record = records.get(symbol)
+            if record is None:
+                call["outcome"] = "empty"
+        return record
     except Exception:
         return None
 
@@ -223,15 +393,35 @@ def get_financial_statements(ticker: str) -> dict:
 
 # --- Fonctions de Calcul ---
 
+# Critères de screening : clé du critère -> (champ, validité de la donnée, sens de la comparaison)
+# Une donnée invalide (manquante, P/E négatif...) n'entre pas dans le score maximum.
+SCREENING_CRITERIA = {
+    'pe_max': ('pe_ratio', 'positive', 'max'),
+    'pb_max': ('pb_ratio', 'positive', 'max'),
+    'de_max': ('debt_to_equity', 'non_negative', 'max'),
+    'roe_min': ('roe', 'any', 'min'),
+}
+
+def _is_valid_metric(value, validity: str) -> bool:
+    if not isinstance(value, numbers.Real) or value != value:
+        return False
+    if validity == 'positive':
+        return value > 0
+    if validity == 'non_negative':
+        return value >= 0
+    return True
+
 def calculate_value(data: dict, criteria: dict) -> dict:
     """Calcule le score de valeur et la valeur intrinsèque."""
     if not data: return None
     score, max_score = 0, 0
     
-    # ... (logique de notation) ...
-    if data.get('pe_ratio') and data['pe_ratio'] > 0:
+    for criterion, (field, validity, direction) in SCREENING_CRITERIA.items():
+        threshold, value = criteria.get(criterion), data.get(field)
+        if threshold is None or not _is_valid_metric(value, validity):
+            continue
         max_score += 1
-        if data['pe_ratio'] < criteria['pe_max']: score += 1
+        if (value < threshold) if direction == 'max' else (value >= threshold): score += 1
             
     value_score = (score / max_score * 100) if max_score > 0 else 0
     
@@ -242,6 +432,59 @@ def calculate_value(data: dict, criteria: dict) -> dict:
     
     return {**data, 'score': value_score, 'intrinsic_value': intrinsic_value}
 
+def score_stocks(stock_data_list: list, criteria: dict) -> list:
+    """
+    Version vectorisée de calculate_value : charge toutes les données dans un DataFrame,
+    applique chaque critère comme un masque booléen et trie par score décroissant.
+    Le résultat ligne à ligne est identique à celui de calculate_value.
+    """
+    records = [data for data in stock_data_list if data]
+    if not records:
+        return []
+    
+    frame = pd.DataFrame.from_records(records)
+    
+    def numeric_column(field):
+        if field not in frame.columns:
+            return np.full(len(frame), np.nan)
+        return pd.to_numeric(frame[field], errors='coerce').to_numpy(dtype='float64')
+    
+    score = np.zeros(len(frame))
+    max_score = np.zeros(len(frame))
+    with np.errstate(invalid='ignore'):
+        for criterion, (field, validity, direction) in SCREENING_CRITERIA.items():
+            threshold = criteria.get(criterion)
+            if threshold is None:
+                continue
+            values = numeric_column(field)
+            if validity == 'positive':
+                valid = values > 0
+            elif validity == 'non_negative':
+                valid = values >= 0
+            else:
+                valid = ~np.isnan(values)
+            passed = valid & ((values < threshold) if direction == 'max' else (values >= threshold))
+            max_score += valid
+            score += passed
+        
+        value_score = np.divide(score, max_score, out=np.zeros(len(frame)), where=max_score > 0) * 100
+        
+        # Nombre de Graham calculé colonne par colonne
+        eps, bvps = numeric_column('eps'), numeric_column('bvps')
+        graham_valid = (eps > 0) & (bvps > 0)
+        intrinsic_values = np.where(graham_valid, np.sqrt(np.where(graham_valid, 22.5 * eps * bvps, 0.0)), np.nan)
+    
+    # Tri stable par score décroissant (même ordre que list.sort(reverse=True))
+    order = np.argsort(-value_score, kind='stable')
+    return [
+        {
+            **records[i],
+            'score': float(value_score[i]),
+            'intrinsic_value': None if np.isnan(intrinsic_values[i]) else intrinsic_values[i]
+        }
+        for i in order
+    ]
+
                 
 def get_risk_free_rate():
     """Récupère le taux sans risque en temps réel (rendement du Trésor US 10 ans)."""
@@ -375,24 +618,18 @@ def run_dcf_valuation(fcf_growth_rate, perpetual_growth_rate, base_fcf, total_de
     PROJECTION_YEARS = 5
     """Calcule la valeur intrinsèque par action selon un scénario donné."""
     
-    # Projection des Free Cash Flows futurs
-    projected_fcf = [base_fcf * (1 + fcf_growth_rate)**i for i in range(1, PROJECTION_YEARS + 1)]
-
-    # Actualisation des FCF
-    discounted_fcf = [fcf / (1 + WACC)**(i + 1) for i, fcf in enumerate(projected_fcf)]
-    pv_of_fcf = sum(discounted_fcf)
-
-    # Calcul de la Valeur Terminale et actualisation
-    final_fcf = projected_fcf[-1]
-    terminal_value = (final_fcf * (1 + perpetual_growth_rate)) / (WACC - perpetual_growth_rate)
-    pv_of_terminal_value = terminal_value / (1 + WACC)**PROJECTION_YEARS
-
-    # Calcul de la valeur d'entreprise et de la valeur des capitaux propres
-    enterprise_value = pv_of_fcf + pv_of_terminal_value
-    equity_value = enterprise_value - total_debt + cash
+    # Le noyau retourne NaN dans ce cas : erreur explicite plutôt qu'un NaN non sérialisable en JSON
+    if WACC <= perpetual_growth_rate:
+        raise ValueError(
+            f"WACC ({WACC:.2%}) doit être supérieur au taux de croissance perpétuel ({perpetual_growth_rate:.2%})"
+        )
     
-    # Calcul de la valeur intrinsèque par action
-    intrinsic_value_per_share = equity_value / shares_outstanding
+    intrinsic_value_per_share, enterprise_value, equity_value = (
+        float(value) for value in dcf_kernel(
+            fcf_growth_rate, perpetual_growth_rate, base_fcf, total_debt, cash,
+            shares_outstanding, WACC, PROJECTION_YEARS
+        )
+    )
     
     return intrinsic_value_per_share, enterprise_value, equity_value
 
@@ -401,11 +638,11 @@ def get_dcf_analysis(ticker: str):
     Fonction principale pour l'analyse DCF, maintenant basée sur stockdex.
     """
     try:
-        print(f"▶️  Récupération des données pour {ticker} via stockdex...")
-        # Appel simple et direct. Pas de configuration de navigateur ici.
-        stock = StockdexTicker(ticker=ticker)
+        print(f"▶️  Récupération des données pour {ticker} via {statements_provider.name}...")
+        # États Macrotrends via le fournisseur configuré (stockdex par défaut, fixtures hors ligne)
+        stock = statements_provider.get_statements(ticker)
         
-        # Utilisation des méthodes de la bibliothèque stockdex
+        # Utilisation des méthodes Macrotrends de l'interface stockdex
         is_df_raw = stock.macrotrends_income_statement(frequency='annual')
         bs_df_raw = stock.macrotrends_balance_sheet(frequency='annual')
         cf_df_raw = stock.macrotrends_cash_flow(frequency='annual')
@@ -0,0 +1,81 @@
+# async_io.py - Client HTTP asynchrone partagé et exécuteurs bornés pour les endpoints async
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+# Client HTTP partagé (pool de connexions keep-alive)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+
+# Exécuteurs bornés : bibliothèques bloquantes (yfinance, yahooquery, stockdex, SQLite)
+# et calculs pandas/NumPy, séparés pour qu'un calcul long ne bloque pas les entrées/sorties
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "32"))
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 2)))
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+_http_client: Optional[httpx.AsyncClient] = None
+_io_executor = ThreadPoolExecutor(max_workers=max(1, BLOCKING_IO_WORKERS), thread_name_prefix="blocking-io")
+_cpu_executor = ThreadPoolExecutor(max_workers=max(1, CPU_WORKERS), thread_name_prefix="cpu")
+_lock = threading.Lock()
+_in_flight = {"blocking_io": 0, "cpu": 0}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client httpx partagé, créé au premier appel (les connexions sont réutilisées entre requêtes)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Ferme le client partagé (arrêt de l'application)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _run_in(executor: ThreadPoolExecutor, kind: str, func: Callable, *args, **kwargs) -> Any:
+    with _lock:
+        _in_flight[kind] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    finally:
+        with _lock:
+            _in_flight[kind] -= 1
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Exécute une fonction bloquante (réseau via une bibliothèque synchrone, SQLite) hors de la boucle"""
+    return await _run_in(_io_executor, "blocking_io", func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Exécute un calcul pandas/NumPy dans l'exécuteur CPU borné"""
+    return await _run_in(_cpu_executor, "cpu", func, *args, **kwargs)
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        in_flight = dict(_in_flight)
+    return {
+        "blocking_io_workers": BLOCKING_IO_WORKERS,
+        "cpu_workers": CPU_WORKERS,
+        "in_flight": in_flight,
+        "http_client_open": _http_client is not None and not _http_client.is_closed
+    }
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks hors ligne : rejoue des payloads `yf.Ticker.info` et des tableaux Macrotrends
+enregistrés dans fixtures/ (aucun appel à Yahoo, Macrotrends ni Chrome) et mesure le screening,
+l'analyse DCF, la notation, la base SQLite et le cache.
+
+Exemples :
+    python benchmark.py                                  # suite complète, comparée à l'historique
+    python benchmark.py --only screening --sizes 40,100  # un seul groupe
+    python benchmark.py --upstream-latency 0.05          # simule 50 ms par lot de cotations
+    python benchmark.py --record AAPL,MSFT               # enregistre de nouveaux fixtures (réseau requis)
+
+Chaque exécution est ajoutée à BENCHMARK_HISTORY_PATH (une ligne JSON par exécution) ; la médiane de
+chaque benchmark est comparée à celle des exécutions précédentes sur la même machine et toute
+dégradation au-delà de BENCHMARK_REGRESSION_THRESHOLD est signalée (code de sortie 1 avec
+--fail-on-regression).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import analysis
+import database
+import fmp_analysis
+from data_providers import FixtureProvider
+from database import CacheManager, DatabaseManager, SQLiteCache, cache_api_response
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.getenv("BENCHMARK_FIXTURES_DIR", os.path.join(API_DIR, "fixtures"))
+HISTORY_PATH = os.getenv("BENCHMARK_HISTORY_PATH", os.path.join(API_DIR, "benchmark_history.jsonl"))
+
+# Dégradation relative de la médiane signalée comme régression, et écart absolu minimum (secondes)
+# en dessous duquel les micro-benchmarks ne sont pas signalés (bruit de mesure)
+REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.20"))
+REGRESSION_MIN_DELTA = float(os.getenv("BENCHMARK_REGRESSION_MIN_DELTA", "0.0005"))
+
+UNIVERSE_SIZES = (40, 100, 500, 2000)
+GROUPS = ("screening", "dcf", "scoring", "db", "cache")
+CRITERIA = {"pe_max": 15.0, "pb_max": 1.5, "de_max": 100.0, "roe_min": 0.12}
+
+# Champs de `.info` conservés à l'enregistrement (ceux lus par build_stock_record)
+INFO_FIELDS = (
+    "symbol", "longName", "shortName", "currency", "quoteType", "currentPrice", "regularMarketPreviousClose",
+    "marketCap", "trailingPE", "priceToBook", "debtToEquity", "returnOnEquity", "dividendYield",
+    "trailingEps", "bookValue"
+)
+
+Case = namedtuple("Case", ["name", "run", "setup"])
+
+
+# --- Fixtures enregistrés ---
+
+def load_quote_fixtures(fixtures_dir: str = FIXTURES_DIR) -> Dict[str, dict]:
+    """Payloads `yf.Ticker.info` enregistrés : {symbole: info}"""
+    with open(os.path.join(fixtures_dir, "yfinance_info.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_universe(infos: Dict[str, dict], size: int) -> Dict[str, dict]:
+    """
+    Univers déterministe de `size` symboles construit à partir des payloads enregistrés :
+    au-delà du nombre de fixtures, les payloads sont dupliqués (suffixe -N) avec des
+    multiples légèrement décalés pour que les scores restent variés.
+    """
+    templates = [infos[symbol] for symbol in sorted(infos)]
+    universe = {}
+    for i in range(size):
+        template, copy = templates[i % len(templates)], i // len(templates)
+        symbol = template["symbol"] if copy == 0 else f"{template['symbol']}-{copy}"
+        factor = 1 + ((i * 37) % 21 - 10) / 100
+        info = dict(template, symbol=symbol)
+        for field in ("currentPrice", "trailingPE", "priceToBook"):
+            if isinstance(info.get(field), (int, float)):
+                info[field] = round(info[field] * factor, 4)
+        universe[symbol] = info
+    return universe
+
+
+def record_fixtures(symbols: List[str], fixtures_dir: str = FIXTURES_DIR):
+    """Enregistre les payloads `.info` (yfinance) et les états Macrotrends (stockdex) de `symbols`"""
+    import yfinance as yf
+    from startup import load_stockdex
+
+    infos_path = os.path.join(fixtures_dir, "yfinance_info.json")
+    infos = load_quote_fixtures(fixtures_dir) if os.path.exists(infos_path) else {}
+    os.makedirs(os.path.join(fixtures_dir, "macrotrends"), exist_ok=True)
+    Ticker = load_stockdex()
+
+    for symbol in symbols:
+        info = yf.Ticker(symbol).info or {}
+        if info.get("symbol"):
+            infos[symbol] = {field: info[field] for field in INFO_FIELDS if field in info}
+            print(f"   ✅ {symbol}: payload .info enregistré")
+        try:
+            ticker = Ticker(ticker=symbol, security_type="stock")
+            payload = {
+                name: getattr(ticker, method)(frequency="annual").to_dict(orient="index")
+                for name, method in fmp_analysis.MACROTRENDS_STATEMENTS.items()
+            }
+            payload["shares_outstanding"] = ticker.digrin_shares_outstanding.astype(str).values.tolist()
+        except Exception as e:
+            print(f"   ⚠️  {symbol}: états Macrotrends non enregistrés ({e})")
+            continue
+        with open(os.path.join(fixtures_dir, "macrotrends", f"{symbol}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1, default=str)
+        print(f"   ✅ {symbol}: états Macrotrends enregistrés")
+
+    with open(infos_path, "w", encoding="utf-8") as f:
+        json.dump(infos, f, indent=1, ensure_ascii=False)
+
+
+# --- Environnement isolé ---
+
+class BenchmarkEnvironment:
+    """
+    Base SQLite et cache mémoire temporaires, cotations et états Macrotrends rejoués depuis les fixtures.
+    Les objets globaux des modules sont remplacés à l'entrée et restaurés à la sortie.
+    """
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, upstream_latency: float = 0.0):
+        self.fixtures_dir = fixtures_dir
+        self.upstream_latency = upstream_latency
+        self.infos = load_quote_fixtures(fixtures_dir)
+        self.universes = {}
+        self._originals = []
+
+    def universe(self, size: int) -> Dict[str, dict]:
+        if size not in self.universes:
+            self.universes[size] = build_universe(self.infos, size)
+        return self.universes[size]
+
+    def index_name(self, size: int) -> str:
+        return f"BENCHMARK {size}"
+
+    def _patch(self, module, name, value):
+        self._originals.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    def __enter__(self):
+        self.workdir = tempfile.TemporaryDirectory(prefix="benchmark-")
+        self.db = DatabaseManager(os.path.join(self.workdir.name, "screener.db"))
+        self.cache = CacheManager(redis_url=None, backend="memory")
+        all_infos = {symbol: info for size in UNIVERSE_SIZES for symbol, info in self.universe(size).items()}
+        # Un seul fournisseur local sert les cotations de tous les univers et les états Macrotrends
+        self.provider = FixtureProvider(self.fixtures_dir, infos=all_infos, latency=self.upstream_latency)
+
+        def index_symbols(index_name, report=None):
+            if report is not None:
+                report["source"] = "fixtures"
+            return list(self.universe(int(index_name.rsplit(" ", 1)[1])))
+
+        for module in (analysis, fmp_analysis):
+            self._patch(module, "db_manager", self.db)
+        for module in (analysis, database):
+            self._patch(module, "cache_manager", self.cache)
+        self._patch(analysis, "quote_provider", self.provider)
+        self._patch(analysis, "get_index_symbols", index_symbols)
+        self._patch(fmp_analysis, "statements_provider", self.provider)
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, value in reversed(self._originals):
+            setattr(module, name, value)
+        self._originals.clear()
+        self.db.pool.close_all()
+        self.workdir.cleanup()
+        return False
+
+
+# --- Benchmarks ---
+
+def screening_cases(env: BenchmarkEnvironment, sizes) -> List[Case]:
+    cases = []
+    for size in sizes:
+        index_name = env.index_name(size)
+
+        def cold(index_name=index_name):
+            env.cache.clear_pattern("*")
+
+        def warm_quotes(index_name=index_name):
+            analysis.invalidate_index_snapshot(index_name)
+            analysis.get_stock_data_batch(list(env.universe(size)))
+
+        def warm_snapshot(index_name=index_name):
+            analysis.get_index_snapshot(index_name)
+
+        screen = (lambda index_name=index_name, use_snapshot=False:
+                  analysis.perform_screening(index_name, CRITERIA, use_snapshot=use_snapshot))
+        cases += [
+            Case(f"screening/perform_screening[{size}]/cold", screen, cold),
+            Case(f"screening/perform_screening[{size}]/cached_quotes", screen, warm_quotes),
+            Case(f"screening/perform_screening[{size}]/snapshot",
+                 lambda screen=screen: screen(use_snapshot=True), warm_snapshot),
+        ]
+    return cases
+
+
+def dcf_cases(env: BenchmarkEnvironment) -> List[Case]:
+    ticker = env.provider.statement_symbols()[0]
+    compute = fmp_analysis.get_dcf_analysis.__wrapped__
+
+    def clear_store():
+        with env.db.write_transaction() as conn:
+            conn.execute("DELETE FROM financial_statements")
+
+    def run(func=compute):
+        result = func(ticker)
+        if not result.get("success"):
+            raise RuntimeError(f"Analyse DCF en échec sur les fixtures de {ticker}: {result.get('error')}")
+
+    def warm_cache():
+        env.cache.clear_pattern("*")
+        fmp_analysis.get_dcf_analysis(ticker)
+
+    return [
+        Case(f"dcf/get_dcf_analysis[{ticker}]/scrape", run, clear_store),
+        Case(f"dcf/get_dcf_analysis[{ticker}]/statement_store", run, lambda: compute(ticker)),
+        Case(f"dcf/get_dcf_analysis[{ticker}]/cached", lambda: run(fmp_analysis.get_dcf_analysis), warm_cache),
+    ]
+
+
+def scoring_cases(env: BenchmarkEnvironment, sizes) -> List[Case]:
+    from data_providers import build_stock_record
+    cases = []
+    for size in sizes:
+        records = [build_stock_record(info) for info in env.universe(size).values()]
+        cases += [
+            Case(f"scoring/calculate_value[{size}]",
+                 lambda records=records: [analysis.calculate_value(data, CRITERIA) for data in records], None),
+            Case(f"scoring/score_stocks[{size}]", lambda records=records: analysis.score_stocks(records, CRITERIA), None),
+        ]
+    return cases
+
+
+def db_cases(env: BenchmarkEnvironment, size: int = 500) -> List[Case]:
+    from data_providers import build_stock_record
+    results = analysis.score_stocks([build_stock_record(info) for info in env.universe(size).values()], CRITERIA)
+    screening_id = env.db.save_screening_result("BENCHMARK", CRITERIA, results, 1.0)
+    symbol = results[0]["symbol"]
+    return [
+        Case(f"db/save_screening_result[{size}]",
+             lambda: env.db.save_screening_result("BENCHMARK", CRITERIA, results, 1.0), None),
+        Case(f"db/get_screening[{size}]", lambda: env.db.get_screening(screening_id), None),
+        Case("db/get_screening_history", lambda: env.db.get_screening_history(limit=50), None),
+        Case("db/get_symbol_history", lambda: env.db.get_symbol_history(symbol), None),
+    ]
+
+
+def cache_cases(env: BenchmarkEnvironment, count: int = 1000) -> List[Case]:
+    keys = [f"get_stock_data:{symbol}" for symbol in env.universe(count)]
+    value = next(iter(env.infos.values()))
+    shared = SQLiteCache(os.path.join(env.workdir.name, "cache.db"), sweep_interval=0)
+
+    def set_get(cache):
+        for key in keys:
+            cache.set(key, value, ttl=3600)
+        for key in keys:
+            cache.get(key)
+
+    @cache_api_response
+    def benchmark_lookup(key):
+        return value
+
+    def warm_lookups():
+        for key in keys:
+            benchmark_lookup(key)
+
+    return [
+        Case(f"cache/memory_set_get[{count}]", lambda: set_get(env.cache), None),
+        Case(f"cache/sqlite_set_get[{count}]", lambda: set_get(shared), None),
+        Case(f"cache/cache_api_response_hit[{count}]",
+             lambda: [benchmark_lookup(key) for key in keys], warm_lookups),
+    ]
+
+
+def collect_cases(env: BenchmarkEnvironment, groups=GROUPS, sizes=UNIVERSE_SIZES) -> List[Case]:
+    cases = []
+    if "screening" in groups:
+        cases += screening_cases(env, sizes)
+    if "dcf" in groups:
+        cases += dcf_cases(env)
+    if "scoring" in groups:
+        cases += scoring_cases(env, sizes)
+    if "db" in groups:
+        cases += db_cases(env)
+    if "cache" in groups:
+        cases += cache_cases(env)
+    return cases
+
+
+def measure(run: Callable, setup: Optional[Callable] = None, repeat: int = 5) -> dict:
+    """Durée de `repeat` exécutions de `run` (secondes), `setup` étant exécuté avant chacune sans être mesuré"""
+    samples = []
+    # Les messages (print et logging INFO) fausseraient les mesures : ils sont masqués pendant l'exécution
+    logging.disable(logging.INFO)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                if setup:
+                    setup()
+                start = time.perf_counter()
+                run()
+                samples.append(time.perf_counter() - start)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "repeat": repeat, "min": min(samples), "median": statistics.median(samples),
+        "mean": statistics.fmean(samples), "max": max(samples)
+    }
+
+
+def run_suite(groups=GROUPS, sizes=UNIVERSE_SIZES, repeat: int = 5, upstream_latency: float = 0.0,
+              fixtures_dir: str = FIXTURES_DIR, verbose: bool = True) -> Dict[str, dict]:
+    """Exécute les benchmarks sélectionnés dans un environnement isolé : {nom: statistiques}"""
+    results = {}
+    with BenchmarkEnvironment(fixtures_dir, upstream_latency) as env:
+        for case in collect_cases(env, groups, sizes):
+            results[case.name] = measure(case.run, case.setup, repeat)
+            if verbose:
+                print(f"   {case.name:<55} médiane {results[case.name]['median'] * 1000:10.2f} ms")
+    return results
+
+
+# --- Historique et régressions ---
+
+def machine_id() -> str:
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu/py{platform.python_version()}"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str = HISTORY_PATH) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(record: dict, path: str = HISTORY_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def find_regressions(results: Dict[str, dict], history: List[dict], machine: str, baseline_runs: int = 5,
+                     threshold: float = REGRESSION_THRESHOLD, min_delta: float = REGRESSION_MIN_DELTA) -> List[dict]:
+    """
+    Compare la médiane de chaque benchmark à la médiane des `baseline_runs` dernières exécutions
+    de la même machine et de la même latence amont simulée.
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = [run["results"][name]["median"] for run in history
+                    if run.get("machine") == machine and name in run.get("results", {})][-baseline_runs:]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        if stats["median"] > baseline * (1 + threshold) and stats["median"] - baseline > min_delta:
+            regressions.append({"name": name, "baseline": baseline, "median": stats["median"],
+                                "change": stats["median"] / baseline - 1 if baseline else None})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne sur des fixtures enregistrés")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"groupes à exécuter ({', '.join(GROUPS)})")
+    parser.add_argument("--sizes", default=",".join(map(str, UNIVERSE_SIZES)), help="tailles d'univers du screening")
+    parser.add_argument("--repeat", type=int, default=5, help="exécutions mesurées par benchmark")
+    parser.add_argument("--upstream-latency", type=float, default=0.0,
+                        help="latence simulée par lot de cotations et par état Macrotrends (secondes)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="répertoire des fixtures")
+    parser.add_argument("--history", default=HISTORY_PATH, help="fichier d'historique (JSON lines)")
+    parser.add_argument("--baseline-runs", type=int, default=5, help="exécutions précédentes servant de référence")
+    parser.add_argument("--no-history", action="store_true", help="ne pas enregistrer cette exécution")
+    parser.add_argument("--fail-on-regression", action="store_true", help="code de sortie 1 en cas de régression")
+    parser.add_argument("--record", help="symboles à enregistrer comme fixtures, séparés par des virgules")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"📼 Enregistrement des fixtures dans {args.fixtures}")
+        record_fixtures([s.strip() for s in args.record.split(",") if s.strip()], args.fixtures)
+        return
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"groupes inconnus: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    machine = f"{machine_id()}/latency={args.upstream_latency}"
+    print(f"⏱️  Benchmarks hors ligne — {', '.join(groups)}, univers {sizes}, {args.repeat} exécutions, {machine}")
+    results = run_suite(groups, sizes, args.repeat, args.upstream_latency, args.fixtures)
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, machine, args.baseline_runs)
+    if not args.no_history:
+        append_history({"timestamp": datetime.utcnow().isoformat(), "commit": git_commit(), "machine": machine,
+                        "repeat": args.repeat, "results": results}, args.history)
+
+    for regression in regressions:
+        print(f"   ❌ Régression {regression['name']}: {regression['baseline'] * 1000:.2f} ms -> "
+              f"{regression['median'] * 1000:.2f} ms ({regression['change']:+.0%})")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+    print("✅ Benchmarks terminés" + ("" if regressions else " sans régression"))
+
+
+if __name__ == "__main__":
+    main()
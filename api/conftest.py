@@ -0,0 +1,51 @@
+"""
+Configuration pytest : la base SQLite et le cache partagé des tests sont créés dans un répertoire
+temporaire, avant tout import de `database` (les chemins sont lus à l'import du module).
+Le fichier screener.db suivi par git n'est ainsi jamais migré ni modifié par la suite de tests.
+Fixtures partagées : `stub_screening` (screening sur des cotations locales).
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="screener-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(TEST_DATA_DIR, "screener.db")
+os.environ["SHARED_CACHE_PATH"] = os.path.join(TEST_DATA_DIR, "screener_cache.db")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def stub_screening(monkeypatch):
+    """
+    Screening hors ligne : `stub_screening(index_name, symbols, provider)` remplace la résolution des
+    symboles, le fournisseur de cotations et la sauvegarde en base (restaurés par monkeypatch, même si
+    le test échoue) et retourne la liste des screenings sauvegardés. Les caches de l'indice et de ses
+    symboles sont vidés avant et après le test.
+    """
+    import analysis
+    installed = []
+
+    def clear(index_name, symbols):
+        analysis.invalidate_index_snapshot(index_name)
+        for symbol in symbols:
+            analysis.cache_manager.delete(analysis.get_cache_key("get_stock_data", symbol))
+
+    def install(index_name, symbols, provider):
+        saved = []
+        installed.append((index_name, symbols))
+        monkeypatch.setattr(analysis, "get_index_symbols", lambda index_name, report=None: symbols)
+        monkeypatch.setattr(analysis, "quote_provider", provider)
+        monkeypatch.setattr(analysis.db_manager, "save_screening_result",
+                            lambda **kwargs: saved.append(kwargs) or len(saved))
+        clear(index_name, symbols)
+        return saved
+
+    yield install
+    for index_name, symbols in installed:
+        clear(index_name, symbols)
@@ -0,0 +1,674 @@
+# data_providers.py - Fournisseurs de données de marché : cotations, fondamentaux, états financiers et composition des indices
+import asyncio
+import importlib.util
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from io import StringIO
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+import yfinance as yf
+
+import metrics
+from async_io import HTTP_HEADERS, get_http_client, run_blocking, run_cpu
+
+# Configuration
+# Source par défaut de chaque capacité : 'live' (Yahoo Finance, Macrotrends, Wikipedia)
+# ou 'fixtures' (rejeu hors ligne des payloads enregistrés dans MARKET_DATA_FIXTURES_DIR)
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "live")
+_FIXTURES_DEFAULT = MARKET_DATA_PROVIDER == "fixtures"
+QUOTE_PROVIDER = os.getenv("QUOTE_PROVIDER", "fixtures" if _FIXTURES_DEFAULT else "auto")  # 'auto', 'yahooquery', 'yfinance' ou 'fixtures'
+STATEMENTS_PROVIDER = os.getenv("STATEMENTS_PROVIDER", "fixtures" if _FIXTURES_DEFAULT else "stockdex")
+INDEX_PROVIDER = os.getenv("INDEX_PROVIDER", "fixtures" if _FIXTURES_DEFAULT else "wikipedia")
+FIXTURES_DIR = os.getenv("MARKET_DATA_FIXTURES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", "100"))
+
+# Les appels soumis à un délai maximum passent par ce pool : un appel bloqué au-delà du délai
+# continue en arrière-plan, seul l'appelant est libéré
+PROVIDER_TIMEOUT_WORKERS = int(os.getenv("PROVIDER_TIMEOUT_WORKERS", "64"))
+
+INDEX_CONFIG = {
+    'CAC 40 (France)': { 'url': 'https://en.wikipedia.org/wiki/CAC_40', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '.PA' },
+    'S&P 500 (USA)': { 'url': 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'table_index': 0, 'ticker_col': 'Symbol', 'suffix': '' },
+    'NASDAQ 100 (USA)': { 'url': 'https://en.wikipedia.org/wiki/Nasdaq-100', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '' },
+    'DAX (Germany)': { 'url': 'https://en.wikipedia.org/wiki/DAX', 'table_index': 4, 'ticker_col': 'Ticker', 'suffix': '.DE' },
+    'Dow Jones (USA)': { 'url': 'https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average', 'table_index': 1, 'ticker_col': 'Ticker', 'suffix': '' },
+    'Russell 2000 (USA)': { 'url': 'https://en.wikipedia.org/wiki/Russell_2000_Index', 'table_index': 0, 'ticker_col': 'Symbol', 'suffix': '' }
+}
+
+# États financiers annuels Macrotrends : nom court -> méthode stockdex
+STATEMENT_METHODS = {
+    "income_statement": "macrotrends_income_statement",
+    "balance_sheet": "macrotrends_balance_sheet",
+    "cash_flow": "macrotrends_cash_flow",
+}
+
+_timeout_executor = ThreadPoolExecutor(max_workers=max(1, PROVIDER_TIMEOUT_WORKERS), thread_name_prefix="provider")
+
+
+def build_stock_record(info: Optional[dict]) -> Optional[dict]:
+    """Construit le dictionnaire de données utilisé par le screening à partir d'un payload de type `.info`."""
+    if not info or 'symbol' not in info:
+        return None
+
+    current_price = info.get('currentPrice', info.get('regularMarketPreviousClose'))
+    if not current_price:
+        return None
+
+    return {
+        'symbol': info.get('symbol'), 'company_name': info.get('longName', 'N/A'),
+        'currency': info.get('currency', 'USD'), 'current_price': current_price,
+        'market_cap': info.get('marketCap', 0), 'pe_ratio': info.get('trailingPE'),
+        'pb_ratio': info.get('priceToBook'), 'debt_to_equity': info.get('debtToEquity'),
+        'roe': info.get('returnOnEquity'), 'dividend_yield': info.get('dividendYield', 0),
+        'eps': info.get('trailingEps'), 'bvps': info.get('bookValue')
+    }
+
+
+def chunk_symbols(symbols: List[str], size: int) -> List[List[str]]:
+    """Découpe une liste de symboles en lots de taille `size`."""
+    size = max(1, size)
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+# --- Politique d'appel : délai, nouvelles tentatives et débit ---
+
+class ProviderTimeout(TimeoutError):
+    """Appel à une source de données sans réponse dans le délai configuré"""
+
+
+class RateLimiter:
+    """Espacement minimum entre deux appels d'un fournisseur (appels par seconde), partagé entre threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Réserve le prochain créneau et retourne l'attente nécessaire (secondes)"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval
+        return delay
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+_rate_limiters: Dict[Tuple[str, float], RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def rate_limiter(name: str, rate: float) -> RateLimiter:
+    """Limiteur partagé par toutes les instances d'un même fournisseur"""
+    with _rate_limiters_lock:
+        return _rate_limiters.setdefault((name, rate), RateLimiter(rate))
+
+
+class CallPolicy:
+    """
+    Délai maximum, nouvelles tentatives (attente exponentielle) et débit maximum des appels d'un fournisseur.
+    Chaque valeur est surchargeable par une variable d'environnement préfixée du nom du fournisseur :
+    <NOM>_TIMEOUT (secondes, 0 = aucun), <NOM>_RETRIES, <NOM>_BACKOFF (secondes), <NOM>_RATE_LIMIT (appels/s, 0 = illimité).
+    """
+
+    def __init__(self, name: str, timeout: float = 0.0, retries: int = 0, rate_limit: float = 0.0,
+                 backoff: float = 0.5):
+        self.name = name
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.rate_limit = rate_limit
+        self.backoff = backoff
+        self.limiter = rate_limiter(name, rate_limit)
+
+    @classmethod
+    def from_env(cls, name: str, timeout: float = 0.0, retries: int = 0, rate_limit: float = 0.0,
+                 backoff: float = 0.5) -> "CallPolicy":
+        prefix = name.upper()
+        return cls(
+            name,
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", timeout)),
+            retries=int(os.getenv(f"{prefix}_RETRIES", retries)),
+            rate_limit=float(os.getenv(f"{prefix}_RATE_LIMIT", rate_limit)),
+            backoff=float(os.getenv(f"{prefix}_BACKOFF", backoff))
+        )
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        delay = self.backoff * 2 ** attempt
+        print(f"⚠️  {self.name}: tentative {attempt + 1}/{self.retries + 1} échouée ({error}), nouvel essai dans {delay:.1f}s")
+        return delay
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Exécute `func` selon la politique ; l'erreur de la dernière tentative est propagée"""
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                if not self.timeout:
+                    return func(*args, **kwargs)
+                future = _timeout_executor.submit(func, *args, **kwargs)
+                done, _ = wait([future], timeout=self.timeout)
+                if not done:
+                    raise ProviderTimeout(f"{self.name}: pas de réponse après {self.timeout:g}s")
+                return future.result()
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._retry_delay(attempt, e))
+
+    async def call_async(self, coroutine_factory: Callable):
+        """Variante asynchrone de `call` : `coroutine_factory()` crée la coroutine de chaque tentative"""
+        for attempt in range(self.retries + 1):
+            delay = self.limiter.reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                if not self.timeout:
+                    return await coroutine_factory()
+                try:
+                    return await asyncio.wait_for(coroutine_factory(), self.timeout)
+                except asyncio.TimeoutError:
+                    raise ProviderTimeout(f"{self.name}: pas de réponse après {self.timeout:g}s")
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(attempt, e))
+
+    def describe(self) -> dict:
+        return {"timeout": self.timeout, "retries": self.retries, "rate_limit": self.rate_limit, "backoff": self.backoff}
+
+
+# --- Interface commune ---
+
+class MarketDataProvider:
+    """
+    Interface commune des sources de données de marché. Une source implémente tout ou partie des capacités :
+    cotations par lots, fondamentaux (`.info`), états financiers annuels et composition des indices.
+    """
+
+    name = "base"
+    # Politique d'appel par défaut (surchargeable par variables d'environnement, voir CallPolicy)
+    default_policy = {"timeout": 0.0, "retries": 0, "rate_limit": 0.0}
+
+    def __init__(self, policy: Optional[CallPolicy] = None):
+        self.policy = policy or CallPolicy.from_env(self.name, **self.default_policy)
+
+    def get_quotes(self, symbols: List[str]) -> Tuple[Dict[str, Optional[dict]], Dict[str, float]]:
+        """Cotations et ratios de screening : ({symbole: données ou None}, {symbole: latence en secondes})"""
+        raise NotImplementedError(f"{self.name} ne fournit pas de cotations")
+
+    def get_fundamentals(self, symbol: str) -> Optional[dict]:
+        """Fondamentaux d'un symbole au format `yf.Ticker.info`"""
+        raise NotImplementedError(f"{self.name} ne fournit pas de fondamentaux")
+
+    def get_statements(self, symbol: str):
+        """
+        États financiers annuels d'un symbole : objet exposant les méthodes Macrotrends de stockdex.Ticker
+        (macrotrends_income_statement, macrotrends_balance_sheet, macrotrends_cash_flow)
+        et la propriété digrin_shares_outstanding.
+        """
+        raise NotImplementedError(f"{self.name} ne fournit pas d'états financiers")
+
+    def get_index_constituents(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        """Symboles d'un indice ; `report['source']` reçoit la source utilisée"""
+        raise NotImplementedError(f"{self.name} ne fournit pas la composition des indices")
+
+    async def get_index_constituents_async(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        return await run_blocking(self.get_index_constituents, index_name, report)
+
+
+# --- Cotations ---
+
+class QuoteProvider(MarketDataProvider):
+    """Interface commune des fournisseurs de cotations par lots"""
+
+    name = "base"
+
+    def __init__(self, batch_size: int = QUOTE_BATCH_SIZE, policy: Optional[CallPolicy] = None):
+        super().__init__(policy)
+        self.batch_size = batch_size
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, Optional[dict]]:
+        """Récupère un lot de symboles en un minimum de requêtes. À implémenter par les sous-classes."""
+        raise NotImplementedError
+
+    def get_quotes(self, symbols: List[str]) -> Tuple[Dict[str, Optional[dict]], Dict[str, float]]:
+        """
+        Récupère les données de tous les symboles, lot par lot.
+
+        Returns:
+            Tuple ({symbole: données ou None}, {symbole: latence du lot en secondes})
+        """
+        records, latencies = {}, {}
+        for chunk in chunk_symbols(symbols, self.batch_size):
+            chunk_start = time.time()
+            try:
+                with metrics.upstream_call(self.name, "quotes_batch"):
+                    batch = self.policy.call(self.fetch_batch, chunk)
+            except Exception as e:
+                print(f"Erreur {self.name} pour le lot {chunk[0]}..{chunk[-1]}: {e}")
+                batch = {}
+            elapsed = time.time() - chunk_start
+            for symbol in chunk:
+                records[symbol] = batch.get(symbol)
+                latencies[symbol] = elapsed
+        return records, latencies
+
+
+class YahooQueryProvider(QuoteProvider):
+    """
+    Fournisseur basé sur yahooquery : un seul appel multi-symboles (`quotes`) par lot
+    pour les prix et ratios, complété par le module `financialData` pour D/E et ROE.
+    """
+
+    name = "yahooquery"
+    default_policy = {"timeout": 30.0, "retries": 1, "rate_limit": 0.0}
+
+    def __init__(self, batch_size: int = QUOTE_BATCH_SIZE, max_workers: int = 8, policy: Optional[CallPolicy] = None):
+        super().__init__(batch_size, policy)
+        self.max_workers = max_workers
+        # yahooquery reste une dépendance optionnelle, importée au premier lot
+        # (son import charge selenium et ralentirait le démarrage de l'API)
+        if importlib.util.find_spec("yahooquery") is None:
+            raise ImportError("yahooquery n'est pas installé")
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, Optional[dict]]:
+        from yahooquery import Ticker
+        tickers = Ticker(symbols, asynchronous=True, max_workers=self.max_workers)
+        quotes = tickers.quotes
+        if not isinstance(quotes, dict):
+            return {}
+        financial_data = tickers.financial_data
+        if not isinstance(financial_data, dict):
+            financial_data = {}
+
+        records = {}
+        for symbol in symbols:
+            quote = quotes.get(symbol)
+            if not isinstance(quote, dict):
+                records[symbol] = None
+                continue
+            financials = financial_data.get(symbol)
+            if not isinstance(financials, dict):
+                financials = {}
+            records[symbol] = build_stock_record({
+                'symbol': quote.get('symbol', symbol),
+                'longName': quote.get('longName', quote.get('shortName', 'N/A')),
+                'currency': quote.get('currency', 'USD'),
+                'currentPrice': financials.get('currentPrice', quote.get('regularMarketPrice')),
+                'regularMarketPreviousClose': quote.get('regularMarketPreviousClose'),
+                'marketCap': quote.get('marketCap', 0),
+                'trailingPE': quote.get('trailingPE'),
+                'priceToBook': quote.get('priceToBook'),
+                'debtToEquity': financials.get('debtToEquity'),
+                'returnOnEquity': financials.get('returnOnEquity'),
+                'dividendYield': quote.get('dividendYield', 0),
+                'trailingEps': quote.get('epsTrailingTwelveMonths'),
+                'bookValue': quote.get('bookValue'),
+            })
+        return records
+
+
+class YFinanceProvider(QuoteProvider):
+    """
+    Fournisseur yfinance : fondamentaux `yf.Ticker(...).info` et cotations de secours
+    (un appel `.info` par symbole, exécutés en parallèle)
+    """
+
+    name = "yfinance"
+    default_policy = {"timeout": 20.0, "retries": 1, "rate_limit": 0.0}
+
+    def __init__(self, batch_size: int = QUOTE_BATCH_SIZE, max_workers: int = 8, policy: Optional[CallPolicy] = None):
+        super().__init__(batch_size, policy)
+        self.max_workers = max_workers
+
+    def fetch_info(self, symbol: str) -> Optional[dict]:
+        return yf.Ticker(symbol).info
+
+    def get_fundamentals(self, symbol: str) -> Optional[dict]:
+        with metrics.upstream_call(self.name, "info"):
+            return self.policy.call(self.fetch_info, symbol)
+
+    def get_quotes(self, symbols: List[str]) -> Tuple[Dict[str, Optional[dict]], Dict[str, float]]:
+        latencies = {}
+
+        def fetch(symbol):
+            fetch_start = time.time()
+            try:
+                return build_stock_record(self.get_fundamentals(symbol))
+            except Exception:
+                return None
+            finally:
+                latencies[symbol] = time.time() - fetch_start
+
+        if not symbols:
+            return {}, latencies
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(symbols)))) as executor:
+            # executor.map conserve l'ordre des symboles d'entrée
+            records = dict(zip(symbols, executor.map(fetch, symbols)))
+        return records, latencies
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, Optional[dict]]:
+        return self.get_quotes(symbols)[0]
+
+
+class FakeQuoteProvider(QuoteProvider):
+    """Fournisseur local pour les tests hors ligne, alimenté par des payloads `.info` enregistrés"""
+
+    name = "fake"
+
+    def __init__(self, infos: Dict[str, dict], batch_size: int = QUOTE_BATCH_SIZE, latency: float = 0.0,
+                 policy: Optional[CallPolicy] = None):
+        super().__init__(batch_size, policy)
+        self.infos = infos
+        self.latency = latency
+        self.request_count = 0
+
+    @classmethod
+    def from_json(cls, path: str, **kwargs) -> "FakeQuoteProvider":
+        """Charge les payloads depuis un fichier JSON {symbole: info}."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def fetch_batch(self, symbols: List[str]) -> Dict[str, Optional[dict]]:
+        self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {symbol: build_stock_record(self.infos.get(symbol)) for symbol in symbols}
+
+
+# --- États financiers ---
+
+class _PolicyTicker:
+    """Enveloppe un stockdex.Ticker : chaque état financier est récupéré selon la politique du fournisseur"""
+
+    def __init__(self, ticker, policy: CallPolicy):
+        self._ticker = ticker
+        self._policy = policy
+
+    def __getattr__(self, name):
+        if name == "digrin_shares_outstanding":
+            return self._policy.call(getattr, self._ticker, name)
+        attribute = getattr(self._ticker, name)
+        if name.startswith("macrotrends_") and callable(attribute):
+            return lambda *args, **kwargs: self._policy.call(attribute, *args, **kwargs)
+        return attribute
+
+
+class StockdexProvider(MarketDataProvider):
+    """
+    États financiers Macrotrends via stockdex (Selenium). Aucun délai n'est appliqué par la politique :
+    l'attente d'un navigateur est bornée par CHROME_POOL_TIMEOUT et le chargement de la page par le
+    délai Selenium du navigateur. Un délai abandonnerait l'appel sans libérer son navigateur, et la
+    nouvelle tentative doublerait le travail de Chrome. Les tentatives ne suivent donc qu'un échec terminé.
+    """
+
+    name = "stockdex"
+    default_policy = {"timeout": 0.0, "retries": 1, "rate_limit": 0.0}
+
+    def __init__(self, policy: Optional[CallPolicy] = None):
+        super().__init__(policy)
+        if self.policy.timeout:
+            print(f"⚠️  {self.name}: délai de {self.policy.timeout:g}s ignoré, les appels stockdex sont bornés par le pool Chrome")
+            self.policy.timeout = 0.0
+
+    def get_statements(self, symbol: str):
+        # selenium/stockdex sont chargés au premier besoin (voir startup.load_stockdex)
+        from startup import load_stockdex
+        Ticker = load_stockdex()
+        return _PolicyTicker(Ticker(ticker=symbol, security_type="stock"), self.policy)
+
+
+# --- Composition des indices ---
+
+def get_russell_2000_symbols() -> list:
+    """Récupère les holdings du Russell 2000 via l'ETF IWM (iShares Russell 2000 ETF)"""
+    try:
+        # Essayer d'abord avec yahooquery
+        try:
+            from yahooquery import Ticker
+            iwm = Ticker("IWM")
+            holdings_info = iwm.fund_holding_info
+
+            if holdings_info and 'IWM' in holdings_info:
+                holdings_data = holdings_info['IWM']
+                if 'holdings' in holdings_data:
+                    symbols = []
+                    for holding in holdings_data['holdings']:
+                        if 'symbol' in holding:
+                            symbol = str(holding['symbol']).strip()
+                            if symbol and len(symbol) <= 5 and symbol.replace('.', '').isalnum():
+                                symbols.append(symbol)
+
+                    if symbols:
+                        print(f"Récupéré {len(symbols)} symboles du Russell 2000 via IWM (yahooquery)")
+                        return symbols[:100]  # Limiter à 100 pour les tests
+        except ImportError:
+            print("yahooquery non disponible, tentative avec yfinance...")
+        except Exception as e:
+            print(f"Erreur avec yahooquery: {e}")
+
+        # Fallback avec yfinance pour obtenir des informations de base
+        iwm = yf.Ticker("IWM")
+
+        # Essayer d'obtenir des informations sur l'ETF
+        info = iwm.info
+        if info:
+            print("Informations IWM récupérées, mais pas de holdings détaillés disponibles")
+
+    except Exception as e:
+        print(f"Erreur lors de la récupération des holdings IWM: {e}")
+
+    # Fallback avec des symboles Russell 2000 connus
+    print("Utilisation du fallback avec des symboles Russell 2000 connus")
+    return [
+        "ACIW", "ADTN", "AMED", "AMKR", "ANET", "ARWR", "AVAV", "BCRX", "BMRN", "CARG",
+        "CBSH", "CCOI", "CGNX", "CHDN", "CIEN", "CLNE", "COKE", "CREE", "CROX", "CSGS",
+        "CTXS", "CVBF", "CWST", "DCOM", "DIOD", "DSGX", "EEFT", "EGOV", "ENSG", "EPAM",
+        "EXPO", "FFIV", "FIVN", "FORM", "FRME", "GMED", "GTLS", "HALO", "HCSG", "HELE",
+        "HOMB", "HUBG", "ICUI", "IIVI", "INDB", "INOV", "IPAR", "ISRG", "ITRI", "JKHY"
+    ]
+
+
+def parse_index_symbols(index_name: str, html: str) -> list:
+    """Extrait les symboles d'un indice de sa page Wikipedia (liste vide si la table attendue est absente)."""
+    config = INDEX_CONFIG[index_name]
+    all_tables = pd.read_html(StringIO(html))
+
+    # Vérifie si l'index de la table est valide
+    if config['table_index'] >= len(all_tables):
+        print(f"Erreur: L'index de table {config['table_index']} est invalide pour {index_name}. Tables trouvées: {len(all_tables)}")
+        return []
+
+    df = all_tables[config['table_index']]
+
+    # Vérifie si la colonne du ticker existe
+    if config['ticker_col'] not in df.columns:
+        print(f"Erreur: La colonne '{config['ticker_col']}' n'a pas été trouvée pour {index_name}. Colonnes disponibles: {list(df.columns)}")
+        return []
+
+    raw_tickers = df[config['ticker_col']].tolist()
+    final_symbols = []
+    for ticker in raw_tickers:
+        t = str(ticker).split(' ')[0]
+        if config['suffix'] == '':
+            t = t.replace('.', '-', 1)
+
+        if config['suffix'] and not t.endswith(config['suffix']):
+            final_symbols.append(t + config['suffix'])
+        else:
+            final_symbols.append(t)
+    return final_symbols
+
+
+class WikipediaIndexProvider(MarketDataProvider):
+    """Composition des indices depuis les tables Wikipedia (Russell 2000 : holdings de l'ETF IWM)"""
+
+    name = "wikipedia"
+    default_policy = {"timeout": 15.0, "retries": 2, "rate_limit": 1.0}
+
+    def get_index_constituents(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        report = report if report is not None else {}
+        if index_name == 'Russell 2000 (USA)':
+            report['source'] = 'russell'
+            return get_russell_2000_symbols()
+
+        def fetch_page():
+            response = requests.get(INDEX_CONFIG[index_name]['url'], headers=HTTP_HEADERS, timeout=self.policy.timeout or None)
+            response.raise_for_status()
+            return response.text
+
+        # La politique ne gère ici que les tentatives et le débit, le délai étant appliqué par requests
+        retry_policy = CallPolicy(self.name, 0.0, self.policy.retries, self.policy.rate_limit, self.policy.backoff)
+        with metrics.upstream_call(self.name, "index_page"):
+            html = retry_policy.call(fetch_page)
+        report['source'] = 'wikipedia'
+        return parse_index_symbols(index_name, html)
+
+    async def get_index_constituents_async(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        """Page téléchargée avec le client HTTP partagé, analyse pandas dans l'exécuteur CPU"""
+        report = report if report is not None else {}
+        if index_name == 'Russell 2000 (USA)':
+            # Sources multiples via yahooquery/yfinance, bibliothèques synchrones
+            return await run_blocking(self.get_index_constituents, index_name, report)
+
+        async def fetch_page():
+            response = await get_http_client().get(INDEX_CONFIG[index_name]['url'])
+            response.raise_for_status()
+            return response.text
+
+        with metrics.upstream_call(self.name, "index_page"):
+            html = await self.policy.call_async(fetch_page)
+        report['source'] = 'wikipedia'
+        return await run_cpu(parse_index_symbols, index_name, html)
+
+
+# --- Rejeu local ---
+
+class ReplayTicker:
+    """
+    Remplace stockdex.Ticker : rejoue les tableaux Macrotrends enregistrés dans
+    <fixtures>/macrotrends/<TICKER>.json (métriques en index, dates de clôture en colonnes).
+    """
+
+    def __init__(self, ticker: str, fixtures_dir: str = FIXTURES_DIR, latency: float = 0.0):
+        path = os.path.join(fixtures_dir, "macrotrends", f"{ticker}.json")
+        if not os.path.exists(path):
+            raise ValueError(f"Aucun fixture Macrotrends enregistré pour {ticker}")
+        with open(path, encoding="utf-8") as f:
+            self._payload = json.load(f)
+        self.ticker = ticker
+        self.latency = latency
+
+    def _statement(self, name: str) -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        return pd.DataFrame.from_dict(self._payload[name], orient="index")
+
+    def macrotrends_income_statement(self, frequency: str = "annual") -> pd.DataFrame:
+        return self._statement("income_statement")
+
+    def macrotrends_balance_sheet(self, frequency: str = "annual") -> pd.DataFrame:
+        return self._statement("balance_sheet")
+
+    def macrotrends_cash_flow(self, frequency: str = "annual") -> pd.DataFrame:
+        return self._statement("cash_flow")
+
+    @property
+    def digrin_shares_outstanding(self) -> pd.DataFrame:
+        return pd.DataFrame(self._payload["shares_outstanding"], columns=["date", "shares_outstanding"])
+
+
+class FixtureProvider(FakeQuoteProvider):
+    """
+    Source locale déterministe pour les tests de performance et de charge : cotations et fondamentaux
+    (fixtures/yfinance_info.json), états Macrotrends (fixtures/macrotrends/) et composition des indices
+    (fixtures/indexes.json). `latency` simule le temps de réponse de chaque appel amont.
+    """
+
+    name = "fixtures"
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, infos: Optional[Dict[str, dict]] = None,
+                 indexes: Optional[Dict[str, List[str]]] = None, batch_size: int = QUOTE_BATCH_SIZE,
+                 latency: float = 0.0, policy: Optional[CallPolicy] = None):
+        if infos is None:
+            with open(os.path.join(fixtures_dir, "yfinance_info.json"), encoding="utf-8") as f:
+                infos = json.load(f)
+        if indexes is None:
+            indexes_path = os.path.join(fixtures_dir, "indexes.json")
+            indexes = {}
+            if os.path.exists(indexes_path):
+                with open(indexes_path, encoding="utf-8") as f:
+                    indexes = json.load(f)
+        super().__init__(infos, batch_size, latency, policy)
+        self.fixtures_dir = fixtures_dir
+        self.indexes = indexes
+
+    def get_fundamentals(self, symbol: str) -> Optional[dict]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.infos.get(symbol)
+
+    def get_statements(self, symbol: str) -> ReplayTicker:
+        return ReplayTicker(symbol, self.fixtures_dir, self.latency)
+
+    def statement_symbols(self) -> List[str]:
+        """Tickers dont les états financiers sont enregistrés"""
+        directory = os.path.join(self.fixtures_dir, "macrotrends")
+        return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+
+    def get_index_constituents(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        if report is not None:
+            report['source'] = 'fixtures'
+        return list(self.indexes.get(index_name, []))
+
+    async def get_index_constituents_async(self, index_name: str, report: Optional[dict] = None) -> List[str]:
+        return self.get_index_constituents(index_name, report)
+
+
+# --- Sélection des fournisseurs ---
+
+def get_quote_provider(name: str = QUOTE_PROVIDER, max_workers: int = 8) -> QuoteProvider:
+    """Retourne le fournisseur configuré, yahooquery si disponible en mode 'auto'."""
+    if name == "fixtures":
+        return FixtureProvider()
+    if name in ("auto", "yahooquery"):
+        try:
+            return YahooQueryProvider(max_workers=max_workers)
+        except ImportError:
+            if name == "yahooquery":
+                raise
+            print("yahooquery non disponible, utilisation de yfinance pour les cotations")
+    return YFinanceProvider(max_workers=max_workers)
+
+
+def _select_provider(capability: str, name: str, providers: Dict[str, Callable[[], MarketDataProvider]]) -> MarketDataProvider:
+    if name not in providers:
+        raise ValueError(f"Fournisseur de {capability} inconnu: '{name}' (disponibles: {', '.join(providers)})")
+    return providers[name]()
+
+
+def get_statements_provider(name: str = STATEMENTS_PROVIDER) -> MarketDataProvider:
+    """Fournisseur des états financiers annuels : 'stockdex' ou 'fixtures'"""
+    return _select_provider("états financiers", name, {"stockdex": StockdexProvider, "fixtures": FixtureProvider})
+
+
+def get_index_provider(name: str = INDEX_PROVIDER) -> MarketDataProvider:
+    """Fournisseur de la composition des indices : 'wikipedia' ou 'fixtures'"""
+    return _select_provider("composition d'indices", name, {"wikipedia": WikipediaIndexProvider, "fixtures": FixtureProvider})
+
+
+def describe_providers(**providers: MarketDataProvider) -> Dict[str, dict]:
+    """Fournisseur actif de chaque capacité et sa politique d'appel (pour /cache/stats)"""
+    return {capability: {"provider": provider.name, **provider.policy.describe()}
+            for capability, provider in providers.items()}
@@ -1,32 +1,271 @@
 # database.py - Configuration et modèles de base de données
 import sqlite3
+import functools
 import json
+import queue
 import redis
 import os
+import socket
+import threading
+import time
+import numbers
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
 import logging
 
+import metrics
+
 # Configuration
 DATABASE_PATH = os.getenv("DATABASE_PATH", "screener.db")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 heure par défaut
+# Stale-while-revalidate : durée (secondes) après CACHE_TTL pendant laquelle une valeur périmée
+# est encore servie immédiatement pendant qu'un rafraîchissement tourne en arrière-plan
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "3600"))
+CACHE_REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+
+# Regroupement des calculs concurrents (single-flight) pour cache_api_response
+SINGLE_FLIGHT_LOCK_TTL = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "120"))  # durée max d'un verrou Redis (secondes)
+SINGLE_FLIGHT_POLL_INTERVAL = 0.2  # secondes entre deux vérifications du cache par les autres workers
+
+# Cache mémoire de secours (utilisé quand Redis n'est pas disponible)
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "5000"))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 Mo
+MEMORY_CACHE_SWEEP_INTERVAL = int(os.getenv("MEMORY_CACHE_SWEEP_INTERVAL", "60"))  # secondes, 0 = désactivé
+
+# Déploiement multi-workers : sans Redis, le cache est partagé entre les workers d'un même hôte
+# via un fichier SQLite ('auto' l'active dès que WEB_CONCURRENCY > 1)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "auto")  # 'auto', 'memory' ou 'sqlite' (Redis si REDIS_URL est défini)
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "screener_cache.db")
+
+# Pool de connexions SQLite
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # secondes d'attente max d'une connexion libre
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))  # ~20 Mo de cache de pages par connexion
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 Mo
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+
+# Version du schéma (PRAGMA user_version) et colonnes de la table normalisée des résultats
+SCHEMA_VERSION = 6
+RESULT_COLUMNS = [
+    'symbol', 'company_name', 'currency', 'current_price', 'market_cap', 'pe_ratio', 'pb_ratio',
+    'debt_to_equity', 'roe', 'dividend_yield', 'eps', 'bvps', 'score', 'intrinsic_value'
+]
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def worker_id() -> str:
+    """Identifiant du processus worker courant (hôte:pid), enregistré sur les jobs qu'il exécute"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def is_other_worker_alive(worker: Optional[str]) -> bool:
+    """
+    Indique si `worker` désigne un autre processus encore vivant. Un worker d'un autre hôte
+    est supposé vivant ; le processus courant ne l'est pas (ses jobs sont à reprendre).
+    """
+    if not worker or worker == worker_id():
+        return False
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class TimedCursor(sqlite3.Cursor):
+    """Curseur qui mesure chaque requête (histogramme SQLite par opération et table)"""
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.observe_query(sql, time.perf_counter() - start)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.observe_query(sql, time.perf_counter() - start)
+
+class TimedConnection(sqlite3.Connection):
+    """Connexion dont les requêtes passent toutes par TimedCursor (y compris conn.execute)"""
+    
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+class SQLiteConnectionPool:
+    """
+    Pool de connexions SQLite thread-safe.
+    Les connexions sont ouvertes à la demande (jusqu'à `size`), configurées en WAL
+    et conservées : leur cache de requêtes préparées est réutilisé d'un appel à l'autre.
+    """
+    
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+    
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # Une connexion n'est utilisée que par un thread à la fois via le pool
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+            factory=TimedConnection
+        )
+        conn.row_factory = sqlite3.Row  # Pour accès par nom de colonne
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Emprunte une connexion, en attendant au plus `timeout` secondes si le pool est plein"""
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._create_connection()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Aucune connexion SQLite libre après {self.timeout}s (pool de {self.size})"
+                    )
+        
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if wait > 0.001:
+                self._waits += 1
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Rend une connexion au pool en annulant toute transaction restée ouverte"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Connexion inutilisable : on la ferme et on libère sa place
+            conn.close()
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+            return
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(conn)
+    
+    def close_all(self):
+        """Ferme toutes les connexions inactives"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du pool (temps d'attente en millisecondes)"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open_connections": self._created,
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "waited_checkouts": self._waits,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._total_wait / self._checkouts * 1000) if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait * 1000
+            }
+
 class DatabaseManager:
     """Gestionnaire de base de données SQLite pour la persistance"""
     
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(self, db_path: str = DATABASE_PATH, pool_size: int = DB_POOL_SIZE, lazy: bool = False):
+        """
+        `lazy=True` : le schéma et les migrations (et le passage en WAL) ne sont appliqués qu'au premier
+        accès, pas à la construction. Utilisé par l'instance globale pour qu'importer ce module
+        ne modifie pas le fichier de base de données.
+        """
         self.db_path = db_path
-        self.init_database()
+        self.pool = SQLiteConnectionPool(db_path, size=pool_size)
+        self._write_lock = threading.Lock()
+        self._init_lock = threading.RLock()
+        self._schema_ready = False
+        if not lazy:
+            self.init_database()
+    
+    def _ensure_schema(self):
+        """Initialise la base au premier accès (instances créées avec lazy=True)"""
+        if self._schema_ready:
+            return
+        with self._init_lock:
+            if not self._schema_ready:
+                self.init_database()
     
     def init_database(self):
-        """Initialise la base de données avec les tables nécessaires"""
-        with self.get_connection() as conn:
+        """
+        Initialise la base de données avec les tables nécessaires.
+        Tout se fait dans une seule transaction d'écriture : des workers démarrés en même temps
+        appliquent les migrations l'un après l'autre.
+        """
+        with self._init_lock:
+            self._create_schema()
+            self._schema_ready = True
+        logger.info("Base de données initialisée avec succès")
+    
+    def _create_schema(self):
+        # Chemin d'écriture brut : ne repasse pas par _ensure_schema
+        with self._write_transaction() as conn:
             cursor = conn.cursor()
             
             # Table des screenings
@@ -72,23 +311,219 @@ class DatabaseManager:
                 )
             """)
             
-            conn.commit()
-            logger.info("Base de données initialisée avec succès")
+            self.migrate(conn)
+    
+    def migrate(self, conn: sqlite3.Connection):
+        """
+        Applique les migrations de schéma manquantes (suivies via PRAGMA user_version).
+        Chaque étape est idempotente et s'applique aussi aux fichiers screener.db existants.
+        """
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        cursor = conn.cursor()
+        if version < 1:
+            # Index pour l'historique et table normalisée des résultats
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_screenings_timestamp ON screenings(timestamp DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_screenings_index_name ON screenings(index_name, timestamp DESC)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS screening_results (
+                    screening_id INTEGER NOT NULL REFERENCES screenings(id) ON DELETE CASCADE,
+                    rank INTEGER NOT NULL,   -- position dans les résultats triés
+                    symbol TEXT NOT NULL,
+                    company_name TEXT,
+                    currency TEXT,
+                    current_price REAL,
+                    market_cap INTEGER,
+                    pe_ratio REAL,
+                    pb_ratio REAL,
+                    debt_to_equity REAL,
+                    roe REAL,
+                    dividend_yield REAL,
+                    eps REAL,
+                    bvps REAL,
+                    score REAL,
+                    intrinsic_value REAL,
+                    PRIMARY KEY (screening_id, rank)
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_screening_results_symbol ON screening_results(symbol, score)")
+            
+            # Reprise des résultats JSON des screenings existants
+            cursor.execute("""
+                SELECT id, results FROM screenings
+                WHERE id NOT IN (SELECT DISTINCT screening_id FROM screening_results)
+            """)
+            migrated = 0
+            for row in cursor.fetchall():
+                try:
+                    results = json.loads(row['results'])
+                except (TypeError, ValueError):
+                    continue
+                self._insert_result_rows(conn, row['id'], results)
+                migrated += 1
+            logger.info(f"Migration v1 : {migrated} screenings normalisés")
+        
+        if version < 2:
+            # Magasin des états financiers nettoyés : une ligne par ticker, état et exercice fiscal
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS financial_statements (
+                    ticker TEXT NOT NULL,
+                    statement TEXT NOT NULL,     -- 'income', 'balance_sheet' ou 'cash_flow'
+                    fiscal_year INTEGER NOT NULL,
+                    period_end TEXT NOT NULL,    -- date de clôture ISO (AAAA-MM-JJ)
+                    data TEXT NOT NULL,          -- JSON {colonne: valeur} de l'exercice
+                    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (ticker, statement, fiscal_year)
+                )
+            """)
+            logger.info("Migration v2 : table financial_statements créée")
+        
+        if version < 3:
+            # Jobs DCF par indice et leurs résultats par symbole
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dcf_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    index_name TEXT NOT NULL,
+                    symbols TEXT NOT NULL,       -- JSON array des symboles à valoriser
+                    status TEXT NOT NULL,        -- 'pending', 'running', 'completed' ou 'failed'
+                    total INTEGER NOT NULL,
+                    completed INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    error TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    started_at DATETIME,
+                    finished_at DATETIME
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS dcf_job_results (
+                    job_id INTEGER NOT NULL REFERENCES dcf_jobs(id) ON DELETE CASCADE,
+                    symbol TEXT NOT NULL,
+                    status TEXT NOT NULL,        -- 'ok' ou 'error'
+                    current_price REAL,
+                    intrinsic_value REAL,        -- scénario prospectif
+                    intrinsic_value_historical REAL,
+                    upside REAL,                 -- valeur intrinsèque / cours - 1
+                    error TEXT,
+                    PRIMARY KEY (job_id, symbol)
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_dcf_job_results_upside ON dcf_job_results(job_id, upside DESC)")
+            logger.info("Migration v3 : tables dcf_jobs et dcf_job_results créées")
+        
+        if version < 4:
+            # File d'attente persistante des jobs de screening
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS screening_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    index_name TEXT NOT NULL,
+                    criteria TEXT NOT NULL,      -- JSON des critères
+                    use_snapshot INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL,        -- 'pending', 'running', 'completed' ou 'failed'
+                    processed INTEGER DEFAULT 0, -- actions notées jusqu'ici
+                    screening_id INTEGER REFERENCES screenings(id) ON DELETE SET NULL,
+                    total_results INTEGER,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    started_at DATETIME,
+                    finished_at DATETIME
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_screening_jobs_status ON screening_jobs(status, id)")
+            logger.info("Migration v4 : table screening_jobs créée")
+        
+        if version < 5:
+            # Worker (hôte:pid) propriétaire des jobs en cours, pour ne reprendre que ceux des workers arrêtés
+            self._add_column(conn, "screening_jobs", "worker", "TEXT")
+            self._add_column(conn, "dcf_jobs", "worker", "TEXT")
+            logger.info("Migration v5 : colonne worker ajoutée aux jobs")
+        
+        if version < 6:
+            # Durée de chaque étape du screening (JSON) : symboles, récupération, notation, sauvegarde
+            self._add_column(conn, "screenings", "timings", "TEXT")
+            logger.info("Migration v6 : colonne timings ajoutée aux screenings")
+        
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    
+    @staticmethod
+    def _add_column(conn: sqlite3.Connection, table: str, column: str, declaration: str):
+        """Ajoute une colonne si elle n'existe pas encore (ALTER TABLE n'est pas idempotent)"""
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    
+    @staticmethod
+    def _insert_result_rows(conn: sqlite3.Connection, screening_id: int, results: list):
+        """Insère les résultats d'un screening dans la table normalisée"""
+        def column_value(result, column):
+            value = result.get(column)
+            if column in ('symbol', 'company_name', 'currency'):
+                return None if value is None else str(value)
+            if isinstance(value, numbers.Real) and value == value:  # exclut NaN
+                return value
+            return None
+        
+        rows = [
+            (screening_id, rank, *(column_value(result, column) for column in RESULT_COLUMNS))
+            for rank, result in enumerate(results)
+            if isinstance(result, dict) and result.get('symbol')
+        ]
+        conn.executemany(f"""
+            INSERT OR IGNORE INTO screening_results (screening_id, rank, {', '.join(RESULT_COLUMNS)})
+            VALUES ({', '.join('?' * (len(RESULT_COLUMNS) + 2))})
+        """, rows)
     
     @contextmanager
-    def get_connection(self):
-        """Context manager pour les connexions SQLite"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accès par nom de colonne
+    def _pooled_connection(self):
+        conn = self.pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            self.pool.release(conn)
+    
+    @contextmanager
+    def get_connection(self):
+        """Context manager pour les connexions SQLite (empruntées au pool)"""
+        self._ensure_schema()
+        with self._pooled_connection() as conn:
+            yield conn
+    
+    @contextmanager
+    def write_transaction(self):
+        """
+        Transaction d'écriture sérialisée, validée en sortie et annulée sur exception.
+        Les threads du processus passent un par un (verrou local) et BEGIN IMMEDIATE réserve
+        le verrou d'écriture SQLite dès le début : entre workers, l'attente se fait sur le
+        busy timeout au lieu d'échouer sur 'database is locked' au moment du COMMIT.
+        """
+        # Schéma initialisé avant de prendre le verrou d'écriture (l'initialisation écrit elle-même)
+        self._ensure_schema()
+        with self._write_transaction() as conn:
+            yield conn
+    
+    @contextmanager
+    def _write_transaction(self):
+        with self._write_lock, self._pooled_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
     
     def save_screening_result(self, index_name: str, criteria: dict, 
-                            results: list, execution_time: float) -> int:
-        """Sauvegarde un résultat de screening"""
-        with self.get_connection() as conn:
+                            results: list, execution_time: float, timings: Optional[dict] = None) -> int:
+        """
+        Sauvegarde un résultat de screening (écriture sérialisée entre workers).
+        `timings` reçoit la durée de la sauvegarde (clé 'save') avant d'être enregistré.
+        """
+        save_start = time.perf_counter()
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO screenings (index_name, criteria, results, total_results, execution_time)
@@ -100,8 +535,12 @@ class DatabaseManager:
                 len(results),
                 execution_time
             ))
-            conn.commit()
-            return cursor.lastrowid
+            screening_id = cursor.lastrowid
+            self._insert_result_rows(conn, screening_id, results)
+            if timings is not None:
+                timings['save'] = {'seconds': round(time.perf_counter() - save_start, 4), 'rows': len(results)}
+                cursor.execute("UPDATE screenings SET timings = ? WHERE id = ?", (json.dumps(timings), screening_id))
+            return screening_id
     
     def get_screening_history(self, limit: int = 50) -> List[Dict]:
         """Récupère l'historique des screenings"""
@@ -116,25 +555,66 @@ class DatabaseManager:
             
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_screening(self, screening_id: int) -> Optional[Dict]:
+        """Récupère un screening complet, résultats lus depuis la table normalisée"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, timestamp, index_name, criteria, total_results, execution_time, timings
+                FROM screenings WHERE id = ?
+            """, (screening_id,))
+            record = cursor.fetchone()
+            if not record:
+                return None
+            
+            screening = dict(record)
+            screening['criteria'] = json.loads(screening['criteria'])
+            screening['timings'] = json.loads(screening['timings']) if screening['timings'] else None
+            cursor.execute(f"""
+                SELECT {', '.join(RESULT_COLUMNS)} FROM screening_results
+                WHERE screening_id = ? ORDER BY rank
+            """, (screening_id,))
+            screening['results'] = [dict(row) for row in cursor.fetchall()]
+            
+            # Screening dont les résultats n'ont pas pu être normalisés : lecture du JSON d'origine
+            if not screening['results'] and screening['total_results']:
+                cursor.execute("SELECT results FROM screenings WHERE id = ?", (screening_id,))
+                screening['results'] = json.loads(cursor.fetchone()['results'])
+            return screening
+    
+    def get_symbol_history(self, symbol: str, min_score: Optional[float] = None, limit: int = 100) -> List[Dict]:
+        """Récupère tous les screenings où un symbole apparaît (requête indexée sur symbol, score)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.id AS screening_id, s.timestamp, s.index_name, r.rank, r.score,
+                       r.current_price, r.pe_ratio, r.pb_ratio, r.debt_to_equity, r.roe, r.intrinsic_value
+                FROM screening_results r
+                JOIN screenings s ON s.id = r.screening_id
+                WHERE r.symbol = ? AND r.score >= ?
+                ORDER BY s.timestamp DESC
+                LIMIT ?
+            """, (symbol, min_score if min_score is not None else float('-inf'), limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
     def delete_screening(self, screening_id: int) -> bool:
         """Supprime un screening de l'historique"""
-        with self.get_connection() as conn:
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute("DELETE FROM screening_results WHERE screening_id = ?", (screening_id,))
             cursor.execute("""
                 DELETE FROM screenings WHERE id = ?
             """, (screening_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
     def cache_financial_data(self, ticker: str, data: dict, source: str):
         """Met en cache les données financières"""
-        with self.get_connection() as conn:
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO financial_cache (ticker, data, source, last_updated)
                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)
             """, (ticker, json.dumps(data), source))
-            conn.commit()
     
     def get_cached_financial_data(self, ticker: str, max_age_hours: int = 24) -> Optional[Dict]:
         """Récupère les données financières en cache si elles sont récentes"""
@@ -142,23 +622,252 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT data, last_updated FROM financial_cache
-                WHERE ticker = ? AND last_updated > datetime('now', '-{} hours')
-            """.format(max_age_hours), (ticker,))
+                WHERE ticker = ? AND last_updated > datetime('now', ?)
+            """, (ticker, f'-{max_age_hours} hours'))
             
             row = cursor.fetchone()
             if row:
                 return json.loads(row['data'])
             return None
     
+    def save_financial_statements(self, ticker: str, rows: List[Tuple[str, str, dict]]):
+        """
+        Remplace les états financiers stockés d'un ticker.
+        
+        Args:
+            rows: Liste de tuples (état, date de clôture ISO, {colonne: valeur})
+        """
+        with self.write_transaction() as conn:
+            conn.execute("DELETE FROM financial_statements WHERE ticker = ?", (ticker,))
+            conn.executemany("""
+                INSERT OR REPLACE INTO financial_statements (ticker, statement, fiscal_year, period_end, data)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (ticker, statement, int(period_end[:4]), period_end, json.dumps(data))
+                for statement, period_end, data in rows
+            ])
+    
+    def get_financial_statements(self, ticker: str) -> Optional[Dict]:
+        """
+        Récupère les états financiers stockés d'un ticker.
+        
+        Returns:
+            {'fetched_at': datetime, 'statements': {état: {date de clôture: {colonne: valeur}}}} ou None
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT statement, period_end, data, fetched_at FROM financial_statements
+                WHERE ticker = ? ORDER BY statement, fiscal_year
+            """, (ticker,))
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+            
+            statements = {}
+            for row in rows:
+                statements.setdefault(row['statement'], {})[row['period_end']] = json.loads(row['data'])
+            return {
+                'fetched_at': min(datetime.fromisoformat(row['fetched_at']) for row in rows),
+                'statements': statements
+            }
+    
+    def touch_financial_statements(self, ticker: str):
+        """Marque les états stockés d'un ticker comme vérifiés maintenant (aucun nouvel exercice trouvé)"""
+        with self.write_transaction() as conn:
+            conn.execute("UPDATE financial_statements SET fetched_at = CURRENT_TIMESTAMP WHERE ticker = ?", (ticker,))
+    
+    def create_dcf_job(self, index_name: str, symbols: List[str]) -> int:
+        """Enregistre un job DCF en attente pour les symboles d'un indice, attribué au worker courant"""
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO dcf_jobs (index_name, symbols, status, total, worker) VALUES (?, ?, 'pending', ?, ?)
+            """, (index_name, json.dumps(symbols), len(symbols), worker_id()))
+            return cursor.lastrowid
+    
+    def update_dcf_job_status(self, job_id: int, status: str, error: Optional[str] = None):
+        """Met à jour le statut d'un job DCF (et ses dates de début ou de fin)"""
+        timestamp_column = {'running': 'started_at', 'completed': 'finished_at', 'failed': 'finished_at'}.get(status)
+        with self.write_transaction() as conn:
+            conn.execute(f"""
+                UPDATE dcf_jobs SET status = ?, error = ?
+                {f", {timestamp_column} = CURRENT_TIMESTAMP" if timestamp_column else ""}
+                WHERE id = ?
+            """, (status, error, job_id))
+    
+    def save_dcf_job_result(self, job_id: int, result: Dict):
+        """Enregistre la valorisation d'un symbole et fait avancer la progression du job"""
+        columns = ['symbol', 'status', 'current_price', 'intrinsic_value', 'intrinsic_value_historical', 'upside', 'error']
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO dcf_job_results (job_id, {', '.join(columns)})
+                VALUES (?, {', '.join('?' * len(columns))})
+            """, (job_id, *(result.get(column) for column in columns)))
+            if cursor.rowcount:
+                counter = 'completed' if result.get('status') == 'ok' else 'failed'
+                cursor.execute(f"UPDATE dcf_jobs SET {counter} = {counter} + 1 WHERE id = ?", (job_id,))
+    
+    def get_dcf_job(self, job_id: int) -> Optional[Dict]:
+        """Récupère l'état et la progression d'un job DCF"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, index_name, status, total, completed, failed, error,
+                       created_at, started_at, finished_at
+                FROM dcf_jobs WHERE id = ?
+            """, (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_dcf_job_symbols(self, job_id: int) -> Tuple[List[str], set]:
+        """Retourne (symboles du job, symboles déjà valorisés) pour reprendre un job interrompu"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT symbols FROM dcf_jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            if not row:
+                return [], set()
+            cursor.execute("SELECT symbol FROM dcf_job_results WHERE job_id = ?", (job_id,))
+            return json.loads(row['symbols']), {r['symbol'] for r in cursor.fetchall()}
+    
+    def get_unfinished_dcf_jobs(self) -> List[int]:
+        """Identifiants des jobs DCF en attente ou interrompus en cours d'exécution"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM dcf_jobs WHERE status IN ('pending', 'running') ORDER BY id")
+            return [row['id'] for row in cursor.fetchall()]
+    
+    def claim_unfinished_dcf_jobs(self) -> List[int]:
+        """
+        Attribue au worker courant les jobs DCF inachevés dont le worker propriétaire s'est arrêté
+        et retourne leurs identifiants (les jobs des autres workers vivants ne sont pas repris).
+        """
+        with self.write_transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, worker FROM dcf_jobs WHERE status IN ('pending', 'running') ORDER BY id"
+            ).fetchall()
+            job_ids = [row['id'] for row in rows if not is_other_worker_alive(row['worker'])]
+            conn.executemany("UPDATE dcf_jobs SET worker = ? WHERE id = ?", [(worker_id(), job_id) for job_id in job_ids])
+            return job_ids
+    
+    def get_dcf_job_results(self, job_id: int, with_screening: bool = False) -> List[Dict]:
+        """
+        Résultats d'un job DCF classés par potentiel de hausse décroissant.
+        Avec `with_screening`, chaque ligne reçoit le score et le rang du symbole
+        dans le dernier screening du même indice.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if with_screening:
+                cursor.execute("""
+                    SELECT r.symbol, r.status, r.current_price, r.intrinsic_value, r.intrinsic_value_historical,
+                           r.upside, r.error, s.score AS screening_score, s.rank AS screening_rank
+                    FROM dcf_job_results r
+                    JOIN dcf_jobs j ON j.id = r.job_id
+                    LEFT JOIN screening_results s ON s.symbol = r.symbol AND s.screening_id = (
+                        SELECT id FROM screenings WHERE index_name = j.index_name
+                        ORDER BY timestamp DESC, id DESC LIMIT 1
+                    )
+                    WHERE r.job_id = ?
+                    ORDER BY r.upside IS NULL, r.upside DESC
+                """, (job_id,))
+            else:
+                cursor.execute("""
+                    SELECT symbol, status, current_price, intrinsic_value, intrinsic_value_historical, upside, error
+                    FROM dcf_job_results WHERE job_id = ?
+                    ORDER BY upside IS NULL, upside DESC
+                """, (job_id,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def create_screening_job(self, index_name: str, criteria: dict, use_snapshot: bool = True) -> int:
+        """Ajoute un job de screening à la file d'attente"""
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO screening_jobs (index_name, criteria, use_snapshot, status) VALUES (?, ?, ?, 'pending')
+            """, (index_name, json.dumps(criteria), int(use_snapshot)))
+            return cursor.lastrowid
+    
+    def claim_next_screening_job(self) -> Optional[Dict]:
+        """
+        Réserve le plus ancien job en attente pour le worker courant (passage à 'running'
+        dans une transaction d'écriture, donc atomique entre workers) et le retourne
+        """
+        with self.write_transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM screening_jobs WHERE status = 'pending' ORDER BY id LIMIT 1")
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute("""
+                UPDATE screening_jobs
+                SET status = 'running', started_at = CURRENT_TIMESTAMP, attempts = attempts + 1, worker = ?
+                WHERE id = ?
+            """, (worker_id(), row['id']))
+            cursor.execute("SELECT id, index_name, criteria, use_snapshot, attempts FROM screening_jobs WHERE id = ?", (row['id'],))
+            job = dict(cursor.fetchone())
+            job['criteria'] = json.loads(job['criteria'])
+            job['use_snapshot'] = bool(job['use_snapshot'])
+            return job
+    
+    def update_screening_job_progress(self, job_id: int, processed: int):
+        """Met à jour le nombre d'actions notées par un job en cours"""
+        with self.write_transaction() as conn:
+            conn.execute("UPDATE screening_jobs SET processed = ? WHERE id = ?", (processed, job_id))
+    
+    def finish_screening_job(self, job_id: int, screening_id: Optional[int] = None, total_results: int = 0,
+                             error: Optional[str] = None):
+        """Marque un job comme terminé ('completed') ou en échec ('failed' si `error`)"""
+        with self.write_transaction() as conn:
+            conn.execute("""
+                UPDATE screening_jobs
+                SET status = ?, screening_id = ?, total_results = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, ('failed' if error else 'completed', screening_id, total_results, error, job_id))
+    
+    def requeue_running_screening_jobs(self) -> int:
+        """
+        Remet en attente les jobs interrompus par l'arrêt de leur worker. Les jobs en cours
+        dans d'autres workers encore vivants ne sont pas touchés.
+        """
+        with self.write_transaction() as conn:
+            rows = conn.execute("SELECT id, worker FROM screening_jobs WHERE status = 'running'").fetchall()
+            job_ids = [row['id'] for row in rows if not is_other_worker_alive(row['worker'])]
+            conn.executemany(
+                "UPDATE screening_jobs SET status = 'pending', processed = 0, worker = NULL WHERE id = ?",
+                [(job_id,) for job_id in job_ids]
+            )
+            return len(job_ids)
+    
+    def get_screening_job(self, job_id: int) -> Optional[Dict]:
+        """Récupère l'état d'un job de screening et sa position dans la file d'attente"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, index_name, criteria, status, processed, screening_id, total_results, error,
+                       attempts, created_at, started_at, finished_at,
+                       CASE WHEN status = 'pending' THEN (
+                           SELECT COUNT(*) FROM screening_jobs p WHERE p.status = 'pending' AND p.id < j.id
+                       ) END AS queue_position
+                FROM screening_jobs j WHERE id = ?
+            """, (job_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            job = dict(row)
+            job['criteria'] = json.loads(job['criteria'])
+            return job
+    
     def cache_index_symbols(self, index_name: str, symbols: List[str]):
         """Met en cache les symboles d'un indice"""
-        with self.get_connection() as conn:
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO index_symbols (index_name, symbols, last_updated)
                 VALUES (?, ?, CURRENT_TIMESTAMP)
             """, (index_name, json.dumps(symbols)))
-            conn.commit()
     
     def get_cached_index_symbols(self, index_name: str, max_age_hours: int = 24) -> Optional[List[str]]:
         """Récupère les symboles d'un indice en cache si ils sont récents"""
@@ -166,8 +875,8 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT symbols FROM index_symbols
-                WHERE index_name = ? AND last_updated > datetime('now', '-{} hours')
-            """.format(max_age_hours), (index_name,))
+                WHERE index_name = ? AND last_updated > datetime('now', ?)
+            """, (index_name, f'-{max_age_hours} hours'))
             
             row = cursor.fetchone()
             if row:
@@ -176,21 +885,19 @@ class DatabaseManager:
 
     def add_to_watchlist(self, user_id: str, ticker: str, notes: Optional[str] = None) -> int:
         """Ajoute un ticker à la watchlist d'un utilisateur"""
-        with self.get_connection() as conn:
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO watchlists (user_id, ticker, notes)
                 VALUES (?, ?, ?)
             """, (user_id, ticker, notes))
-            conn.commit()
             return cursor.lastrowid
 
     def remove_from_watchlist(self, watchlist_id: int) -> bool:
         """Supprime un élément de la watchlist par son ID"""
-        with self.get_connection() as conn:
+        with self.write_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM watchlists WHERE id = ?", (watchlist_id,))
-            conn.commit()
             return cursor.rowcount > 0
 
     def get_watchlist(self, user_id: str) -> List[Dict]:
@@ -212,17 +919,294 @@ class DatabaseManager:
             cursor.execute("SELECT 1 FROM watchlists WHERE user_id = ? AND ticker = ?", (user_id, ticker))
             return cursor.fetchone() is not None
 
+class MemoryCache:
+    """
+    Cache en mémoire borné : nombre d'entrées et taille (octets JSON estimés) maximum,
+    éviction LRU et purge périodique des entrées expirées par un thread de fond.
+    """
+    
+    def __init__(self, max_entries: int = MEMORY_CACHE_MAX_ENTRIES, max_bytes: int = MEMORY_CACHE_MAX_BYTES,
+                 sweep_interval: int = MEMORY_CACHE_SWEEP_INTERVAL):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._entries = OrderedDict()  # clé -> (valeur, expiration monotone, taille)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._stop_sweeper = threading.Event()
+        if sweep_interval > 0:
+            sweeper = threading.Thread(target=self._sweep_loop, args=(sweep_interval,),
+                                       name="memory-cache-sweeper", daemon=True)
+            sweeper.start()
+    
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return len(repr(value))
+    
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+    
+    def set(self, key: str, value: Any, ttl: int = CACHE_TTL):
+        size = self._estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                logger.warning(f"⚠️  Valeur trop volumineuse pour le cache mémoire ({size} octets): {key}")
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))  # entrée la moins récemment utilisée
+                self.evictions += 1
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+    
+    def delete_matching(self, substring: str) -> int:
+        """Supprime les clés contenant `substring` et retourne leur nombre"""
+        with self._lock:
+            keys = [k for k in self._entries if substring in k]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def sweep(self) -> int:
+        """Supprime les entrées expirées et retourne leur nombre"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, expires, _) in self._entries.items() if expires <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+    
+    def _sweep_loop(self, interval: int):
+        while not self._stop_sweeper.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ Erreur purge cache mémoire: {e}")
+    
+    def close(self):
+        """Arrête le thread de purge"""
+        self._stop_sweeper.set()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+class SQLiteCache:
+    """
+    Cache partagé par les workers d'un même hôte, stocké dans un fichier SQLite en WAL.
+    Même interface que MemoryCache (valeurs sérialisées en JSON, expiration en temps réel),
+    plus des verrous à expiration qui remplacent les verrous Redis du single-flight.
+    """
+    
+    def __init__(self, db_path: str = SHARED_CACHE_PATH, pool_size: int = DB_POOL_SIZE,
+                 sweep_interval: int = MEMORY_CACHE_SWEEP_INTERVAL):
+        self.db_path = db_path
+        self.pool = SQLiteConnectionPool(db_path, size=pool_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,         -- JSON
+                    expires_at REAL NOT NULL     -- horodatage Unix
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_locks (
+                    name TEXT PRIMARY KEY,
+                    token TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+        self._stop_sweeper = threading.Event()
+        if sweep_interval > 0:
+            sweeper = threading.Thread(target=self._sweep_loop, args=(sweep_interval,),
+                                       name="shared-cache-sweeper", daemon=True)
+            sweeper.start()
+    
+    @contextmanager
+    def _connection(self):
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+    
+    def _count(self, hit: bool, expired: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if expired:
+                self.expirations += 1
+    
+    def set(self, key: str, value: Any, ttl: int = CACHE_TTL):
+        payload = json.dumps(value)
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, payload, time.time() + ttl))
+            conn.commit()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(hit=False)
+                return None
+            if row['expires_at'] <= time.time():
+                conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, time.time()))
+                conn.commit()
+                self._count(hit=False, expired=True)
+                return None
+        self._count(hit=True)
+        return json.loads(row['value'])
+    
+    def delete(self, key: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.commit()
+    
+    def delete_matching(self, substring: str) -> int:
+        """Supprime les clés contenant `substring` et retourne leur nombre"""
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM cache_entries WHERE instr(key, ?) > 0", (substring,))
+            conn.commit()
+            return cursor.rowcount
+    
+    def sweep(self) -> int:
+        """Supprime les entrées et verrous expirés et retourne le nombre d'entrées supprimées"""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM cache_locks WHERE expires_at <= ?", (now,))
+            conn.commit()
+        with self._lock:
+            self.expirations += cursor.rowcount
+        return cursor.rowcount
+    
+    def _sweep_loop(self, interval: int):
+        while not self._stop_sweeper.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ Erreur purge cache partagé: {e}")
+    
+    def acquire_lock(self, name: str, ttl: int = SINGLE_FLIGHT_LOCK_TTL) -> Optional[str]:
+        """Pose un verrou partagé entre les workers ; retourne son jeton, ou None s'il est déjà détenu"""
+        token = f"{worker_id()}:{threading.get_ident()}:{time.time()}"
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_locks WHERE name = ? AND expires_at <= ?", (name, now))
+            cursor = conn.execute("INSERT OR IGNORE INTO cache_locks (name, token, expires_at) VALUES (?, ?, ?)",
+                                  (name, token, now + ttl))
+            conn.commit()
+        return token if cursor.rowcount else None
+    
+    def release_lock(self, name: str, token: str):
+        """Libère un verrou s'il appartient toujours à ce jeton"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache_locks WHERE name = ? AND token = ?", (name, token))
+            conn.commit()
+    
+    def is_locked(self, name: str) -> bool:
+        with self._connection() as conn:
+            row = conn.execute("SELECT 1 FROM cache_locks WHERE name = ? AND expires_at > ?", (name, time.time())).fetchone()
+            return row is not None
+    
+    def close(self):
+        """Arrête le thread de purge et ferme les connexions inactives"""
+        self._stop_sweeper.set()
+        self.pool.close_all()
+    
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache_entries WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+    
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.db_path,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "expirations": self.expirations
+            }
+
 class CacheManager:
-    """Gestionnaire de cache Redis pour les données temporaires"""
+    """
+    Gestionnaire de cache Redis pour les données temporaires.
+    Sans Redis, le cache local est en mémoire (un seul worker) ou partagé via SQLite (plusieurs workers).
+    """
     
-    def __init__(self, redis_url: str = REDIS_URL):
+    def __init__(self, redis_url: str = REDIS_URL, backend: str = CACHE_BACKEND,
+                 shared_cache_path: str = SHARED_CACHE_PATH):
         self.redis_client = None
-        self._memory_cache = {}
         self._redis_available = False
+        if backend == "sqlite" or (backend == "auto" and WEB_CONCURRENCY > 1):
+            self._local_cache = SQLiteCache(shared_cache_path)
+            logger.info(f"🗄️  Cache partagé entre workers : {self._local_cache.db_path}")
+        else:
+            self._local_cache = MemoryCache()
         
         # Tentative de connexion Redis avec timeout plus court
         try:
-            if redis_url and redis_url != "redis://localhost:6379":
+            if backend not in ("auto", "redis"):
+                logger.info(f"🔄 CACHE_BACKEND={backend}, Redis ignoré")
+            elif redis_url and redis_url != "redis://localhost:6379":
                 # Seulement si une URL Redis réelle est fournie
                 self.redis_client = redis.from_url(
                     redis_url, 
@@ -235,14 +1219,21 @@ class CacheManager:
                 self._redis_available = True
                 logger.info(f"✅ Connexion Redis établie: {redis_url}")
             else:
-                logger.info("🔄 Redis URL par défaut détectée, utilisation du cache mémoire")
+                logger.info("🔄 Redis URL par défaut détectée, utilisation du cache local")
         except Exception as e:
             logger.warning(f"⚠️  Redis non disponible ({e}), utilisation du cache en mémoire")
             self.redis_client = None
             self._redis_available = False
     
-    def set(self, key: str, value: Any, ttl: int = CACHE_TTL):
-        """Met une valeur en cache"""
+    def set(self, key: str, value: Any, ttl: int = CACHE_TTL, stale_ttl: int = 0):
+        """
+        Met une valeur en cache.
+        Avec `stale_ttl`, la valeur est fraîche pendant `ttl` puis périmée (mais encore servie)
+        pendant `stale_ttl` secondes supplémentaires.
+        """
+        if stale_ttl > 0:
+            value = {'__swr__': True, 'value': value, 'fresh_until': time.time() + ttl}
+            ttl += stale_ttl
         try:
             if self._redis_available and self.redis_client:
                 try:
@@ -252,17 +1243,24 @@ class CacheManager:
                     logger.warning(f"⚠️  Redis set failed, falling back to memory: {redis_error}")
                     self._redis_available = False
             
-            # Fallback vers cache mémoire
-            self._memory_cache[key] = {
-                'value': value,
-                'expires': datetime.now() + timedelta(seconds=ttl)
-            }
+            # Fallback vers cache local
+            self._local_cache.set(key, value, ttl)
             
         except Exception as e:
             logger.error(f"❌ Erreur cache set: {e}")
     
     def get(self, key: str) -> Optional[Any]:
-        """Récupère une valeur du cache"""
+        """Récupère une valeur du cache (fraîche ou périmée)"""
+        return self.get_entry(key)[0]
+    
+    def get_entry(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Récupère une valeur du cache et indique si elle est périmée (entre ttl et ttl + stale_ttl)"""
+        cached = self._get_raw(key)
+        if isinstance(cached, dict) and cached.get('__swr__'):
+            return cached['value'], time.time() >= cached['fresh_until']
+        return cached, False
+    
+    def _get_raw(self, key: str) -> Optional[Any]:
         try:
             if self._redis_available and self.redis_client:
                 try:
@@ -273,13 +1271,8 @@ class CacheManager:
                     logger.warning(f"⚠️  Redis get failed, falling back to memory: {redis_error}")
                     self._redis_available = False
             
-            # Fallback vers cache mémoire
-            cached = self._memory_cache.get(key)
-            if cached and cached['expires'] > datetime.now():
-                return cached['value']
-            elif cached:
-                del self._memory_cache[key]
-            return None
+            # Fallback vers cache local
+            return self._local_cache.get(key)
             
         except Exception as e:
             logger.error(f"❌ Erreur cache get: {e}")
@@ -296,8 +1289,8 @@ class CacheManager:
                     logger.warning(f"⚠️  Redis delete failed, using memory: {redis_error}")
                     self._redis_available = False
             
-            # Fallback vers cache mémoire
-            self._memory_cache.pop(key, None)
+            # Fallback vers cache local
+            self._local_cache.delete(key)
             
         except Exception as e:
             logger.error(f"❌ Erreur cache delete: {e}")
@@ -310,15 +1303,76 @@ class CacheManager:
                 if keys:
                     self.redis_client.delete(*keys)
             else:
-                # Pour le cache mémoire, on supprime les clés qui matchent
-                keys_to_delete = [k for k in self._memory_cache.keys() if pattern.replace('*', '') in k]
-                for key in keys_to_delete:
-                    del self._memory_cache[key]
+                # Pour le cache local, on supprime les clés qui matchent
+                self._local_cache.delete_matching(pattern.replace('*', ''))
         except Exception as e:
             logger.error(f"Erreur cache clear_pattern: {e}")
+    
+    def acquire_lock(self, name: str, ttl: int = SINGLE_FLIGHT_LOCK_TTL) -> Optional[str]:
+        """
+        Pose un verrou Redis de courte durée (SET NX EX) partagé entre les workers.
+        Retourne le jeton du verrou, None s'il est déjà détenu, ou 'local' sans cache partagé.
+        Le jeton désigne le backend qui l'a émis (préfixe 'redis:' pour Redis) : après une bascule
+        Redis -> cache local, chaque verrou est libéré là où il a été posé.
+        """
+        if not (self._redis_available and self.redis_client):
+            if isinstance(self._local_cache, SQLiteCache):
+                try:
+                    return self._local_cache.acquire_lock(name, ttl)
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️  Verrou partagé indisponible, calcul local: {e}")
+            return "local"
+        token = f"redis:{os.getpid()}:{threading.get_ident()}:{time.time()}"
+        try:
+            if self.redis_client.set(name, token, nx=True, ex=ttl):
+                return token
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️  Redis lock failed, calcul local: {e}")
+            return "local"
+    
+    def release_lock(self, name: str, token: str):
+        """Libère un verrou s'il appartient toujours à ce jeton, sur le backend qui l'a émis"""
+        if token == "local":
+            return
+        if not (token.startswith("redis:") and self.redis_client):
+            if isinstance(self._local_cache, SQLiteCache):
+                try:
+                    self._local_cache.release_lock(name, token)
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️  Libération du verrou partagé échouée: {e}")
+            return
+        try:
+            self.redis_client.eval(
+                "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0",
+                1, name, token
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Redis unlock failed: {e}")
+    
+    def is_locked(self, name: str) -> bool:
+        """Indique si un verrou Redis est actuellement détenu"""
+        if not (self._redis_available and self.redis_client):
+            try:
+                return isinstance(self._local_cache, SQLiteCache) and self._local_cache.is_locked(name)
+            except sqlite3.Error:
+                return False
+        try:
+            return bool(self.redis_client.exists(name))
+        except Exception:
+            return False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du cache (compteurs du cache local de secours)"""
+        local_backend = "sqlite" if isinstance(self._local_cache, SQLiteCache) else "memory"
+        return {
+            "backend": "redis" if self._redis_available else local_backend,
+            local_backend: self._local_cache.stats()
+        }
 
 # Instances globales
-db_manager = DatabaseManager()
+# Instance globale : schéma et migrations appliqués au premier accès, jamais à l'import
+db_manager = DatabaseManager(lazy=True)
 cache_manager = CacheManager()
 
 # Fonctions utilitaires
@@ -326,23 +1380,191 @@ def get_cache_key(prefix: str, *args) -> str:
     """Génère une clé de cache standardisée"""
     return f"{prefix}:" + ":".join(str(arg) for arg in args)
 
-def cache_api_response(func):
-    """Décorateur pour mettre en cache les réponses d'API"""
+class SingleFlight:
+    """
+    Regroupe les appels concurrents portant la même clé : un seul calcul est exécuté,
+    les autres appelants attendent son résultat (ou son exception).
+    """
+    
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_remote = 0
+    
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def record_remote(self):
+        """Compte un appel servi par le calcul d'un autre worker (verrou Redis)"""
+        with self._lock:
+            self.coalesced_remote += 1
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced_local": self.coalesced,
+                "coalesced_remote": self.coalesced_remote,
+                "in_flight": len(self._calls)
+            }
+
+single_flight = SingleFlight()
+
+class BackgroundRefresher:
+    """Exécute les rafraîchissements stale-while-revalidate dans un pool de threads borné, sans doublons"""
+    
+    def __init__(self, max_workers: int = CACHE_REFRESH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="cache-refresh")
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.stale_served = 0
+        self.scheduled = 0
+        self.failures = 0
+    
+    def schedule(self, key: str, fn) -> bool:
+        """Planifie `fn` en arrière-plan, sauf si un rafraîchissement de `key` est déjà en cours"""
+        with self._lock:
+            self.stale_served += 1
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+        self._executor.submit(self._run, key, fn)
+        return True
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+    
+    def _run(self, key: str, fn):
+        try:
+            fn()
+        except Exception as e:
+            self.record_failure()
+            logger.warning(f"⚠️  Rafraîchissement en arrière-plan échoué pour {key}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "stale_served": self.stale_served,
+                "refreshes_scheduled": self.scheduled,
+                "refresh_failures": self.failures,
+                "refreshing": len(self._pending)
+            }
+
+background_refresher = BackgroundRefresher()
+
+def _is_cacheable(result) -> bool:
+    """Seuls les résultats valides sont mis en cache : ni vide, ni `success: False`, ni charge d'erreur"""
+    if not result:
+        return False
+    if isinstance(result, dict) and (result.get("success") is False or "error" in result):
+        return False
+    return True
+
+def _compute_and_cache(func, cache_key: str, args, kwargs, ttl: int = CACHE_TTL, stale_ttl: int = 0,
+                       refresh: bool = False):
+    """Calcule le résultat sous verrou Redis (si disponible) puis le met en cache"""
+    # Un autre appelant a pu remplir le cache pendant l'attente du verrou local
+    if not refresh:
+        cached_result = cache_manager.get(cache_key)
+        if cached_result:
+            return cached_result
+    
+    lock_name = f"lock:{cache_key}"
+    token = cache_manager.acquire_lock(lock_name)
+    if token is None:
+        if refresh:
+            # Un autre worker rafraîchit déjà cette clé
+            return None
+        # Un autre worker calcule déjà cette clé : on attend son résultat
+        deadline = time.time() + SINGLE_FLIGHT_LOCK_TTL
+        while time.time() < deadline and cache_manager.is_locked(lock_name):
+            time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+            cached_result = cache_manager.get(cache_key)
+            if cached_result:
+                single_flight.record_remote()
+                logger.info(f"Résultat partagé par un autre worker pour {cache_key}")
+                return cached_result
+        token = cache_manager.acquire_lock(lock_name) or "local"
+    
+    try:
+        result = func(*args, **kwargs)
+        if _is_cacheable(result):
+            cache_manager.set(cache_key, result, ttl=ttl, stale_ttl=stale_ttl)
+            logger.info(f"Résultat mis en cache pour {cache_key}")
+        elif refresh:
+            # Rafraîchissement en échec : la valeur périmée reste servie jusqu'à son expiration
+            background_refresher.record_failure()
+            logger.warning(f"⚠️  Rafraîchissement invalide pour {cache_key}, valeur périmée conservée")
+        return result
+    finally:
+        cache_manager.release_lock(lock_name, token)
+
+def cache_api_response(func=None, *, ttl: int = CACHE_TTL, stale_ttl: int = 0):
+    """
+    Décorateur pour mettre en cache les réponses d'API (calculs concurrents regroupés).
+    Utilisable nu (`@cache_api_response`) ou avec `@cache_api_response(stale_ttl=...)` :
+    une valeur périmée de moins de `stale_ttl` secondes est alors servie immédiatement
+    et rafraîchie en arrière-plan.
+    """
+    if func is None:
+        return functools.partial(cache_api_response, ttl=ttl, stale_ttl=stale_ttl)
+    
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Génère une clé de cache basée sur la fonction et ses arguments
         cache_key = get_cache_key(func.__name__, *args, *sorted(kwargs.items()))
         
         # Vérifie le cache
-        cached_result = cache_manager.get(cache_key)
+        cached_result, is_stale = cache_manager.get_entry(cache_key)
+        metrics.CACHE_LOOKUPS.labels(func.__name__, ("stale" if is_stale else "hit") if cached_result else "miss").inc()
         if cached_result:
-            logger.info(f"Cache hit pour {cache_key}")
+            if is_stale:
+                logger.info(f"Cache périmé servi pour {cache_key}, rafraîchissement en arrière-plan")
+                background_refresher.schedule(cache_key, lambda: single_flight.do(
+                    cache_key, lambda: _compute_and_cache(func, cache_key, args, kwargs, ttl, stale_ttl, refresh=True)
+                ))
+            else:
+                logger.info(f"Cache hit pour {cache_key}")
             return cached_result
         
-        # Exécute la fonction et met en cache
-        result = func(*args, **kwargs)
-        if result:  # Ne cache que les résultats valides
-            cache_manager.set(cache_key, result)
-            logger.info(f"Résultat mis en cache pour {cache_key}")
-        
-        return result
-    return wrapper
\ No newline at end of file
+        # Exécute la fonction une seule fois pour tous les appelants concurrents
+        return single_flight.do(cache_key, lambda: _compute_and_cache(func, cache_key, args, kwargs, ttl, stale_ttl))
+    
+    return wrapper
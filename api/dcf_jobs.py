@@ -0,0 +1,141 @@
+# dcf_jobs.py - Jobs DCF en arrière-plan sur tous les symboles d'un indice
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+import analysis
+import fmp_analysis
+from database import db_manager
+
+# Valorisations simultanées d'un job (chacune scrape Macrotrends via le pool de navigateurs)
+DCF_JOB_WORKERS = int(os.getenv("DCF_JOB_WORKERS", "2"))
+DCF_JOB_POLL_INTERVAL = float(os.getenv("DCF_JOB_POLL_INTERVAL", "1.0"))  # secondes entre deux événements SSE
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def value_symbol(symbol: str) -> Dict:
+    """Valorise un symbole (DCF en cache + cours actuel) pour un job d'indice"""
+    try:
+        dcf = fmp_analysis.get_dcf_analysis(symbol)
+        if not dcf.get("success"):
+            return {"symbol": symbol, "status": "error", "error": dcf.get("error")}
+        
+        stock_data = analysis.get_stock_data(symbol)
+        current_price = stock_data.get('current_price') if stock_data else None
+        intrinsic_value = dcf["scenario1"]["intrinsic_value"]
+        return {
+            "symbol": symbol,
+            "status": "ok",
+            "current_price": current_price,
+            "intrinsic_value": intrinsic_value,
+            "intrinsic_value_historical": dcf["scenario2"]["intrinsic_value"],
+            "upside": intrinsic_value / current_price - 1 if current_price else None
+        }
+    except Exception as e:
+        return {"symbol": symbol, "status": "error", "error": str(e)}
+
+
+class DCFJobManager:
+    """
+    Exécute les jobs DCF d'indice en arrière-plan, un job à la fois, chacun réparti sur un pool
+    borné de workers. Progression et résultats sont persistés dans SQLite au fil de l'eau,
+    ce qui permet de reprendre un job interrompu par un redémarrage.
+    """
+    
+    def __init__(self, max_workers: int = DCF_JOB_WORKERS, valuer: Callable[[str], Dict] = value_symbol, db=None):
+        self.max_workers = max(1, max_workers)
+        self._valuer = valuer
+        self._db = db or db_manager
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dcf-job")
+        self._lock = threading.Lock()
+        self._active = set()
+    
+    def submit(self, index_name: str, symbols: Optional[List[str]] = None) -> int:
+        """Crée un job pour les symboles de l'indice (get_index_symbols par défaut) et le planifie"""
+        symbols = symbols if symbols is not None else analysis.get_index_symbols(index_name)
+        if not symbols:
+            raise ValueError(f"Aucun symbole trouvé pour l'indice {index_name}")
+        job_id = self._db.create_dcf_job(index_name, list(dict.fromkeys(symbols)))
+        self._schedule(job_id)
+        return job_id
+    
+    def resume_unfinished(self) -> int:
+        """
+        Replanifie les jobs en attente ou interrompus (appelé au démarrage de chaque worker de l'API).
+        Seuls les jobs dont le worker propriétaire s'est arrêté sont repris.
+        """
+        job_ids = self._db.claim_unfinished_dcf_jobs()
+        for job_id in job_ids:
+            self._schedule(job_id)
+        if job_ids:
+            print(f"🔁 Reprise de {len(job_ids)} job(s) DCF interrompu(s)")
+        return len(job_ids)
+    
+    def _schedule(self, job_id: int) -> bool:
+        with self._lock:
+            if job_id in self._active:
+                return False
+            self._active.add(job_id)
+        self._runner.submit(self._run, job_id)
+        return True
+    
+    def _run(self, job_id: int):
+        try:
+            symbols, done = self._db.get_dcf_job_symbols(job_id)
+            remaining = [symbol for symbol in symbols if symbol not in done]
+            self._db.update_dcf_job_status(job_id, 'running')
+            print(f"▶️  Job DCF {job_id}: {len(remaining)}/{len(symbols)} symboles à valoriser")
+            
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dcf-worker") as workers:
+                for result in workers.map(self._valuer, remaining):
+                    self._db.save_dcf_job_result(job_id, result)
+            
+            self._db.update_dcf_job_status(job_id, 'completed')
+            print(f"✅ Job DCF {job_id} terminé")
+        except Exception as e:
+            self._db.update_dcf_job_status(job_id, 'failed', str(e))
+            print(f"❌ Job DCF {job_id} échoué: {e}")
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+    
+    def get_progress(self, job_id: int) -> Optional[Dict]:
+        """État du job avec la proportion de symboles traités"""
+        job = self._db.get_dcf_job(job_id)
+        if job:
+            processed = job['completed'] + job['failed']
+            job['progress'] = processed / job['total'] if job['total'] else 1.0
+        return job
+    
+    def wait(self, job_id: int, timeout: float = 60.0) -> Optional[Dict]:
+        """Attend la fin d'un job (utilisé par les tests et scripts)"""
+        deadline = time.time() + timeout
+        job = self.get_progress(job_id)
+        while job and job['status'] not in TERMINAL_STATUSES and time.time() < deadline:
+            time.sleep(0.05)
+            job = self.get_progress(job_id)
+        return job
+    
+    def iter_events(self, job_id: int, poll_interval: float = DCF_JOB_POLL_INTERVAL) -> Iterator[str]:
+        """Flux Server-Sent Events : un événement à chaque changement de progression, jusqu'à la fin du job"""
+        last = None
+        while True:
+            job = self.get_progress(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': f'Job {job_id} introuvable'})}\n\n"
+                return
+            snapshot = (job['status'], job['completed'], job['failed'])
+            if snapshot != last:
+                last = snapshot
+                event = "done" if job['status'] in TERMINAL_STATUSES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+            if job['status'] in TERMINAL_STATUSES:
+                return
+            time.sleep(poll_interval)
+
+
+dcf_job_manager = DCFJobManager()
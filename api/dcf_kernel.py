@@ -0,0 +1,51 @@
+# dcf_kernel.py - Noyau DCF vectorisé (NumPy) pour valoriser de nombreux scénarios en un appel
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_PROJECTION_YEARS = 5
+
+
+def dcf_kernel(fcf_growth_rate, perpetual_growth_rate, base_fcf, total_debt, cash, shares_outstanding,
+               wacc, projection_years: int = DEFAULT_PROJECTION_YEARS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcule la valorisation DCF d'un ensemble de scénarios en une seule opération vectorisée.
+    
+    Tous les paramètres acceptent un scalaire ou un tableau NumPy et sont combinés par broadcasting :
+    par exemple des taux de croissance de forme (n, 1) et des WACC de forme (1, m) donnent une grille (n, m).
+    Les scénarios où le WACC n'est pas supérieur à la croissance perpétuelle valent NaN.
+    
+    Args:
+        fcf_growth_rate: Taux de croissance du FCF pendant la projection
+        perpetual_growth_rate: Taux de croissance perpétuel (terminal)
+        base_fcf: Free Cash Flow de base
+        total_debt: Dette totale à long terme
+        cash: Trésorerie et équivalents
+        shares_outstanding: Nombre d'actions en circulation
+        wacc: Coût moyen pondéré du capital
+        projection_years: Nombre d'années de projection
+    
+    Returns:
+        Tuple de tableaux (valeur_intrinsèque_par_action, valeur_entreprise, valeur_capitaux_propres)
+    """
+    growth = np.asarray(fcf_growth_rate, dtype=float)
+    perpetual = np.asarray(perpetual_growth_rate, dtype=float)
+    wacc = np.asarray(wacc, dtype=float)
+    base_fcf = np.asarray(base_fcf, dtype=float)
+    years = np.arange(1, projection_years + 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Projection et actualisation des FCF : dernier axe = années de projection
+        projected_fcf = base_fcf[..., None] * (1 + growth[..., None]) ** years
+        discount_factors = (1 + wacc[..., None]) ** years
+        pv_of_fcf = (projected_fcf / discount_factors).sum(axis=-1)
+
+        # Valeur terminale actualisée
+        terminal_value = projected_fcf[..., -1] * (1 + perpetual) / (wacc - perpetual)
+        pv_of_terminal_value = terminal_value / discount_factors[..., -1]
+
+        enterprise_value = np.where(wacc > perpetual, pv_of_fcf + pv_of_terminal_value, np.nan)
+        equity_value = enterprise_value - np.asarray(total_debt, dtype=float) + np.asarray(cash, dtype=float)
+        intrinsic_value_per_share = equity_value / np.asarray(shares_outstanding, dtype=float)
+
+    return intrinsic_value_per_share, enterprise_value, equity_value
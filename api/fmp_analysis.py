@@ -1,8 +1,15 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional
-from stockdex import Ticker
-from database import cache_api_response
+import metrics
+from data_providers import STATEMENT_METHODS, get_statements_provider
+from dcf_kernel import dcf_kernel, DEFAULT_PROJECTION_YEARS
+from database import db_manager, cache_api_response, CACHE_STALE_TTL
 
 # Constantes de validation
 MIN_GROWTH_RATE = -0.50  # -50% minimum
@@ -10,6 +17,31 @@ MAX_GROWTH_RATE = 1.00   # 100% maximum
 MAX_PERPETUAL_GROWTH = 0.05  # 5% maximum pour croissance perpétuelle
 DEFAULT_WACC = 0.0863  # 8.63%
 
+# Récupération parallèle des états financiers (0 = taille du pool de navigateurs)
+MACROTRENDS_MAX_WORKERS = int(os.getenv("MACROTRENDS_MAX_WORKERS", "0"))
+
+# États financiers Macrotrends : nom court -> méthode stockdex (contrat commun des fournisseurs d'états)
+MACROTRENDS_STATEMENTS = STATEMENT_METHODS
+
+# Fournisseur d'états financiers (STATEMENTS_PROVIDER : stockdex ou fixtures)
+statements_provider = get_statements_provider()
+
+# Magasin local des états nettoyés : délai de publication des comptes annuels après la clôture
+# et intervalle minimum entre deux vérifications d'un nouvel exercice
+STATEMENT_FILING_LAG_DAYS = int(os.getenv("STATEMENT_FILING_LAG_DAYS", "90"))
+STATEMENT_RECHECK_HOURS = int(os.getenv("STATEMENT_RECHECK_HOURS", "24"))
+STORED_STATEMENTS = ("income", "balance_sheet", "cash_flow")  # ordre des DataFrames (is_df, bs_df, cf_df)
+
+# Grille de sensibilité WACC x croissance perpétuelle : nombre maximum de points par axe
+SENSITIVITY_MAX_STEPS = int(os.getenv("SENSITIVITY_MAX_STEPS", "200"))
+
+# DCF Monte Carlo : nombre de trajectoires, taille des lots vectorisés et écart-type du WACC simulé
+MONTE_CARLO_DEFAULT_PATHS = int(os.getenv("MONTE_CARLO_DEFAULT_PATHS", "100000"))
+MONTE_CARLO_MAX_PATHS = int(os.getenv("MONTE_CARLO_MAX_PATHS", "2000000"))
+MONTE_CARLO_CHUNK_PATHS = int(os.getenv("MONTE_CARLO_CHUNK_PATHS", "50000"))
+MONTE_CARLO_WACC_STD = float(os.getenv("MONTE_CARLO_WACC_STD", "0.01"))
+MONTE_CARLO_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
 
 class DCFAnalysisError(Exception):
     """Exception personnalisée pour les erreurs d'analyse DCF."""
@@ -36,32 +68,86 @@ def validate_growth_rate(rate: float, rate_name: str, is_perpetual: bool = False
     return rate
 
 
-def get_processed_financial_data(ticker_symbol: str) -> Tuple[pd.DataFrame, pd.DataFrame, Dict, int]:
+def _statement_workers() -> int:
+    """Nombre de récupérations simultanées : borné par le pool de navigateurs s'il est chargé."""
+    if MACROTRENDS_MAX_WORKERS > 0:
+        return MACROTRENDS_MAX_WORKERS
+    selenium_config = sys.modules.get("selenium_config")
+    return selenium_config.chrome_pool.max_size if selenium_config else 1
+
+
+def fetch_macrotrends_statements(ticker, ticker_symbol: str, report: Optional[Dict] = None,
+                                 max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
     """
-    Récupère et traite les données financières depuis Macrotrends via stockdex.
+    Récupère en parallèle les trois états financiers annuels Macrotrends d'un ticker stockdex.
+    
+    Args:
+        ticker: Instance stockdex.Ticker
+        ticker_symbol: Symbole boursier (pour les messages)
+        report: Dictionnaire optionnel rempli avec la durée et l'erreur éventuelle de chaque état
+        max_workers: Récupérations simultanées maximum (par défaut, taille du pool de navigateurs)
+    
+    Returns:
+        Dictionnaire {nom de l'état: DataFrame}
+    
+    Raises:
+        DCFAnalysisError: si au moins un état est vide ou en erreur (les autres sont signalés comme récupérés)
+    """
+    report = report if report is not None else {}
+    workers = max(1, min(len(MACROTRENDS_STATEMENTS), max_workers or _statement_workers()))
+
+    def fetch(name):
+        start = time.perf_counter()
+        try:
+            df = getattr(ticker, MACROTRENDS_STATEMENTS[name])(frequency='annual')
+            error = None if df is not None and not df.empty else "données vides"
+        except Exception as e:
+            df, error = None, str(e)
+        seconds = time.perf_counter() - start
+        metrics.SCRAPE_DURATION.labels(name, "error" if error else "ok").observe(seconds)
+        report[name] = {"seconds": round(seconds, 3), "error": error}
+        return name, df
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        statements = dict(executor.map(fetch, MACROTRENDS_STATEMENTS))
+
+    for name in MACROTRENDS_STATEMENTS:
+        status = "✅" if report[name]["error"] is None else "❌"
+        print(f"   {status} {name}: {report[name]['seconds']:.2f}s")
+
+    failed = [name for name in MACROTRENDS_STATEMENTS if report[name]["error"]]
+    if failed:
+        fetched = [name for name in MACROTRENDS_STATEMENTS if name not in failed]
+        details = "; ".join(f"{name} ({report[name]['error']})" for name in failed)
+        raise DCFAnalysisError(
+            f"États financiers indisponibles pour {ticker_symbol}: {details}. "
+            f"États récupérés: {', '.join(fetched) or 'aucun'}"
+        )
+    return statements
+
+
+def scrape_financial_statements(ticker_symbol: str, fetch_report: Optional[Dict] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Récupère et nettoie les états financiers annuels depuis Macrotrends via stockdex.
     
     Args:
         ticker_symbol: Symbole boursier (ex: 'AAPL', 'MSFT')
+        fetch_report: Dictionnaire optionnel rempli avec le temps de récupération de chaque état
     
     Returns:
-        Tuple contenant (income_statement_df, cash_flow_df, balance_sheet_dict, latest_year)
+        Tuple (income_statement_df, balance_sheet_df, cash_flow_df), indexés par date de clôture
     """
     print(f"▶️  Récupération des données financières pour {ticker_symbol} via Macrotrends (stockdex)...")
     
     try:
-        # Initialisation du ticker avec stockdex
-        ticker = Ticker(ticker=ticker_symbol, security_type="stock")
+        # Ticker stockdex (ou rejeu local) fourni par le fournisseur d'états configuré
+        ticker = statements_provider.get_statements(ticker_symbol)
         
-        # Récupération des états financiers via Macrotrends (données annuelles)
-        income_statement = ticker.macrotrends_income_statement(frequency='annual')
-        balance_sheet = ticker.macrotrends_balance_sheet(frequency='annual')
-        cash_flow = ticker.macrotrends_cash_flow(frequency='annual')
-        
-        if income_statement.empty or balance_sheet.empty or cash_flow.empty:
-            raise DCFAnalysisError(
-                f"Impossible de récupérer les données financières pour {ticker_symbol}. "
-                "Vérifiez que le symbole est correct et que les données sont disponibles sur Macrotrends."
-            )
+        # Récupération des états financiers via Macrotrends (données annuelles), en parallèle
+        statements = fetch_macrotrends_statements(ticker, ticker_symbol, report=fetch_report)
+        income_statement = statements["income_statement"]
+        balance_sheet = statements["balance_sheet"]
+        cash_flow = statements["cash_flow"]
         
         print("✅ Données brutes récupérées depuis Macrotrends.\n")
         
@@ -152,9 +238,7 @@ def get_processed_financial_data(ticker_symbol: str) -> Tuple[pd.DataFrame, pd.D
             f"Colonnes disponibles: {list(bs_df.columns)}"
         )
     
-    # Récupération de l'année la plus récente commune à tous les états financiers
-    # Nous devons attendre d'avoir traité le cash flow pour déterminer latest_year
-    # Donc nous déplaçons cette logique après le traitement du cash flow
+    # L'année la plus récente commune à tous les états est déterminée par _latest_financial_data
 
     # --- Traitement du tableau de flux de trésorerie ---
     cf_df = cash_flow.T.copy()  # Transposition
@@ -220,21 +304,9 @@ def get_processed_financial_data(ticker_symbol: str) -> Tuple[pd.DataFrame, pd.D
     # Suppression des lignes avec des valeurs manquantes
     cf_df = cf_df.dropna()
 
-    # --- Détermination de l'année commune la plus récente ---
-    # Trouver l'intersection des années disponibles dans tous les DataFrames
-    common_years = set(is_df.index) & set(bs_df.index) & set(cf_df.index)
-    if not common_years:
-        raise DCFAnalysisError(
-            "Aucune année commune trouvée entre les états financiers"
-        )
-    
-    latest_year = max(common_years)
-    
-    # Création des données du bilan pour l'année la plus récente
-    balance_sheet_latest = {
-        'Cash': pd.to_numeric(bs_df.loc[latest_year, cash_col], errors='coerce') or 0,
-        'Total Long Term Debt': pd.to_numeric(bs_df.loc[latest_year, debt_col], errors='coerce') or 0
-    }
+    # Seules la trésorerie et la dette long terme sont utilisées pour la valorisation
+    bs_df = bs_df.rename(columns={cash_col: 'Cash', debt_col: 'Total Long Term Debt'})
+    bs_df = bs_df[['Cash', 'Total Long Term Debt']].apply(pd.to_numeric, errors='coerce')
 
     # --- Récupération du nombre d'actions ---
     # Utilisation de la propriété digrin_shares_outstanding de stockdx
@@ -283,9 +355,124 @@ def get_processed_financial_data(ticker_symbol: str) -> Tuple[pd.DataFrame, pd.D
     # Ajout du nombre d'actions au DataFrame
     is_df['Shares Outstanding'] = shares_outstanding
 
+    return is_df, bs_df, cf_df
+
+
+def _statement_to_records(df: pd.DataFrame) -> Dict[str, Dict]:
+    """Convertit un état nettoyé en {date de clôture ISO: {colonne: valeur}} pour le magasin."""
+    return {
+        period.strftime('%Y-%m-%d'): {col: (None if pd.isna(value) else float(value)) for col, value in row.items()}
+        for period, row in df.iterrows()
+    }
+
+
+def _statement_from_records(records: Dict[str, Dict]) -> pd.DataFrame:
+    """Reconstruit un état nettoyé à partir des lignes du magasin."""
+    df = pd.DataFrame.from_dict(records, orient='index', dtype=float)
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index()
+
+
+def store_financial_statements(ticker_symbol: str, frames: Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]):
+    """Enregistre les états nettoyés d'un ticker dans le magasin (une ligne par état et exercice)."""
+    rows = [
+        (name, period_end, data)
+        for name, df in zip(STORED_STATEMENTS, frames)
+        for period_end, data in _statement_to_records(df).items()
+    ]
+    db_manager.save_financial_statements(ticker_symbol, rows)
+
+
+def load_financial_statements(ticker_symbol: str) -> Optional[Tuple[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame], datetime]]:
+    """
+    Lit les états nettoyés d'un ticker depuis le magasin.
+    
+    Returns:
+        Tuple ((income_statement_df, balance_sheet_df, cash_flow_df), date de la dernière récupération UTC)
+        ou None si le magasin ne contient pas les trois états
+    """
+    stored = db_manager.get_financial_statements(ticker_symbol)
+    if not stored or any(name not in stored['statements'] for name in STORED_STATEMENTS):
+        return None
+    frames = tuple(_statement_from_records(stored['statements'][name]) for name in STORED_STATEMENTS)
+    return frames, stored['fetched_at']
+
+
+def new_fiscal_year_likely(latest_period_end: datetime, fetched_at: datetime, now: Optional[datetime] = None) -> bool:
+    """
+    Indique si un nouvel exercice a probablement été publié depuis la dernière récupération :
+    un an après la dernière clôture plus le délai de publication, et pas de vérification récente.
+    """
+    now = now or datetime.utcnow()
+    expected_publication = latest_period_end + timedelta(days=365 + STATEMENT_FILING_LAG_DAYS)
+    return now >= expected_publication and now - fetched_at >= timedelta(hours=STATEMENT_RECHECK_HOURS)
+
+
+def _latest_financial_data(is_df: pd.DataFrame, bs_df: pd.DataFrame, cf_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, Dict, int]:
+    """Extrait le bilan de l'exercice le plus récent commun aux trois états."""
+    # --- Détermination de l'année commune la plus récente ---
+    # Trouver l'intersection des années disponibles dans tous les DataFrames
+    common_years = set(is_df.index) & set(bs_df.index) & set(cf_df.index)
+    if not common_years:
+        raise DCFAnalysisError(
+            "Aucune année commune trouvée entre les états financiers"
+        )
+    
+    latest_year = max(common_years)
+    
+    # Création des données du bilan pour l'année la plus récente
+    balance_sheet_latest = {
+        'Cash': pd.to_numeric(bs_df.loc[latest_year, 'Cash'], errors='coerce') or 0,
+        'Total Long Term Debt': pd.to_numeric(bs_df.loc[latest_year, 'Total Long Term Debt'], errors='coerce') or 0
+    }
+
     return is_df, cf_df, balance_sheet_latest, int(latest_year.year if hasattr(latest_year, 'year') else latest_year)
 
 
+def get_processed_financial_data(ticker_symbol: str, fetch_report: Optional[Dict] = None,
+                                 force_refresh: bool = False,
+                                 source_report: Optional[Dict] = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict, int]:
+    """
+    Retourne les données financières traitées d'un ticker. Les états nettoyés sont lus depuis
+    le magasin local ; Macrotrends n'est à nouveau scrapé que si un nouvel exercice est probable.
+    
+    Args:
+        ticker_symbol: Symbole boursier (ex: 'AAPL', 'MSFT')
+        fetch_report: Dictionnaire optionnel rempli avec le temps de récupération de chaque état (si scraping)
+        force_refresh: Ignore le magasin et scrape à nouveau
+        source_report: Dictionnaire optionnel rempli avec la source réellement utilisée :
+            'source' = 'store' ou 'scrape' (et 'refresh_error' si un nouveau scraping a échoué)
+    
+    Returns:
+        Tuple contenant (income_statement_df, cash_flow_df, balance_sheet_dict, latest_year)
+    """
+    source_report = source_report if source_report is not None else {}
+    stored = None if force_refresh else load_financial_statements(ticker_symbol)
+    if stored is not None:
+        frames, fetched_at = stored
+        latest_period_end = max(df.index.max() for df in frames)
+        if not new_fiscal_year_likely(latest_period_end, fetched_at):
+            print(f"📦 États financiers de {ticker_symbol} lus depuis le magasin local (clôture {latest_period_end:%Y-%m-%d})")
+            source_report['source'] = 'store'
+            return _latest_financial_data(*frames)
+        print(f"🔄 Nouvel exercice probable pour {ticker_symbol}, nouvelle récupération des états financiers...")
+
+    try:
+        frames = scrape_financial_statements(ticker_symbol, fetch_report)
+    except Exception as e:
+        if stored is None:
+            raise
+        # Échec de la nouvelle récupération : les états stockés restent valables
+        print(f"⚠️  Nouvelle récupération échouée pour {ticker_symbol} ({e}), utilisation des états stockés")
+        db_manager.touch_financial_statements(ticker_symbol)
+        frames = stored[0]
+        source_report.update(source='store', refresh_error=str(e))
+    else:
+        store_financial_statements(ticker_symbol, frames)
+        source_report['source'] = 'scrape'
+    return _latest_financial_data(*frames)
+
+
 def run_dcf_valuation(
     fcf_growth_rate: float,
     perpetual_growth_rate: float,
@@ -294,7 +481,7 @@ def run_dcf_valuation(
     cash: float,
     shares_outstanding: int,
     wacc: float = DEFAULT_WACC,
-    projection_years: int = 5
+    projection_years: int = DEFAULT_PROJECTION_YEARS
 ) -> Tuple[float, float, float]:
     """
     Calcule la valorisation DCF avec les paramètres donnés.
@@ -340,30 +527,18 @@ def run_dcf_valuation(
     if shares_outstanding <= 0:
         raise DCFAnalysisError(f"Nombre d'actions invalide: {shares_outstanding}")
     
-    # Projection des Free Cash Flows futurs
-    projected_fcf = [base_fcf * (1 + fcf_growth_rate)**i for i in range(1, projection_years + 1)]
-
-    # Actualisation des FCF
-    discounted_fcf = [fcf / (1 + wacc)**(i + 1) for i, fcf in enumerate(projected_fcf)]
-    pv_of_fcf = sum(discounted_fcf)
-
-    # Calcul de la Valeur Terminale et actualisation
-    final_fcf = projected_fcf[-1]
-    terminal_value = (final_fcf * (1 + perpetual_growth_rate)) / (wacc - perpetual_growth_rate)
-    pv_of_terminal_value = terminal_value / (1 + wacc)**projection_years
-
-    # Calcul de la valeur d'entreprise et de la valeur des capitaux propres
-    enterprise_value = pv_of_fcf + pv_of_terminal_value
-    equity_value = enterprise_value - total_debt + cash
-    
+    # Valorisation d'un scénario unique par le noyau vectorisé
+    intrinsic_value_per_share, enterprise_value, equity_value = (
+        float(value) for value in dcf_kernel(
+            fcf_growth_rate, perpetual_growth_rate, base_fcf, total_debt, cash,
+            shares_outstanding, wacc, projection_years
+        )
+    )
 
     # Vérification que la valeur des capitaux propres est positive
     if equity_value <= 0:
         print(f"⚠️  Valeur des capitaux propres négative: {equity_value:,.0f}")
     
-    # Calcul de la valeur intrinsèque par action
-    intrinsic_value_per_share = equity_value / shares_outstanding
-    
     # Validation des résultats pour détecter les valeurs NaN
     if np.isnan(intrinsic_value_per_share) or np.isnan(enterprise_value) or np.isnan(equity_value):
         raise DCFAnalysisError(
@@ -376,7 +551,187 @@ def run_dcf_valuation(
     return intrinsic_value_per_share, enterprise_value, equity_value
 
 
-@cache_api_response
+def build_sensitivity_grid(
+    base_data: Dict,
+    wacc_range: Tuple[float, float, int],
+    growth_range: Tuple[float, float, int],
+    fcf_growth_rate: float
+) -> Dict:
+    """
+    Calcule la matrice des valeurs intrinsèques par action sur une grille WACC x croissance perpétuelle,
+    en un seul appel du noyau vectorisé.
+    
+    Args:
+        base_data: Données de base d'une analyse DCF (FCF, dette, trésorerie, actions)
+        wacc_range: (minimum, maximum, nombre de points) des WACC
+        growth_range: (minimum, maximum, nombre de points) des taux de croissance perpétuelle
+        fcf_growth_rate: Taux de croissance du FCF pendant la projection
+    
+    Returns:
+        Dictionnaire avec les axes et la matrice (lignes = WACC, colonnes = croissance perpétuelle),
+        None pour les cellules où le WACC n'excède pas la croissance perpétuelle
+    """
+    for name, (start, stop, steps) in (("wacc", wacc_range), ("perpetual_growth", growth_range)):
+        if not 1 <= steps <= SENSITIVITY_MAX_STEPS:
+            raise DCFAnalysisError(f"Nombre de points {name} invalide ({steps}), attendu entre 1 et {SENSITIVITY_MAX_STEPS}")
+        if start > stop:
+            raise DCFAnalysisError(f"Plage {name} invalide : minimum ({start}) supérieur au maximum ({stop})")
+    
+    waccs = np.linspace(*wacc_range)
+    perpetual_growths = np.linspace(*growth_range)
+    intrinsic_values, _, _ = dcf_kernel(
+        fcf_growth_rate, perpetual_growths[None, :], base_data["base_fcf"], base_data["total_debt"],
+        base_data["cash"], base_data["shares_outstanding"], waccs[:, None]
+    )
+    
+    return {
+        "ticker": base_data.get("ticker"),
+        "fcf_growth": float(fcf_growth_rate),
+        "wacc": waccs.tolist(),
+        "perpetual_growth": perpetual_growths.tolist(),
+        "intrinsic_values": [
+            [None if np.isnan(value) else float(value) for value in row] for row in intrinsic_values
+        ]
+    }
+
+
+def _yearly_growth_rates(series: pd.Series) -> np.ndarray:
+    """Taux de croissance d'une année sur l'autre, limités aux paires de valeurs positives."""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    previous, current = values[:-1], values[1:]
+    valid = (previous > 0) & (current > 0)
+    return current[valid] / previous[valid] - 1
+
+
+def fit_growth_distributions(fcf_series: pd.Series, ebitda_series: pd.Series, wacc: float) -> Dict:
+    """
+    Ajuste les lois normales des paramètres simulés sur l'historique du ticker.
+    
+    - Croissance du FCF : moyenne et écart-type des croissances annuelles du FCF
+    - Croissance perpétuelle : croissance annuelle moyenne de l'EBITDA, avec pour écart-type
+      l'erreur standard de cette moyenne (incertitude sur la tendance de long terme)
+    - WACC : centré sur le WACC de l'analyse, écart-type MONTE_CARLO_WACC_STD
+    
+    Sans historique exploitable, les hypothèses du scénario prospectif sont utilisées.
+    """
+    fcf_growth = _yearly_growth_rates(fcf_series)
+    ebitda_growth = _yearly_growth_rates(ebitda_series)
+    
+    if len(fcf_growth) >= 2:
+        fcf_mean, fcf_std = float(fcf_growth.mean()), float(fcf_growth.std(ddof=1))
+    else:
+        fcf_mean, fcf_std = 0.05, 0.05
+    
+    if len(ebitda_growth) >= 2:
+        perp_mean = float(ebitda_growth.mean())
+        perp_std = float(ebitda_growth.std(ddof=1) / np.sqrt(len(ebitda_growth)))
+    else:
+        perp_mean, perp_std = 0.025, 0.005
+    
+    return {
+        "fcf_growth": {"mean": fcf_mean, "std": fcf_std, "observations": int(len(fcf_growth))},
+        "perpetual_growth": {
+            "mean": float(np.clip(perp_mean, 0.0, MAX_PERPETUAL_GROWTH)),
+            "std": min(perp_std, 0.01),
+            "observations": int(len(ebitda_growth))
+        },
+        "wacc": {"mean": float(wacc), "std": MONTE_CARLO_WACC_STD}
+    }
+
+
+def run_monte_carlo_dcf(
+    base_data: Dict,
+    distributions: Dict,
+    current_price: Optional[float] = None,
+    n_paths: int = MONTE_CARLO_DEFAULT_PATHS,
+    seed: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None
+) -> Dict:
+    """
+    Valorisation DCF Monte Carlo : tire n_paths jeux de paramètres et les valorise par lots
+    avec le noyau vectorisé.
+    
+    Les tirages sont plafonnés comme dans validate_growth_rate ; les trajectoires où le WACC
+    n'excède pas la croissance perpétuelle sont écartées. Avec un budget de latence, la simulation
+    s'arrête au premier lot qui le dépasse et porte sur les trajectoires déjà calculées.
+    
+    Returns:
+        Dictionnaire avec les percentiles de la valeur intrinsèque par action, sa moyenne,
+        et la probabilité de sous-évaluation si current_price est fourni
+    """
+    if not 1 <= n_paths <= MONTE_CARLO_MAX_PATHS:
+        raise DCFAnalysisError(f"Nombre de trajectoires invalide ({n_paths}), attendu entre 1 et {MONTE_CARLO_MAX_PATHS}")
+    
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    fcf, perpetual, wacc = (distributions[name] for name in ("fcf_growth", "perpetual_growth", "wacc"))
+    chunks, simulated, budget_exhausted = [], 0, False
+    
+    while simulated < n_paths:
+        size = min(MONTE_CARLO_CHUNK_PATHS, n_paths - simulated)
+        values, _, _ = dcf_kernel(
+            np.clip(rng.normal(fcf["mean"], fcf["std"], size), MIN_GROWTH_RATE, MAX_GROWTH_RATE),
+            np.clip(rng.normal(perpetual["mean"], perpetual["std"], size), 0.0, MAX_PERPETUAL_GROWTH),
+            base_data["base_fcf"], base_data["total_debt"], base_data["cash"], base_data["shares_outstanding"],
+            np.maximum(rng.normal(wacc["mean"], wacc["std"], size), 0.0)
+        )
+        chunks.append(values[~np.isnan(values)])
+        simulated += size
+        if latency_budget_ms is not None and (time.perf_counter() - start) * 1000 >= latency_budget_ms:
+            budget_exhausted = simulated < n_paths
+            break
+    
+    values = np.concatenate(chunks)
+    if values.size == 0:
+        raise DCFAnalysisError("Aucune trajectoire valide : le WACC simulé n'excède jamais la croissance perpétuelle")
+    
+    percentiles = np.percentile(values, MONTE_CARLO_PERCENTILES)
+    return {
+        "ticker": base_data.get("ticker"),
+        "paths_requested": int(n_paths),
+        "paths_simulated": int(simulated),
+        "paths_valid": int(values.size),
+        "budget_exhausted": budget_exhausted,
+        "seed": seed,
+        "distributions": distributions,
+        "intrinsic_value": {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "percentiles": {f"p{p}": float(value) for p, value in zip(MONTE_CARLO_PERCENTILES, percentiles)}
+        },
+        "current_price": current_price,
+        "probability_undervalued": float((values > current_price).mean()) if current_price else None,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def get_monte_carlo_dcf(
+    ticker: str,
+    current_price: Optional[float] = None,
+    n_paths: int = MONTE_CARLO_DEFAULT_PATHS,
+    seed: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None,
+    wacc: Optional[float] = None,
+    analysis_results: Optional[Dict] = None
+) -> Dict:
+    """
+    Lance le mode Monte Carlo pour un ticker : données de base de l'analyse DCF en cache et
+    historiques FCF/EBITDA lus depuis le magasin local des états financiers.
+    `analysis_results` : analyse DCF déjà obtenue par l'appelant (sinon lue via get_dcf_analysis).
+    """
+    if analysis_results is None:
+        # Sans WACC explicite, même clé de cache que /dcf-valuation (get_dcf_analysis:<ticker>)
+        analysis_results = get_dcf_analysis(ticker) if wacc is None else get_dcf_analysis(ticker, wacc)
+    if not analysis_results.get("success"):
+        raise DCFAnalysisError(analysis_results.get("error", f"Analyse DCF indisponible pour {ticker}"))
+    
+    base_data = analysis_results["base_data"]
+    is_df, cf_df, _, _ = get_processed_financial_data(ticker)
+    distributions = fit_growth_distributions(cf_df['FCF'], is_df['Ebitda'], base_data["wacc"])
+    return run_monte_carlo_dcf(base_data, distributions, current_price, n_paths, seed, latency_budget_ms)
+
+
+@cache_api_response(stale_ttl=CACHE_STALE_TTL)
 def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
     """
     Effectue une analyse DCF complète pour un ticker donné.
@@ -390,10 +745,13 @@ def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
     """
     if wacc is None:
         wacc = DEFAULT_WACC
+    fetch_report, source_report = {}, {}
     
     try:
         # Étape 1 : Récupération et traitement des données financières
-        is_df, cf_df, balance_sheet_latest, latest_year = get_processed_financial_data(ticker)
+        is_df, cf_df, balance_sheet_latest, latest_year = get_processed_financial_data(
+            ticker, fetch_report, source_report=source_report
+        )
         
         # Récupération des données pour l'année la plus récente
         # Note: latest_year est maintenant un entier, mais cf_df.index contient des Timestamps
@@ -437,6 +795,8 @@ def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
                 break
         
         shares_outstanding = is_df.loc[is_latest_index, 'Shares Outstanding']
+        latest_revenue = is_df.loc[is_latest_index, 'Revenue']
+        latest_ebitda = is_df.loc[is_latest_index, 'Ebitda']
         
         # Validation et conversion du nombre d'actions
         if pd.isna(shares_outstanding) or shares_outstanding <= 0:
@@ -475,7 +835,8 @@ def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
             "total_debt": float(total_debt),
             "cash": float(cash),
             "shares_outstanding": int(shares_outstanding),
-            "wacc": float(wacc)
+            "wacc": float(wacc),
+            "ebitda_margin": float(latest_ebitda / latest_revenue) if latest_revenue > 0 else None
         }
 
         # Scénario 1: Prospectif (hypothèses conservatrices)
@@ -542,7 +903,10 @@ def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
             "success": True,
             "base_data": base_data,
             "scenario1": scenario1,
-            "scenario2": scenario2
+            "scenario2": scenario2,
+            "statement_fetch": fetch_report,
+            "statement_source": source_report.get('source'),
+            "statement_refresh_error": source_report.get('refresh_error')
         }
         
     except DCFAnalysisError as e:
@@ -570,6 +934,7 @@ def get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> Dict:
             "error": error_msg,
             "error_type": "DCF Analysis Error",
             "ticker": ticker,
+            "statement_fetch": fetch_report or None,
             "suggested_alternatives": ["AAPL", "MSFT", "GOOGL", "AMZN"] if "'NoneType'" in error_msg else None
         }
     except Exception as e:
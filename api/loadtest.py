@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Banc de charge multi-workers : lance l'API sous gunicorn avec 1, 2, 4... workers et mesure
+le débit d'un endpoint servi depuis le cache partagé (aucun appel réseau externe).
+
+Exemple :
+    python loadtest.py --workers 1,2,4 --duration 15 --concurrency 64
+
+Chaque configuration démarre sur une base et un cache SQLite temporaires. Le cache partagé est
+pré-rempli avec une analyse DCF synthétique pour le ticker LOADTEST, de sorte que l'endpoint
+par défaut (grille de sensibilité 100x100) ne coûte que du calcul et de la sérialisation JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+LOADTEST_TICKER = "LOADTEST"
+DEFAULT_PATH = f"/dcf-valuation/{LOADTEST_TICKER}/sensitivity?wacc_steps=100&growth_steps=100"
+
+
+def synthetic_dcf_analysis(ticker: str = LOADTEST_TICKER) -> dict:
+    """Résultat d'analyse DCF au format de fmp_analysis.get_dcf_analysis"""
+    base_data = {
+        "ticker": ticker, "latest_year": 2024, "base_fcf": 5.0e9, "total_debt": 2.0e10, "cash": 8.0e9,
+        "shares_outstanding": 1_500_000_000, "wacc": 0.0863, "ebitda_margin": 0.3
+    }
+    scenario = {"assumptions": {"fcf_growth": 0.05, "perp_growth": 0.025},
+                "intrinsic_value": 60.0, "enterprise_value": 1.0e11, "equity_value": 9.0e10}
+    return {"success": True, "ticker": ticker, "base_data": base_data,
+            "scenario1": dict(scenario, name="Prospectif"), "scenario2": dict(scenario, name="Historique")}
+
+
+def seed_shared_cache(env: dict):
+    """Pré-remplit le cache partagé de la configuration (processus séparé : database lit sa config à l'import)"""
+    script = (
+        "import json, sys\n"
+        "from database import cache_manager, get_cache_key, CACHE_TTL, CACHE_STALE_TTL\n"
+        "payload = json.loads(sys.argv[1])\n"
+        "cache_manager.set(get_cache_key('get_dcf_analysis', payload['ticker']), payload,"
+        " ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL)\n"
+        "cache_manager.set(get_cache_key('get_stock_data', payload['ticker']),"
+        " {'symbol': payload['ticker'], 'current_price': 50.0}, ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, json.dumps(synthetic_dcf_analysis())],
+                   cwd=API_DIR, env=env, check=True, capture_output=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+         "--worker-class", "uvicorn.workers.UvicornWorker", "--timeout", "120", "main:app"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 90.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"L'API n'a pas démarré en {timeout:.0f}s")
+
+
+async def generate_load(url: str, duration: float, concurrency: int) -> dict:
+    """`concurrency` clients en boucle fermée pendant `duration` secondes"""
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99)
+    }
+
+
+def run_configuration(workers: int, path: str, duration: float, concurrency: int, warmup: float) -> dict:
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        env = dict(
+            os.environ,
+            WEB_CONCURRENCY=str(workers),
+            CACHE_BACKEND="sqlite",
+            DATABASE_PATH=os.path.join(workdir, "screener.db"),
+            SHARED_CACHE_PATH=os.path.join(workdir, "screener_cache.db"),
+            SELENIUM_WARMUP="off"
+        )
+        seed_shared_cache(env)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(workers, port, env)
+        try:
+            wait_until_ready(base_url)
+            if warmup > 0:
+                asyncio.run(generate_load(base_url + path, warmup, concurrency))
+            result = asyncio.run(generate_load(base_url + path, duration, concurrency))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+    return dict(result, workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit de l'API en fonction du nombre de workers gunicorn")
+    parser.add_argument("--workers", default="1,2,4", help="nombres de workers à comparer, séparés par des virgules")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="endpoint GET à solliciter")
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de mesure par configuration (secondes)")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients simultanés")
+    parser.add_argument("--warmup", type=float, default=2.0, help="préchauffage avant mesure (secondes)")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    args = parser.parse_args()
+
+    worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    print(f"🏋️  {args.path} — {args.concurrency} clients, {args.duration:.0f}s par configuration, {os.cpu_count()} CPU")
+    results = []
+    for workers in worker_counts:
+        result = run_configuration(workers, args.path, args.duration, args.concurrency, args.warmup)
+        result["speedup"] = result["throughput_rps"] / results[0]["throughput_rps"] if results else 1.0
+        results.append(result)
+        print(f"   {workers:>2} worker(s): {result['throughput_rps']:8.1f} req/s  x{result['speedup']:.2f}  "
+              f"p50 {result['p50_ms'] or 0:.1f} ms  p95 {result['p95_ms'] or 0:.1f} ms  erreurs {result['errors']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"path": args.path, "concurrency": args.concurrency, "duration": args.duration,
+                       "cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+    print("✅ Banc de charge terminé")
+
+
+if __name__ == "__main__":
+    main()
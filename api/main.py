@@ -1,18 +1,29 @@
 # main.py
 # Fichier : backend/app/main.py
 
-import os
 import json
-from typing import List
+import os
+import time
+from typing import List, Optional
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import ValidationError
+import async_io
+import metrics
+import startup
+# Imports lourds mesurés pour le rapport de démarrage (selenium/stockdex restent paresseux)
+startup.timed_import("pandas")
+startup.timed_import("yfinance")
 import analysis  # Yahoo Finance for screening
 import fmp_analysis  # FMP for DCF
 import schemas
-from database import db_manager, cache_manager
+from dcf_jobs import dcf_job_manager
+from screening_jobs import screening_job_runner
+from async_io import run_blocking, run_cpu
+from data_providers import describe_providers
+from database import db_manager, cache_manager, single_flight, background_refresher
 
 # Création de l'instance FastAPI
 app = FastAPI(
@@ -43,6 +54,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Mesure la latence de chaque requête, étiquetée par modèle de route (/dcf-valuation/{ticker})"""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.observe_request(request.method, getattr(route, "path", "unmatched"), status_code,
+                                time.perf_counter() - start)
+
 # Gestionnaire d'erreurs global pour les erreurs de validation
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -74,21 +99,50 @@ async def value_error_handler(request: Request, exc: ValueError):
     )
 
 
+@app.on_event("startup")
+def on_startup():
+    """Préchauffe selenium/stockdex en arrière-plan et reprend les jobs DCF et de screening interrompus"""
+    startup.mark_ready()
+    startup.start_background_warmup()
+    dcf_job_manager.resume_unfinished()
+    screening_job_runner.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Ferme le client HTTP asynchrone partagé"""
+    await async_io.close_http_client()
+
+@app.get("/metrics", tags=["Status"])
+def get_metrics():
+    """
+    Métriques au format Prometheus : latence des endpoints, appels amont (Yahoo, Wikipedia),
+    scraping Macrotrends, consultations du cache par fonction, requêtes SQLite et navigateurs Chrome.
+    """
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
+
 @app.get("/", tags=["Status"])
 def read_root():
     """Endpoint racine pour vérifier que l'API est en ligne."""
     return {"status": "ok", "message": "Welcome to the Value Screener API!"}
 
+@app.get("/startup", tags=["Status"])
+def get_startup_report():
+    """Rapport de démarrage : durée des imports (yfinance, pandas, selenium, stockdex) et état du préchauffage."""
+    return startup.get_report()
+
 @app.get("/indices", tags=["Screening"])
 def get_available_indices():
     """Retourne la liste des indices boursiers disponibles pour l'analyse."""
     return {"indices": list(analysis.INDEX_CONFIG.keys())}
 
 @app.post("/screening", tags=["Screening"])
-def run_screening(request: schemas.ScreeningRequest):
+async def run_screening(request: schemas.ScreeningRequest, refresh: bool = False):
     """
     Lance le processus de screening basé sur les critères fournis.
     C'est le principal endpoint de l'Étape 1.
+    Les données de l'indice sont réutilisées depuis l'instantané en cache sauf si `refresh=true`.
+    La liste des symboles est récupérée sans bloquer la boucle, le screening tourne dans l'exécuteur d'E/S.
     """
     try:
         # Validation supplémentaire côté serveur
@@ -97,8 +151,12 @@ def run_screening(request: schemas.ScreeningRequest):
         # Log de sécurité (sans données sensibles)
         print(f"🔍 Screening demandé pour l'indice: {request.index_name}")
         
-        # Exécution du screening
-        results = analysis.perform_screening(request.index_name, criteria)
+        # Exécution du screening (symboles résolus sans bloquer la boucle, durée conservée dans l'historique)
+        symbol_report, resolution_start = {}, time.perf_counter()
+        symbols = await analysis.get_index_symbols_async(request.index_name, symbol_report)
+        symbol_report.update(seconds=round(time.perf_counter() - resolution_start, 4), symbols=len(symbols))
+        results = await run_blocking(analysis.perform_screening, request.index_name, criteria,
+                                     use_snapshot=not refresh, symbols=symbols, symbol_report=symbol_report)
         
         if not results:
             raise HTTPException(
@@ -122,50 +180,225 @@ def run_screening(request: schemas.ScreeningRequest):
             detail=f"Erreur interne lors du screening: {str(e)}"
         )
 
+@app.post("/screening/jobs", tags=["Screening"], status_code=202)
+def create_screening_job(request: schemas.ScreeningRequest, refresh: bool = False):
+    """
+    Met un screening en file d'attente et retourne immédiatement son identifiant.
+    Suivre l'état via /screening/jobs/{job_id}, puis lire les résultats via /screening/jobs/{job_id}/results.
+    """
+    job_id = screening_job_runner.submit(request.index_name, request.dict(), use_snapshot=not refresh)
+    return screening_job_runner.get_status(job_id)
+
+@app.get("/screening/jobs/{job_id}", tags=["Screening"])
+def get_screening_job(job_id: int):
+    """État d'un job de screening : position dans la file, actions notées, identifiant du screening produit."""
+    job = screening_job_runner.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job de screening {job_id} non trouvé")
+    return job
+
+@app.get("/screening/jobs/{job_id}/results", tags=["Screening"])
+def get_screening_job_results(job_id: int):
+    """Résultats d'un job de screening terminé (409 tant que le job n'est pas terminé)."""
+    job = screening_job_runner.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job de screening {job_id} non trouvé")
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=f"Le job de screening {job_id} a échoué: {job['error']}")
+    if job['status'] != 'completed':
+        raise HTTPException(status_code=409, detail=f"Le job de screening {job_id} n'est pas terminé (statut: {job['status']})")
+    if not job['screening_id']:
+        raise HTTPException(
+            status_code=404,
+            detail="Aucun résultat trouvé pour les critères donnés. Essayez d'assouplir vos critères."
+        )
+    return {"job": job, "results": db_manager.get_screening(job['screening_id'])['results']}
+
+@app.post("/screening/stream", tags=["Screening"])
+def stream_screening(request: schemas.ScreeningRequest, format: str = "ndjson", refresh: bool = False):
+    """
+    Variante en flux de /screening : chaque action notée est envoyée dès que ses données arrivent,
+    puis un résumé final trié par score ('summary'). `format` vaut 'ndjson' (une ligne JSON par
+    événement) ou 'sse' (Server-Sent Events). Des messages 'keepalive' maintiennent la connexion.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="Format de flux invalide, attendu 'ndjson' ou 'sse'")
+    
+    print(f"🔍 Screening en flux demandé pour l'indice: {request.index_name}")
+    events = analysis.iter_screening(request.index_name, request.dict(), use_snapshot=not refresh)
+    
+    def encode():
+        try:
+            for event in events:
+                payload = json.dumps(event, default=str)
+                if format == "ndjson":
+                    yield payload + "\n"
+                elif event["type"] == "keepalive":
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {payload}\n\n"
+        except Exception as e:
+            print(f"❌ Erreur lors du screening en flux: {str(e)}")
+            error = json.dumps({"type": "error", "detail": f"Erreur interne lors du screening: {str(e)}"})
+            yield error + "\n" if format == "ndjson" else f"event: error\ndata: {error}\n\n"
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(encode(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
 # Dans backend/app/main.py, ajoutez cet endpoint :
 
+async def _get_dcf_analysis(ticker: str, wacc: Optional[float] = None) -> dict:
+    """
+    Analyse DCF dans l'exécuteur d'E/S : la lecture du cache (Redis ou SQLite partagé) peut elle-même
+    bloquer, elle ne se fait donc jamais sur la boucle. Le calcul n'a lieu qu'en cas d'absence du cache.
+    Sans `wacc`, la clé de cache est celle de /dcf-valuation.
+    """
+    if wacc is None:
+        return await run_blocking(fmp_analysis.get_dcf_analysis, ticker)
+    return await run_blocking(fmp_analysis.get_dcf_analysis, ticker, wacc)
+
+async def _get_stock_data(ticker: str) -> Optional[dict]:
+    """Données de marché dans l'exécuteur d'E/S (cache consulté en premier, hors de la boucle)"""
+    return await run_blocking(analysis.get_stock_data, ticker)
+
 @app.get("/dcf-valuation/{ticker}", tags=["Analysis"])
-def get_dcf_valuation(ticker: str):
+async def get_dcf_valuation(ticker: str):
     """
     Lance une analyse DCF à 2 scénarios basée sur les données de FMP.
     C'est le nouvel endpoint pour l'Étape 2.
+    Les résultats en cache sont servis directement, le scraping passe par l'exécuteur d'E/S.
     """
-    valuation_results = fmp_analysis.get_dcf_analysis(ticker)
+    valuation_results = await _get_dcf_analysis(ticker)
     if "error" in valuation_results:
         raise HTTPException(status_code=404, detail=f"L'analyse DCF a échoué pour {ticker}: {valuation_results['error']}")
     
     # Fetch real-time data using the existing analysis function
-    stock_data = analysis.get_stock_data(ticker)
+    stock_data = await _get_stock_data(ticker)
     current_price = stock_data.get('current_price') if stock_data else None
 
     # Add current price and additional fields needed by frontend
     enhanced_data = valuation_results.copy()
     
-    # Add missing fields for frontend compatibility
-    if "scenario1" in enhanced_data:
-        enhanced_data["scenario1"]["revenue_growth"] = enhanced_data["scenario1"]["assumptions"]["fcf_growth"]
-        enhanced_data["scenario1"]["ebitda_margin"] = 0.15  # Default value
-        enhanced_data["scenario1"]["discount_rate"] = 0.10  # Default WACC
-        enhanced_data["scenario1"]["terminal_growth"] = enhanced_data["scenario1"]["assumptions"]["perp_growth"]
-    
-    if "scenario2" in enhanced_data:
-        enhanced_data["scenario2"]["revenue_growth"] = enhanced_data["scenario2"]["assumptions"]["fcf_growth"]
-        enhanced_data["scenario2"]["ebitda_margin"] = 0.15  # Default value
-        enhanced_data["scenario2"]["discount_rate"] = 0.10  # Default WACC
-        enhanced_data["scenario2"]["terminal_growth"] = enhanced_data["scenario2"]["assumptions"]["perp_growth"]
+    # Add missing fields for frontend compatibility (WACC et marge EBITDA réels de l'analyse)
+    base_data = enhanced_data.get("base_data", {})
+    for scenario_key in ("scenario1", "scenario2"):
+        if scenario_key in enhanced_data:
+            scenario = enhanced_data[scenario_key] = dict(enhanced_data[scenario_key])
+            scenario["revenue_growth"] = scenario["assumptions"]["fcf_growth"]
+            scenario["ebitda_margin"] = base_data.get("ebitda_margin") or 0.15  # valeur par défaut si marge inconnue
+            scenario["discount_rate"] = base_data.get("wacc", fmp_analysis.DEFAULT_WACC)
+            scenario["terminal_growth"] = scenario["assumptions"]["perp_growth"]
     
     # Add current price (placeholder - should be fetched from real-time data)
     enhanced_data["current_price"] = current_price
     
     return enhanced_data
     
+@app.get("/dcf-valuation/{ticker}/sensitivity", tags=["Analysis"])
+async def get_dcf_sensitivity(
+    ticker: str,
+    wacc_min: float = 0.06,
+    wacc_max: float = 0.12,
+    wacc_steps: int = 50,
+    growth_min: float = 0.0,
+    growth_max: float = 0.04,
+    growth_steps: int = 50,
+    fcf_growth: Optional[float] = None
+):
+    """
+    Matrice de sensibilité de la valeur intrinsèque (lignes = WACC, colonnes = croissance perpétuelle).
+    Calculée à partir des données de base de l'analyse DCF en cache, sans nouveau scraping.
+    Par défaut, la croissance du FCF est celle du scénario prospectif.
+    """
+    valuation_results = await _get_dcf_analysis(ticker)
+    if "error" in valuation_results:
+        raise HTTPException(status_code=404, detail=f"L'analyse DCF a échoué pour {ticker}: {valuation_results['error']}")
+    
+    if fcf_growth is None:
+        fcf_growth = valuation_results["scenario1"]["assumptions"]["fcf_growth"]
+    try:
+        return await run_cpu(
+            fmp_analysis.build_sensitivity_grid,
+            valuation_results["base_data"],
+            (wacc_min, wacc_max, wacc_steps),
+            (growth_min, growth_max, growth_steps),
+            fcf_growth
+        )
+    except fmp_analysis.DCFAnalysisError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/dcf-valuation/{ticker}/monte-carlo", tags=["Analysis"])
+async def get_dcf_monte_carlo(
+    ticker: str,
+    paths: int = fmp_analysis.MONTE_CARLO_DEFAULT_PATHS,
+    seed: Optional[int] = None,
+    budget_ms: Optional[float] = None,
+    wacc: Optional[float] = None
+):
+    """
+    Valorisation DCF Monte Carlo : croissance du FCF, croissance perpétuelle et WACC tirés de lois
+    ajustées sur l'historique du ticker. Retourne les percentiles de la valeur intrinsèque et la
+    probabilité de sous-évaluation par rapport au cours actuel. `seed` rend le tirage reproductible,
+    `budget_ms` borne la durée de simulation.
+    """
+    valuation_results = await _get_dcf_analysis(ticker, wacc)
+    if "error" in valuation_results:
+        raise HTTPException(status_code=404, detail=f"L'analyse DCF a échoué pour {ticker}: {valuation_results['error']}")
+    
+    stock_data = await _get_stock_data(ticker)
+    current_price = stock_data.get('current_price') if stock_data else None
+    try:
+        return await run_blocking(fmp_analysis.get_monte_carlo_dcf, ticker, current_price, paths, seed, budget_ms, wacc,
+                                  valuation_results)
+    except fmp_analysis.DCFAnalysisError as e:
+        raise HTTPException(status_code=400, detail=f"Simulation Monte Carlo impossible pour {ticker}: {e}")
+
+@app.post("/dcf/jobs", tags=["Analysis"], status_code=202)
+def create_dcf_job(request: schemas.DCFJobRequest):
+    """
+    Lance en arrière-plan l'analyse DCF de tous les symboles d'un indice.
+    Suivre la progression via /dcf/jobs/{job_id} ou le flux SSE /dcf/jobs/{job_id}/events.
+    """
+    job_id = dcf_job_manager.submit(request.index_name)
+    return dcf_job_manager.get_progress(job_id)
+
+@app.get("/dcf/jobs/{job_id}", tags=["Analysis"])
+def get_dcf_job(job_id: int):
+    """État et progression d'un job DCF d'indice."""
+    job = dcf_job_manager.get_progress(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job DCF {job_id} non trouvé")
+    return job
+
+@app.get("/dcf/jobs/{job_id}/events", tags=["Analysis"])
+def stream_dcf_job(job_id: int):
+    """Progression d'un job DCF en Server-Sent Events (événements 'progress' puis 'done')."""
+    if not dcf_job_manager.get_progress(job_id):
+        raise HTTPException(status_code=404, detail=f"Job DCF {job_id} non trouvé")
+    return StreamingResponse(
+        dcf_job_manager.iter_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.get("/dcf/jobs/{job_id}/results", tags=["Analysis"])
+def get_dcf_job_results(job_id: int, with_screening: bool = True):
+    """
+    Tableau de sous-évaluation : résultats du job classés par potentiel de hausse décroissant,
+    avec le score du dernier screening du même indice si `with_screening`.
+    """
+    job = dcf_job_manager.get_progress(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job DCF {job_id} non trouvé")
+    return {"job": job, "results": db_manager.get_dcf_job_results(job_id, with_screening=with_screening)}
+
 @app.get("/financials/{ticker}", tags=["Analysis"])
-def get_stock_financials(ticker: str):
+async def get_stock_financials(ticker: str):
     """
     Récupère les états financiers détaillés pour un ticker donné.
     C'est l'endpoint pour l'Étape 2.
     """
-    financial_data = fmp_analysis.get_financial_statements(ticker)
+    financial_data = await run_blocking(fmp_analysis.get_financial_statements, ticker)
     if not financial_data:
         raise HTTPException(status_code=404, detail=f"Données financières non trouvées pour le ticker {ticker}.")
     return financial_data
@@ -238,28 +471,27 @@ def get_screening_details(screening_id: int):
     Inclut tous les résultats et critères utilisés.
     """
     try:
-        with db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM screenings WHERE id = ?
-            """, (screening_id,))
-            
-            record = cursor.fetchone()
-            if not record:
-                raise HTTPException(status_code=404, detail=f"Screening {screening_id} non trouvé")
-            
-            return {
-                "id": record["id"],
-                "timestamp": record["timestamp"],
-                "index_name": record["index_name"],
-                "criteria": json.loads(record["criteria"]) if isinstance(record["criteria"], str) else record["criteria"],
-                "results": json.loads(record["results"]) if isinstance(record["results"], str) else record["results"],
-                "total_results": record["total_results"],
-                "execution_time": record["execution_time"]
-            }
+        screening = db_manager.get_screening(screening_id)
+        if not screening:
+            raise HTTPException(status_code=404, detail=f"Screening {screening_id} non trouvé")
+        return screening
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération du screening: {str(e)}")
 
+@app.get("/screening/symbol/{symbol}", tags=["Screening"])
+def get_symbol_screening_history(symbol: str, min_score: Optional[float] = None, limit: int = 100):
+    """
+    Récupère tous les screenings où un symbole apparaît.
+    Exemple : /screening/symbol/AIR.PA?min_score=100 pour chaque screening où AIR.PA a obtenu 100.
+    """
+    try:
+        history = db_manager.get_symbol_history(symbol, min_score=min_score, limit=limit)
+        return {"symbol": symbol, "history": history, "total_records": len(history)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération de l'historique de {symbol}: {str(e)}")
+
 @app.delete("/screening/history/{screening_id}", tags=["Screening"], status_code=204)
 def delete_screening(screening_id: int):
     """
@@ -311,6 +543,14 @@ def get_cache_stats():
                     "cache_entries": cached_tickers,
                     "cached_indices": cached_indices
                 },
+                "database_pool": db_manager.pool.stats(),
+                "memory_cache": cache_manager.stats(),
+                "single_flight": single_flight.stats(),
+                "stale_while_revalidate": background_refresher.stats(),
+                "chrome_pool": startup.chrome_pool_stats(),
+                "async_io": async_io.stats(),
+                "providers": describe_providers(quotes=analysis.quote_provider, statements=fmp_analysis.statements_provider,
+                                                index_constituents=analysis.index_provider),
                 "cache_type": "Redis disponible" if hasattr(cache_manager, 'redis_client') and cache_manager.redis_client else "Cache memoire"
             }
     except Exception as e:
@@ -0,0 +1,93 @@
+# metrics.py - Métriques Prometheus des chemins critiques : endpoints, sources amont, cache, SQLite et Chrome
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+# Avec plusieurs workers gunicorn, définir PROMETHEUS_MULTIPROC_DIR (répertoire vide au démarrage)
+# pour que /metrics agrège les valeurs de tous les processus
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Bornes des histogrammes (secondes) : des requêtes SQLite (~0,1 ms) aux scrapings Selenium (~1 min)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "screener_http_request_duration_seconds", "Durée de traitement des requêtes HTTP par route",
+    ["method", "route", "status"], buckets=SLOW_BUCKETS
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "screener_upstream_request_duration_seconds", "Durée des appels aux sources de données externes",
+    ["source", "operation"], buckets=SLOW_BUCKETS
+)
+UPSTREAM_REQUESTS = Counter(
+    "screener_upstream_requests_total", "Appels aux sources externes par résultat ('ok', 'empty' ou 'error')",
+    ["source", "operation", "outcome"]
+)
+SCRAPE_DURATION = Histogram(
+    "screener_macrotrends_scrape_duration_seconds", "Durée du scraping Macrotrends par état financier",
+    ["statement", "outcome"], buckets=SLOW_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "screener_cache_lookups_total", "Consultations du cache cache_api_response ('hit', 'stale' ou 'miss')",
+    ["function", "result"]
+)
+SQLITE_QUERY_DURATION = Histogram(
+    "screener_sqlite_query_duration_seconds", "Durée d'exécution des requêtes SQLite par type et table",
+    ["operation", "table"], buckets=FAST_BUCKETS
+)
+CHROME_LAUNCHES = Counter("screener_chrome_launches_total", "Navigateurs Chrome lancés par le pool")
+CHROME_RECYCLES = Counter("screener_chrome_recycles_total", "Navigateurs Chrome recyclés par le pool")
+
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+(\w+)", re.IGNORECASE)
+
+
+def query_labels(sql: str) -> Tuple[str, str]:
+    """(opération, table) d'une requête SQL, pour des étiquettes de cardinalité bornée"""
+    words = sql.split(None, 1)
+    if not words:
+        return "other", "-"
+    match = _TABLE_PATTERN.search(sql)
+    return words[0].upper(), match.group(1).lower() if match else "-"
+
+
+def observe_query(sql: str, seconds: float):
+    SQLITE_QUERY_DURATION.labels(*query_labels(sql)).observe(seconds)
+
+
+@contextmanager
+def upstream_call(source: str, operation: str):
+    """
+    Mesure un appel à une source externe. Le bloc peut fixer `call["outcome"] = "empty"`
+    quand la source répond sans données ; une exception compte comme 'error'.
+    """
+    call = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["outcome"] = "error"
+        raise
+    finally:
+        UPSTREAM_REQUEST_DURATION.labels(source, operation).observe(time.perf_counter() - start)
+        UPSTREAM_REQUESTS.labels(source, operation, call["outcome"]).inc()
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(seconds)
+
+
+def render(registry: Optional[CollectorRegistry] = None) -> Tuple[bytes, str]:
+    """Exposition au format texte Prometheus : (contenu, type MIME)"""
+    if registry is None:
+        if PROMETHEUS_MULTIPROC_DIR:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -3,6 +3,23 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Literal, Optional
 
+# Liste des indices autorisés pour la sécurité (synchronisée avec analysis.py)
+ALLOWED_INDICES = [
+    'CAC 40 (France)', 'S&P 500 (USA)', 'NASDAQ 100 (USA)', 
+    'DAX (Germany)', 'Dow Jones (USA)', 'Russell 2000 (USA)'
+]
+
+
+def validate_allowed_index(v: str) -> str:
+    """Validation du nom d'indice pour éviter les injections"""
+    if not v or not v.strip():
+        raise ValueError('Le nom de l\'indice ne peut pas être vide')
+    
+    if v not in ALLOWED_INDICES:
+        raise ValueError(f'Indice non autorisé. Indices valides: {", ".join(ALLOWED_INDICES)}')
+    
+    return v.strip()
+
 class ScreeningRequest(BaseModel):
     """
     Modèle de données pour une requête de screening avec validation robuste.
@@ -43,19 +60,7 @@ class ScreeningRequest(BaseModel):
     @classmethod
     def validate_index_name(cls, v):
         """Validation du nom d'indice pour éviter les injections"""
-        if not v or not v.strip():
-            raise ValueError('Le nom de l\'indice ne peut pas être vide')
-        
-        # Liste des indices autorisés pour la sécurité (synchronisée avec analysis.py)
-        allowed_indices = [
-            'CAC 40 (France)', 'S&P 500 (USA)', 'NASDAQ 100 (USA)', 
-            'DAX (Germany)', 'Dow Jones (USA)', 'Russell 2000 (USA)'
-        ]
-        
-        if v not in allowed_indices:
-            raise ValueError(f'Indice non autorisé. Indices valides: {", ".join(allowed_indices)}')
-        
-        return v.strip()
+        return validate_allowed_index(v)
     
     @field_validator('pe_max', 'pb_max', 'de_max', 'roe_min')
     @classmethod
@@ -83,6 +88,17 @@ class ScreeningRequest(BaseModel):
             }
         }
 
+# --- DCF Job Schemas ---
+
+class DCFJobRequest(BaseModel):
+    """Modèle pour le lancement d'un job DCF sur tous les symboles d'un indice."""
+    index_name: str = Field(..., min_length=1, max_length=100, description="Nom de l'indice boursier")
+    
+    @field_validator('index_name')
+    @classmethod
+    def validate_index_name(cls, v):
+        return validate_allowed_index(v)
+
 # --- Watchlist Schemas ---
 
 class WatchlistItem(BaseModel):
@@ -0,0 +1,108 @@
+# screening_jobs.py - Exécution des screenings en arrière-plan via une file d'attente SQLite persistante
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import analysis
+from database import db_manager
+
+# Workers d'exécution des jobs (chaque screening parallélise déjà ses requêtes Yahoo Finance)
+SCREENING_JOB_WORKERS = int(os.getenv("SCREENING_JOB_WORKERS", "1"))
+SCREENING_JOB_POLL_INTERVAL = float(os.getenv("SCREENING_JOB_POLL_INTERVAL", "2.0"))  # secondes sans job en attente
+SCREENING_JOB_MAX_ATTEMPTS = int(os.getenv("SCREENING_JOB_MAX_ATTEMPTS", "3"))  # reprises après redémarrage
+SCREENING_JOB_PROGRESS_EVERY = 25  # actions notées entre deux mises à jour de la progression
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class ScreeningJobRunner:
+    """
+    Exécute les jobs de screening en file d'attente. Les jobs sont stockés dans SQLite :
+    un job soumis avant un redémarrage, ou interrompu en cours d'exécution, est repris au démarrage suivant.
+    """
+    
+    def __init__(self, workers: int = SCREENING_JOB_WORKERS, poll_interval: float = SCREENING_JOB_POLL_INTERVAL,
+                 screening: Callable = None, db=None):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._screening = screening or analysis.iter_screening
+        self._db = db or db_manager
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+    
+    def start(self) -> int:
+        """Remet en attente les jobs interrompus et démarre les workers, retourne le nombre de jobs repris"""
+        if self._threads:
+            return 0
+        requeued = self._db.requeue_running_screening_jobs()
+        if requeued:
+            print(f"🔁 {requeued} job(s) de screening interrompu(s) remis en file d'attente")
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work_loop, name=f"screening-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return requeued
+    
+    def stop(self, timeout: float = 5.0):
+        """Arrête les workers après leur job en cours"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+    
+    def submit(self, index_name: str, criteria: dict, use_snapshot: bool = True) -> int:
+        """Ajoute un job à la file d'attente et réveille un worker"""
+        job_id = self._db.create_screening_job(index_name, criteria, use_snapshot)
+        self._wakeup.set()
+        return job_id
+    
+    def _work_loop(self):
+        while not self._stop.is_set():
+            job = self._db.claim_next_screening_job()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+    
+    def _run(self, job: Dict):
+        job_id = job['id']
+        if job['attempts'] > SCREENING_JOB_MAX_ATTEMPTS:
+            self._db.finish_screening_job(job_id, error=f"Abandonné après {SCREENING_JOB_MAX_ATTEMPTS} tentatives")
+            return
+        
+        print(f"▶️  Job de screening {job_id}: {job['index_name']}")
+        processed, summary = 0, None
+        try:
+            for event in self._screening(job['index_name'], job['criteria'], use_snapshot=job['use_snapshot']):
+                if event['type'] == 'stock':
+                    processed += 1
+                    if processed % SCREENING_JOB_PROGRESS_EVERY == 0:
+                        self._db.update_screening_job_progress(job_id, processed)
+                elif event['type'] == 'summary':
+                    summary = event
+            self._db.update_screening_job_progress(job_id, processed)
+            self._db.finish_screening_job(job_id, summary['screening_id'], summary['total_results'])
+            print(f"✅ Job de screening {job_id} terminé: {summary['total_results']} résultats")
+        except Exception as e:
+            self._db.finish_screening_job(job_id, error=str(e))
+            print(f"❌ Job de screening {job_id} échoué: {e}")
+    
+    def get_status(self, job_id: int) -> Optional[Dict]:
+        return self._db.get_screening_job(job_id)
+    
+    def wait(self, job_id: int, timeout: float = 60.0) -> Optional[Dict]:
+        """Attend la fin d'un job (utilisé par les tests et scripts)"""
+        deadline = time.time() + timeout
+        job = self.get_status(job_id)
+        while job and job['status'] not in TERMINAL_STATUSES and time.time() < deadline:
+            time.sleep(0.05)
+            job = self.get_status(job_id)
+        return job
+
+
+screening_job_runner = ScreeningJobRunner()
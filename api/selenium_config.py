@@ -5,10 +5,36 @@ Inclut le monkey patching pour stockdx
 
 import os
 import functools
+import threading
+import time
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 
+import metrics
+
+try:
+    import psutil  # Optionnel : mesure de la mémoire des navigateurs du pool
+except ImportError:
+    psutil = None
+
+# Configuration du pool de navigateurs
+# Budget de navigateurs de l'hôte, réparti entre les WEB_CONCURRENCY workers gunicorn
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+CHROME_TOTAL_BUDGET = int(os.getenv("CHROME_TOTAL_BUDGET", "2"))
+
+
+def per_worker_chrome_budget(total: int = CHROME_TOTAL_BUDGET, workers: int = WEB_CONCURRENCY) -> int:
+    """Navigateurs vivants autorisés par worker : part du budget de l'hôte, au moins un"""
+    return max(1, total // max(1, workers))
+
+
+CHROME_POOL_SIZE = int(os.getenv("CHROME_POOL_SIZE", str(per_worker_chrome_budget())))  # navigateurs vivants maximum par worker
+CHROME_MAX_PAGES_PER_DRIVER = int(os.getenv("CHROME_MAX_PAGES_PER_DRIVER", "50"))
+CHROME_MAX_MEMORY_MB = int(os.getenv("CHROME_MAX_MEMORY_MB", "600"))
+CHROME_POOL_TIMEOUT = float(os.getenv("CHROME_POOL_TIMEOUT", "120"))  # attente max d'un navigateur libre
+
 
 def get_optimized_chrome_options():
     """
@@ -145,6 +171,191 @@ def test_chrome_setup():
         return False
 
 
+# ============================================================================
+# POOL DE NAVIGATEURS RÉUTILISABLES
+# ============================================================================
+
+class ChromeDriverPool:
+    """
+    Pool borné de drivers Chrome réutilisés d'une requête à l'autre.
+    Un driver est recyclé après `max_pages` pages, au-delà de `max_memory_mb`
+    (si psutil est disponible) ou quand son contrôle de santé échoue.
+    """
+    
+    def __init__(self, max_size=CHROME_POOL_SIZE, max_pages=CHROME_MAX_PAGES_PER_DRIVER,
+                 max_memory_mb=CHROME_MAX_MEMORY_MB, timeout=CHROME_POOL_TIMEOUT, driver_factory=None):
+        self.max_size = max(1, max_size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.timeout = timeout
+        self._driver_factory = driver_factory or create_optimized_driver
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._idle = []  # liste de [driver, pages servies]
+        self._live = 0
+        self._in_use = 0
+        self.launches = 0
+        self.recycles = 0
+        self.health_failures = 0
+        self.pages_served = 0
+        self.checkouts = 0
+        self.total_wait = 0.0
+    
+    def _launch(self):
+        driver = self._driver_factory()
+        with self._lock:
+            self._live += 1
+            self.launches += 1
+        metrics.CHROME_LAUNCHES.inc()
+        print(f"🚀 Nouveau navigateur lancé ({self._live}/{self.max_size})")
+        return [driver, 0]
+    
+    def _quit(self, entry, reason):
+        try:
+            entry[0].quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._live -= 1
+            self.recycles += 1
+        metrics.CHROME_RECYCLES.inc()
+        print(f"♻️  Navigateur recyclé ({reason})")
+    
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _memory_mb(driver) -> float:
+        """Mémoire (Mo) du chromedriver et de ses processus Chrome, 0 si non mesurable"""
+        if psutil is None:
+            return 0.0
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception:
+            return 0.0
+    
+    @contextmanager
+    def driver(self):
+        """Emprunte un driver sain, en attendant au plus `timeout` secondes qu'un navigateur se libère"""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise RuntimeError(f"Aucun navigateur disponible après {self.timeout}s (pool de {self.max_size})")
+        entry = None
+        try:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is not None and not self._is_healthy(entry[0]):
+                with self._lock:
+                    self.health_failures += 1
+                self._quit(entry, "contrôle de santé échoué")
+                entry = None
+            if entry is None:
+                entry = self._launch()
+            with self._lock:
+                self._in_use += 1
+                self.checkouts += 1
+                self.total_wait += time.perf_counter() - start
+            
+            try:
+                yield entry[0]
+            except Exception:
+                # Driver potentiellement dans un état incohérent : on ne le réutilise pas
+                self._quit(entry, "erreur pendant l'utilisation")
+                entry = None
+                raise
+            finally:
+                with self._lock:
+                    self._in_use -= 1
+            
+            entry[1] += 1
+            with self._lock:
+                self.pages_served += 1
+            if self.max_pages and entry[1] >= self.max_pages:
+                self._quit(entry, f"{entry[1]} pages servies")
+            elif self.max_memory_mb and self._memory_mb(entry[0]) > self.max_memory_mb:
+                self._quit(entry, f"mémoire > {self.max_memory_mb} Mo")
+            else:
+                with self._lock:
+                    self._idle.append(entry)
+        finally:
+            self._slots.release()
+    
+    def get_page_source(self, url: str) -> str:
+        """Charge une page avec un driver du pool et retourne son HTML"""
+        with self.driver() as driver:
+            driver.get(url)
+            return driver.page_source
+    
+    def health_check(self) -> int:
+        """Ferme les drivers inactifs qui ne répondent plus ; retourne leur nombre"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        healthy, failed = [], 0
+        for entry in idle:
+            if self._is_healthy(entry[0]):
+                healthy.append(entry)
+            else:
+                failed += 1
+                self._quit(entry, "contrôle de santé échoué")
+        with self._lock:
+            self.health_failures += failed
+            self._idle.extend(healthy)
+        return failed
+    
+    def shutdown(self):
+        """Ferme tous les navigateurs inactifs"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._quit(entry, "arrêt du pool")
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "live_drivers": self._live,
+                "idle_drivers": len(self._idle),
+                "in_use": self._in_use,
+                "utilization": self._in_use / self.max_size,
+                "launches": self.launches,
+                "recycles": self.recycles,
+                "health_failures": self.health_failures,
+                "pages_served": self.pages_served,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "psutil_available": psutil is not None
+            }
+
+
+chrome_pool = ChromeDriverPool()
+
+
+def _pooled_get_html_content(self, url: str):
+    """Remplace selenium_interface.get_html_content de stockdex : un driver du pool au lieu d'un nouveau Chrome"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(chrome_pool.get_page_source(url), "html.parser")
+
+
+def apply_stockdex_driver_pool():
+    """
+    Fait passer les pages chargées par stockdex par le pool de navigateurs
+    """
+    try:
+        from stockdex import selenium_interface as stockdex_selenium
+    except ImportError:
+        print("⚠️  stockdex non disponible, pool de navigateurs non branché")
+        return False
+    stockdex_selenium.selenium_interface.get_html_content = _pooled_get_html_content
+    print("✅ Pool de navigateurs branché sur stockdex")
+    return True
+
+
 # ============================================================================
 # MONKEY PATCHING POUR STOCKDX ET AUTRES BIBLIOTHÈQUES
 # ============================================================================
@@ -191,11 +402,12 @@ def setup_stockdx_selenium():
     """
     print("📈 Configuration de Selenium pour stockdx...")
     apply_selenium_monkey_patch()
+    apply_stockdex_driver_pool()
     
-    # Test rapide pour vérifier que le patch fonctionne
+    # Test rapide pour vérifier que le patch fonctionne (le navigateur lancé reste dans le pool)
     try:
-        driver = webdriver.Chrome()
-        driver.quit()
+        with chrome_pool.driver():
+            pass
         print("✅ Configuration stockdx validée!")
         return True
     except Exception as e:
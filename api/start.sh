@@ -78,18 +78,13 @@ fi
 # Se placer dans le bon répertoire
 cd /app/api
 
-# Test rapide de la configuration stockdx
-echo "🧪 Test de la configuration stockdx..."
-python3 -c "
-try:
-    from selenium_config import setup_stockdx_selenium
-    setup_stockdx_selenium()
-    print('✅ Configuration stockdx validée')
-except Exception as e:
-    print(f'⚠️  Erreur de configuration stockdx: {e}')
-    print('🔄 L\'application va quand même démarrer...')
-"
+# La configuration stockdx n'est plus testée ici : selenium/stockdex sont chargés
+# paresseusement et le navigateur est préchauffé en arrière-plan après le démarrage
+# de l'API (SELENIUM_WARMUP=background, état visible sur /startup).
 
 # Démarrer l'application
-echo "🚀 Lancement de l'application..."
-exec gunicorn --bind 0.0.0.0:${PORT:-8080} --workers 1 --worker-class uvicorn.workers.UvicornWorker --timeout 120 main:app
\ No newline at end of file
+# Plusieurs workers possibles : sans REDIS_URL, le cache est partagé via SQLite (CACHE_BACKEND=auto),
+# les écritures SQLite sont sérialisées et CHROME_TOTAL_BUDGET est réparti entre les workers
+export WEB_CONCURRENCY=${WEB_CONCURRENCY:-1}
+echo "🚀 Lancement de l'application (${WEB_CONCURRENCY} worker(s))..."
+exec gunicorn --bind 0.0.0.0:${PORT:-8080} --workers ${WEB_CONCURRENCY} --worker-class uvicorn.workers.UvicornWorker --timeout 120 main:app
\ No newline at end of file
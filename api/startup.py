@@ -0,0 +1,98 @@
+# startup.py - Mesure du démarrage et chargement paresseux de selenium/stockdex
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Préchauffage du navigateur : 'background' (après le démarrage de l'API) ou 'off'
+SELENIUM_WARMUP = os.getenv("SELENIUM_WARMUP", "background")
+
+PROCESS_START = time.time()
+
+_import_timings = {}
+_lock = threading.Lock()
+_stockdex_ticker = None
+_selenium_state = {"status": "not_loaded", "load_seconds": None, "warmup_seconds": None, "error": None}
+_ready_at = None
+
+
+def timed_import(module_name: str):
+    """Importe un module en mesurant la durée du premier import"""
+    already_loaded = module_name in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if not already_loaded and module_name not in _import_timings:
+        _import_timings[module_name] = time.perf_counter() - start
+    return module
+
+
+def mark_ready():
+    """Note l'instant où l'API est prête à servir"""
+    global _ready_at
+    _ready_at = time.time()
+
+
+def load_stockdex():
+    """
+    Importe selenium et stockdex au premier besoin, applique la configuration Chrome optimisée
+    et le pool de navigateurs, puis retourne la classe stockdex.Ticker.
+    """
+    global _stockdex_ticker
+    if _stockdex_ticker is not None:
+        return _stockdex_ticker
+    with _lock:
+        if _stockdex_ticker is None:
+            start = time.perf_counter()
+            _selenium_state["status"] = "loading"
+            try:
+                timed_import("selenium")
+                stockdex = timed_import("stockdex")
+                selenium_config = timed_import("selenium_config")
+                selenium_config.apply_selenium_monkey_patch()
+                selenium_config.apply_stockdex_driver_pool()
+                _stockdex_ticker = stockdex.Ticker
+            except Exception as e:
+                _selenium_state.update(status="failed", error=str(e))
+                raise
+            _selenium_state.update(status="loaded", load_seconds=time.perf_counter() - start)
+    return _stockdex_ticker
+
+
+def warm_up_selenium():
+    """Charge selenium/stockdex et lance un premier navigateur dans le pool"""
+    try:
+        load_stockdex()
+        start = time.perf_counter()
+        with sys.modules["selenium_config"].chrome_pool.driver():
+            pass
+        _selenium_state.update(status="ready", warmup_seconds=time.perf_counter() - start)
+        print(f"✅ Selenium préchauffé en {_selenium_state['warmup_seconds']:.2f}s")
+    except Exception as e:
+        _selenium_state.update(status="failed", error=str(e))
+        print(f"⚠️  Préchauffage Selenium échoué: {e}")
+
+
+def start_background_warmup() -> Optional[threading.Thread]:
+    """Lance le préchauffage dans un thread de fond si SELENIUM_WARMUP le demande"""
+    if SELENIUM_WARMUP != "background":
+        return None
+    thread = threading.Thread(target=warm_up_selenium, name="selenium-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def chrome_pool_stats() -> Optional[Dict[str, Any]]:
+    """Statistiques du pool de navigateurs, None tant que selenium n'est pas chargé"""
+    selenium_config = sys.modules.get("selenium_config")
+    return selenium_config.chrome_pool.stats() if selenium_config else None
+
+
+def get_report() -> Dict[str, Any]:
+    """Rapport de démarrage : durée de chaque import mesuré et état de selenium"""
+    return {
+        "imports_seconds": dict(_import_timings),
+        "ready_after_seconds": (_ready_at - PROCESS_START) if _ready_at else None,
+        "selenium": dict(_selenium_state)
+    }
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test des entrées/sorties asynchrones : lectures en cache servies pendant un appel bloquant lent,
+exécuteurs bornés et valeurs en cache servies sans recalcul
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import async_io
+from database import cache_api_response, cache_manager
+
+calls = []
+
+
+@cache_api_response
+def slow_lookup(key: str) -> dict:
+    calls.append(key)
+    time.sleep(0.5)
+    return {"key": key}
+
+
+def test_cache_hit_never_computes():
+    """Une valeur en cache est servie sans relancer le calcul"""
+    cache_manager.clear_pattern("*")
+    calls.clear()
+    assert slow_lookup("present") == {"key": "present"}
+    assert slow_lookup("present") == {"key": "present"}
+    assert calls == ["present"]
+
+
+def test_cached_reads_not_blocked_by_slow_call():
+    """Les lectures en cache, faites dans l'exécuteur d'E/S, se terminent pendant qu'un appel bloquant lent est en cours"""
+    cache_manager.clear_pattern("*")
+    slow_lookup("warm")
+
+    async def scenario():
+        slow_task = asyncio.ensure_future(async_io.run_blocking(slow_lookup, "cold"))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(async_io.run_blocking(slow_lookup, "warm") for _ in range(200)))
+        fast_elapsed = time.perf_counter() - start
+        assert not slow_task.done()
+        assert async_io.stats()["in_flight"]["blocking_io"] == 1
+        await slow_task
+        return results, fast_elapsed
+
+    results, fast_elapsed = asyncio.run(scenario())
+    assert all(result == {"key": "warm"} for result in results)
+    assert fast_elapsed < 0.25, f"lectures en cache trop lentes: {fast_elapsed:.3f}s"
+    assert async_io.stats()["in_flight"]["blocking_io"] == 0
+
+
+def test_executors():
+    """run_blocking et run_cpu exécutent les fonctions hors de la boucle avec leurs arguments"""
+    async def scenario():
+        return await asyncio.gather(
+            async_io.run_blocking(sum, [1, 2, 3]),
+            async_io.run_cpu(pow, 2, 10),
+            async_io.run_blocking(sorted, [3, 1, 2], reverse=True)
+        )
+
+    assert asyncio.run(scenario()) == [6, 1024, [3, 2, 1]]
+
+
+def test_shared_http_client():
+    """Le client HTTP partagé est réutilisé puis fermé proprement"""
+    async def scenario():
+        client = async_io.get_http_client()
+        assert async_io.get_http_client() is client
+        assert async_io.stats()["http_client_open"]
+        await async_io.close_http_client()
+        assert not async_io.stats()["http_client_open"]
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_cache_hit_never_computes()
+    test_cached_reads_not_blocked_by_slow_call()
+    test_executors()
+    test_shared_http_client()
+    print("✅ Tests des entrées/sorties asynchrones validés")
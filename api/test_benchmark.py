@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test de la suite de benchmarks hors ligne : rejeu des fixtures Macrotrends et yfinance,
+univers déterministes, exécution isolée et détection des régressions dans l'historique
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+import benchmark
+import fmp_analysis
+
+
+def test_universe_is_deterministic():
+    """Les univers de 40 à 2000 symboles sont reproductibles et sans doublon"""
+    infos = benchmark.load_quote_fixtures()
+    for size in benchmark.UNIVERSE_SIZES:
+        universe = benchmark.build_universe(infos, size)
+        assert len(universe) == size
+        assert universe == benchmark.build_universe(infos, size)
+    assert set(infos) <= set(benchmark.build_universe(infos, 40))
+
+
+def test_replayed_statements_parse():
+    """Les tableaux Macrotrends rejoués passent par le nettoyage et la DCF sans réseau ni Chrome"""
+    original_db, original_cache = analysis.db_manager, analysis.cache_manager
+    with benchmark.BenchmarkEnvironment() as env:
+        for ticker in env.provider.statement_symbols():
+            is_df, bs_df, cf_df = fmp_analysis.scrape_financial_statements(ticker)
+            assert list(cf_df.columns) == ["CFO", "CapEx", "FCF"] and len(cf_df) == 5
+            assert is_df["Shares Outstanding"].iloc[-1] > 1e9
+            result = fmp_analysis.get_dcf_analysis.__wrapped__(ticker)
+            assert result["success"], result.get("error")
+            assert result["statement_source"] == "scrape"
+        assert analysis.db_manager is env.db
+    assert analysis.db_manager is original_db and analysis.cache_manager is original_cache
+
+
+def test_run_suite_smoke():
+    """Une exécution réduite couvre chaque groupe et ne touche pas la base réelle"""
+    results = benchmark.run_suite(sizes=[40], repeat=1, verbose=False)
+    groups = {name.split("/", 1)[0] for name in results}
+    assert groups == set(benchmark.GROUPS)
+    assert "screening/perform_screening[40]/cold" in results
+    assert all(stats["min"] <= stats["median"] <= stats["max"] for stats in results.values())
+
+
+def test_history_and_regressions():
+    """La médiane des exécutions précédentes de la même machine sert de référence"""
+    path = os.path.join(tempfile.mkdtemp(), "history.jsonl")
+    for median in (0.010, 0.011, 0.009):
+        benchmark.append_history({"machine": "m", "results": {"a": {"median": median}, "b": {"median": 0.0001}}}, path)
+    benchmark.append_history({"machine": "other", "results": {"a": {"median": 0.001}}}, path)
+    history = benchmark.load_history(path)
+    assert len(history) == 4
+
+    regressions = benchmark.find_regressions({"a": {"median": 0.015}, "b": {"median": 0.0003}}, history, "m")
+    assert [r["name"] for r in regressions] == ["a"]  # b : écart sous REGRESSION_MIN_DELTA
+    assert abs(regressions[0]["baseline"] - 0.010) < 1e-9
+    assert benchmark.find_regressions({"a": {"median": 0.0105}}, history, "m") == []
+    assert benchmark.find_regressions({"c": {"median": 1.0}}, history, "m") == []
+
+
+if __name__ == "__main__":
+    test_universe_is_deterministic()
+    test_replayed_statements_parse()
+    test_run_suite_smoke()
+    test_history_and_regressions()
+    print("✅ Tests de la suite de benchmarks validés")
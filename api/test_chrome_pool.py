@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test du pool de navigateurs Chrome avec des drivers simulés (sans lancer Chrome)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from selenium_config import ChromeDriverPool
+
+
+class FakeDriver:
+    """Driver minimal imitant l'API Selenium utilisée par le pool"""
+
+    def __init__(self):
+        self.healthy = True
+        self.quit_called = False
+        self.page_source = ""
+
+    @property
+    def current_url(self):
+        if not self.healthy:
+            raise RuntimeError("session perdue")
+        return "about:blank"
+
+    def get(self, url):
+        time.sleep(0.02)
+        self.page_source = f"<html>{url}</html>"
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_drivers_are_reused_and_recycled():
+    """Un même navigateur sert plusieurs pages puis est recyclé après max_pages"""
+    drivers = []
+    pool = ChromeDriverPool(max_size=1, max_pages=3, max_memory_mb=0,
+                            driver_factory=lambda: drivers.append(FakeDriver()) or drivers[-1])
+
+    for i in range(4):
+        assert pool.get_page_source(f"https://example.com/{i}") == f"<html>https://example.com/{i}</html>"
+
+    stats = pool.stats()
+    assert stats["launches"] == 2
+    assert stats["recycles"] == 1
+    assert stats["pages_served"] == 4
+    assert drivers[0].quit_called and not drivers[1].quit_called
+
+
+def test_unhealthy_driver_is_replaced():
+    """Un driver inactif qui ne répond plus est remplacé à l'emprunt suivant"""
+    drivers = []
+    pool = ChromeDriverPool(max_size=1, max_pages=0, max_memory_mb=0,
+                            driver_factory=lambda: drivers.append(FakeDriver()) or drivers[-1])
+    pool.get_page_source("https://example.com")
+    drivers[0].healthy = False
+    pool.get_page_source("https://example.com")
+
+    assert len(drivers) == 2
+    assert pool.stats()["health_failures"] == 1
+
+
+def test_pool_caps_live_browsers():
+    """Le nombre de navigateurs vivants ne dépasse jamais max_size"""
+    pool = ChromeDriverPool(max_size=2, max_pages=0, max_memory_mb=0, driver_factory=FakeDriver)
+    peak = []
+
+    def scrape(i):
+        pool.get_page_source(f"https://example.com/{i}")
+        peak.append(pool.stats()["live_drivers"])
+
+    threads = [threading.Thread(target=scrape, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool.stats()
+    assert max(peak) <= 2
+    assert stats["launches"] <= 2
+    assert stats["pages_served"] == 10
+    assert stats["in_use"] == 0
+    pool.shutdown()
+    assert pool.stats()["live_drivers"] == 0
+
+
+if __name__ == "__main__":
+    test_drivers_are_reused_and_recycled()
+    test_unhealthy_driver_is_replaced()
+    test_pool_caps_live_browsers()
+    print("✅ Pool de navigateurs validé")
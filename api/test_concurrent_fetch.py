@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test de la récupération concurrente des données de screening (sans appel réseau)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_providers import YFinanceProvider
+
+
+class SlowYFinanceProvider(YFinanceProvider):
+    """Simule des appels `.info` Yahoo Finance lents"""
+
+    def fetch_info(self, symbol):
+        time.sleep(0.05)
+        if symbol.startswith("BAD"):
+            return None
+        return {"symbol": symbol, "currentPrice": 100.0, "trailingPE": 10.0}
+
+
+def test_fetch_preserves_order_and_records_latency():
+    """Les résultats suivent l'ordre des symboles et chaque latence est mesurée"""
+    symbols = [f"SYM{i}" for i in range(20)] + ["BAD1"]
+    records, latencies = SlowYFinanceProvider(max_workers=10).get_quotes(symbols)
+
+    assert list(records) == symbols
+    assert all(records[s]["symbol"] == s for s in symbols[:-1])
+    assert records["BAD1"] is None
+    assert set(latencies) == set(symbols)
+    assert all(latency >= 0.05 for latency in latencies.values())
+
+
+def test_fetch_is_bounded_and_parallel():
+    """Le nombre de requêtes simultanées ne dépasse jamais max_workers"""
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    class TrackingProvider(YFinanceProvider):
+        def fetch_info(self, symbol):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            return {"symbol": symbol, "currentPrice": 1.0}
+
+    start = time.time()
+    TrackingProvider(max_workers=4).get_quotes([f"S{i}" for i in range(40)])
+    elapsed = time.time() - start
+
+    assert state["peak"] <= 4
+    # 40 appels de 50 ms avec 4 workers : ~0.5s au lieu de 2s en séquentiel
+    assert elapsed < 1.5
+
+
+if __name__ == "__main__":
+    test_fetch_preserves_order_and_records_latency()
+    test_fetch_is_bounded_and_parallel()
+    print("✅ Récupération concurrente validée")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test du fournisseur de cotations par lots avec le fournisseur local (hors ligne)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_providers import FakeQuoteProvider, build_stock_record, chunk_symbols
+
+
+def _info(symbol, price=50.0, pe=12.0):
+    return {
+        "symbol": symbol, "longName": f"{symbol} Corp", "currency": "EUR",
+        "currentPrice": price, "marketCap": 1_000_000, "trailingPE": pe,
+        "priceToBook": 1.2, "debtToEquity": 80.0, "returnOnEquity": 0.15,
+        "dividendYield": 0.02, "trailingEps": 4.0, "bookValue": 30.0,
+    }
+
+
+def test_build_stock_record_shape():
+    """Le dictionnaire produit garde la forme historique de get_stock_data"""
+    record = build_stock_record(_info("AIR.PA"))
+    assert record == {
+        "symbol": "AIR.PA", "company_name": "AIR.PA Corp", "currency": "EUR",
+        "current_price": 50.0, "market_cap": 1_000_000, "pe_ratio": 12.0,
+        "pb_ratio": 1.2, "debt_to_equity": 80.0, "roe": 0.15,
+        "dividend_yield": 0.02, "eps": 4.0, "bvps": 30.0,
+    }
+    assert build_stock_record({"symbol": "X"}) is None
+    assert build_stock_record(None) is None
+
+
+def test_fake_provider_batches_requests():
+    """Les symboles sont regroupés en lots : 250 symboles = 3 requêtes de 100"""
+    symbols = [f"S{i}" for i in range(250)]
+    provider = FakeQuoteProvider({s: _info(s) for s in symbols[:-1]}, batch_size=100)
+
+    records, latencies = provider.get_quotes(symbols)
+
+    assert provider.request_count == 3
+    assert list(records) == symbols
+    assert records["S0"]["symbol"] == "S0"
+    assert records["S249"] is None
+    assert set(latencies) == set(symbols)
+    assert [len(c) for c in chunk_symbols(symbols, 100)] == [100, 100, 50]
+
+
+def test_stock_data_batch_uses_cache():
+    """get_stock_data_batch ne redemande pas les symboles déjà en cache"""
+    import analysis
+    from database import cache_manager, get_cache_key
+
+    symbols = ["BATCHTEST1", "BATCHTEST2"]
+    for symbol in symbols:
+        cache_manager.delete(get_cache_key("get_stock_data", symbol))
+    provider = FakeQuoteProvider({s: _info(s) for s in symbols})
+    try:
+        first, _ = analysis.get_stock_data_batch(symbols, provider=provider)
+        second, _ = analysis.get_stock_data_batch(symbols, provider=provider)
+    finally:
+        for symbol in symbols:
+            cache_manager.delete(get_cache_key("get_stock_data", symbol))
+
+    assert [d["symbol"] for d in first] == symbols
+    assert second == first
+    assert provider.request_count == 1
+
+
+if __name__ == "__main__":
+    test_build_stock_record_shape()
+    test_fake_provider_batches_requests()
+    test_stock_data_batch_uses_cache()
+    print("✅ Fournisseur de cotations par lots validé")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test du pool de connexions SQLite (WAL, réutilisation, accès concurrents)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import SCHEMA_VERSION, DatabaseManager
+
+
+def _temp_manager(pool_size=3):
+    tmp_dir = tempfile.mkdtemp()
+    return DatabaseManager(os.path.join(tmp_dir, "pool_test.db"), pool_size=pool_size)
+
+
+def test_connections_are_configured_and_reused():
+    """Les connexions sont en WAL / synchronous=NORMAL et réutilisées entre les appels"""
+    manager = _temp_manager()
+    with manager.get_connection() as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    with manager.get_connection() as conn:
+        assert conn is first
+    manager.pool.close_all()
+
+
+def test_concurrent_writes_and_stats():
+    """Plusieurs threads écrivent via un pool borné ; l'attente est mesurée"""
+    manager = _temp_manager(pool_size=2)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(10):
+                manager.add_to_watchlist("pool", f"T{n}-{i}")
+                manager.is_in_watchlist("pool", f"T{n}-{i}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = manager.pool.stats()
+    assert not errors
+    assert len(manager.get_watchlist("pool")) == 80
+    assert stats["open_connections"] <= 2
+    assert stats["in_use"] == 0
+    assert stats["checkouts"] >= 160
+    assert stats["max_wait_ms"] >= 0
+    manager.pool.close_all()
+
+
+def test_open_transaction_is_rolled_back_on_release():
+    """Une transaction non validée n'est pas transmise à l'emprunteur suivant"""
+    manager = _temp_manager(pool_size=1)
+    with manager.get_connection() as conn:
+        conn.execute("INSERT INTO watchlists (user_id, ticker) VALUES ('rb', 'X')")
+    assert manager.get_watchlist("rb") == []
+    manager.pool.close_all()
+
+
+def test_lazy_manager_defers_schema():
+    """lazy=True : aucun fichier créé ni migré avant le premier accès (instance globale à l'import)"""
+    path = os.path.join(tempfile.mkdtemp(), "lazy.db")
+    manager = DatabaseManager(path, lazy=True)
+    assert not os.path.exists(path)
+    assert manager.get_watchlist("lazy") == []
+    with manager.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    manager.pool.close_all()
+
+
+def test_lazy_manager_first_access_is_a_write():
+    """Une écriture comme premier accès initialise le schéma sans se bloquer sur le verrou d'écriture"""
+    manager = DatabaseManager(os.path.join(tempfile.mkdtemp(), "lazy_write.db"), lazy=True)
+    result = []
+    writer = threading.Thread(target=lambda: result.append(manager.save_screening_result("CAC 40 (France)", {}, [], 0.1)),
+                              daemon=True)
+    writer.start()
+    writer.join(timeout=5)
+    assert not writer.is_alive(), "écriture bloquée pendant l'initialisation du schéma"
+    assert result == [1]
+    manager.pool.close_all()
+
+
+if __name__ == "__main__":
+    test_connections_are_configured_and_reused()
+    test_concurrent_writes_and_stats()
+    test_open_transaction_is_rolled_back_on_release()
+    test_lazy_manager_defers_schema()
+    test_lazy_manager_first_access_is_a_write()
+    print("✅ Pool de connexions SQLite validé")
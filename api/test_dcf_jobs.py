@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test des jobs DCF par indice : exécution bornée, persistance, classement, reprise et flux SSE
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager
+from dcf_jobs import DCFJobManager
+
+INTRINSIC_VALUES = {"AAA": 150.0, "BBB": 90.0, "CCC": 240.0, "DDD": None}
+
+
+class FakeValuer:
+    """Valorisation simulée qui mesure le nombre d'appels simultanés"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.calls = []
+
+    def __call__(self, symbol):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.calls.append(symbol)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        value = INTRINSIC_VALUES[symbol]
+        if value is None:
+            return {"symbol": symbol, "status": "error", "error": "FCF invalide"}
+        return {"symbol": symbol, "status": "ok", "current_price": 100.0, "intrinsic_value": value,
+                "intrinsic_value_historical": value, "upside": value / 100.0 - 1}
+
+
+def _database():
+    return DatabaseManager(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+
+def test_job_runs_bounded_and_ranks_results():
+    """Le job respecte la borne de workers et produit un tableau classé par potentiel de hausse"""
+    db, valuer = _database(), FakeValuer()
+    manager = DCFJobManager(max_workers=2, valuer=valuer, db=db)
+    job_id = manager.submit("NASDAQ 100 (USA)", symbols=list(INTRINSIC_VALUES))
+    job = manager.wait(job_id)
+
+    assert job["status"] == "completed"
+    assert (job["completed"], job["failed"], job["progress"]) == (3, 1, 1.0)
+    assert valuer.peak <= 2
+    results = db.get_dcf_job_results(job_id)
+    assert [row["symbol"] for row in results] == ["CCC", "AAA", "BBB", "DDD"]
+    assert results[-1]["error"] == "FCF invalide"
+
+
+def test_results_combined_with_latest_screening():
+    """Le score du dernier screening du même indice est joint aux résultats"""
+    db = _database()
+    db.save_screening_result("NASDAQ 100 (USA)", {}, [{"symbol": "BBB", "score": 90.0}, {"symbol": "AAA", "score": 40.0}], 1.0)
+    manager = DCFJobManager(valuer=FakeValuer(delay=0), db=db)
+    job_id = manager.submit("NASDAQ 100 (USA)", symbols=["AAA", "BBB", "CCC"])
+    manager.wait(job_id)
+
+    rows = {row["symbol"]: row for row in db.get_dcf_job_results(job_id, with_screening=True)}
+    assert rows["BBB"]["screening_score"] == 90.0 and rows["BBB"]["screening_rank"] == 0
+    assert rows["CCC"]["screening_score"] is None
+
+
+def test_interrupted_job_resumes_without_revaluing():
+    """Un job 'running' trouvé au démarrage reprend uniquement les symboles restants"""
+    db = _database()
+    job_id = db.create_dcf_job("CAC 40 (France)", ["AAA", "BBB", "CCC"])
+    db.update_dcf_job_status(job_id, "running")
+    db.save_dcf_job_result(job_id, {"symbol": "AAA", "status": "ok", "upside": 0.5})
+
+    valuer = FakeValuer(delay=0)
+    manager = DCFJobManager(valuer=valuer, db=db)
+    assert manager.resume_unfinished() == 1
+    job = manager.wait(job_id)
+    assert job["status"] == "completed" and job["completed"] == 3
+    assert sorted(valuer.calls) == ["BBB", "CCC"]
+
+
+def test_sse_stream_ends_with_done_event():
+    """Le flux SSE émet des événements de progression puis un événement final"""
+    db = _database()
+    manager = DCFJobManager(max_workers=1, valuer=FakeValuer(delay=0.02), db=db)
+    job_id = manager.submit("DAX (Germany)", symbols=["AAA", "BBB", "CCC"])
+    events = list(manager.iter_events(job_id, poll_interval=0.01))
+
+    assert events[-1].startswith("event: done")
+    final = json.loads(events[-1].split("data: ", 1)[1])
+    assert final["status"] == "completed" and final["progress"] == 1.0
+    assert list(manager.iter_events(9999))[0].startswith("event: error")
+
+
+if __name__ == "__main__":
+    test_job_runs_bounded_and_ranks_results()
+    test_results_combined_with_latest_screening()
+    test_interrupted_job_resumes_without_revaluing()
+    test_sse_stream_ends_with_done_event()
+    print("✅ Jobs DCF par indice validés")
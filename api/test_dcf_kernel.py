@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test du noyau DCF vectorisé : équivalence avec le calcul scalaire d'origine et broadcasting
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+import fmp_analysis
+from dcf_kernel import dcf_kernel
+
+
+def scalar_dcf(fcf_growth_rate, perpetual_growth_rate, base_fcf, total_debt, cash, shares_outstanding, wacc, projection_years=5):
+    """Implémentation scalaire d'origine (compréhensions de listes), servant de référence"""
+    projected_fcf = [base_fcf * (1 + fcf_growth_rate)**i for i in range(1, projection_years + 1)]
+    discounted_fcf = [fcf / (1 + wacc)**(i + 1) for i, fcf in enumerate(projected_fcf)]
+    pv_of_fcf = sum(discounted_fcf)
+    terminal_value = (projected_fcf[-1] * (1 + perpetual_growth_rate)) / (wacc - perpetual_growth_rate)
+    pv_of_terminal_value = terminal_value / (1 + wacc)**projection_years
+    enterprise_value = pv_of_fcf + pv_of_terminal_value
+    equity_value = enterprise_value - total_debt + cash
+    return equity_value / shares_outstanding, enterprise_value, equity_value
+
+
+def test_kernel_matches_scalar_reference():
+    """Chaque scénario d'un lot aléatoire correspond au calcul scalaire"""
+    rng = np.random.default_rng(42)
+    n = 2000
+    growth = rng.uniform(-0.2, 0.4, n)
+    perpetual = rng.uniform(0.0, 0.05, n)
+    wacc = rng.uniform(0.06, 0.15, n)
+    base_fcf = rng.uniform(1e6, 1e11, n)
+    per_share, enterprise, equity = dcf_kernel(growth, perpetual, base_fcf, 5e9, 2e9, 1e9, wacc)
+
+    assert per_share.shape == (n,)
+    for i in range(0, n, 97):
+        expected = scalar_dcf(growth[i], perpetual[i], base_fcf[i], 5e9, 2e9, 1e9, wacc[i])
+        assert np.allclose((per_share[i], enterprise[i], equity[i]), expected, rtol=1e-12)
+
+
+def test_broadcasting_grid_and_invalid_scenarios():
+    """Une grille WACC x croissance perpétuelle est évaluée en un appel ; WACC <= g donne NaN"""
+    waccs = np.array([0.02, 0.08, 0.10])[:, None]
+    perpetuals = np.array([0.0, 0.025, 0.03])[None, :]
+    per_share, _, _ = dcf_kernel(0.05, perpetuals, 1e9, 0, 0, 1e8, waccs)
+
+    assert per_share.shape == (3, 3)
+    assert np.isnan(per_share[0, 1]) and np.isnan(per_share[0, 2])
+    assert np.isclose(per_share[1, 1], scalar_dcf(0.05, 0.025, 1e9, 0, 0, 1e8, 0.08)[0])
+    # Plus le WACC est élevé, plus la valeur est faible
+    assert np.all(per_share[2] < per_share[1])
+
+
+def test_wrappers_match_scalar_reference():
+    """Les deux run_dcf_valuation existants restent équivalents au calcul scalaire"""
+    params = (0.05, 0.025, 1.2e10, 3e9, 5e9, 2_000_000_000)
+    assert np.allclose(fmp_analysis.run_dcf_valuation(*params, wacc=0.09), scalar_dcf(*params, 0.09), rtol=1e-12)
+    assert np.allclose(analysis.run_dcf_valuation(*params), scalar_dcf(*params, 0.0863), rtol=1e-12)
+    assert all(isinstance(value, float) for value in fmp_analysis.run_dcf_valuation(*params))
+
+
+def test_wrappers_reject_perpetual_growth_above_wacc():
+    """WACC <= croissance perpétuelle : erreur explicite des deux wrappers, jamais de NaN"""
+    params = (0.05, 0.0863, 1.2e10, 3e9, 5e9, 2_000_000_000)
+    try:
+        analysis.run_dcf_valuation(*params)
+        assert False, "ValueError attendue"
+    except ValueError as e:
+        assert "WACC" in str(e)
+    try:
+        fmp_analysis.run_dcf_valuation(*params, wacc=0.05)
+        assert False, "DCFAnalysisError attendue"
+    except fmp_analysis.DCFAnalysisError:
+        pass
+
+
+if __name__ == "__main__":
+    test_kernel_matches_scalar_reference()
+    test_broadcasting_grid_and_invalid_scenarios()
+    test_wrappers_match_scalar_reference()
+    test_wrappers_reject_perpetual_growth_above_wacc()
+    print("✅ Noyau DCF vectorisé validé")
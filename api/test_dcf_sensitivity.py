@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test de la grille de sensibilité DCF (WACC x croissance perpétuelle)
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fmp_analysis import DCFAnalysisError, build_sensitivity_grid, run_dcf_valuation
+
+BASE_DATA = {
+    "ticker": "TEST", "latest_year": 2024, "base_fcf": 1.2e10, "total_debt": 3e9,
+    "cash": 5e9, "shares_outstanding": 2_000_000_000, "wacc": 0.0863
+}
+
+
+def test_grid_matches_scalar_valuation():
+    """Chaque cellule d'une grille 50x50 correspond à run_dcf_valuation, calculée en quelques millisecondes"""
+    start = time.perf_counter()
+    grid = build_sensitivity_grid(BASE_DATA, (0.06, 0.12, 50), (0.0, 0.04, 50), 0.05)
+    elapsed = time.perf_counter() - start
+
+    assert len(grid["wacc"]) == 50 and len(grid["perpetual_growth"]) == 50
+    assert len(grid["intrinsic_values"]) == 50 and all(len(row) == 50 for row in grid["intrinsic_values"])
+    assert elapsed < 0.5
+    for i, j in ((0, 0), (10, 25), (49, 49)):
+        expected = run_dcf_valuation(0.05, grid["perpetual_growth"][j], BASE_DATA["base_fcf"], BASE_DATA["total_debt"],
+                                     BASE_DATA["cash"], BASE_DATA["shares_outstanding"], grid["wacc"][i])[0]
+        assert abs(grid["intrinsic_values"][i][j] - expected) < 1e-6 * abs(expected)
+
+
+def test_invalid_cells_are_none():
+    """Les cellules où le WACC n'excède pas la croissance perpétuelle valent None"""
+    grid = build_sensitivity_grid(BASE_DATA, (0.02, 0.08, 4), (0.0, 0.03, 4), 0.05)
+    assert grid["intrinsic_values"][0][-1] is None
+    assert grid["intrinsic_values"][-1][-1] is not None
+
+
+def test_invalid_ranges_rejected():
+    """Plages inversées ou nombre de points hors limites sont refusés"""
+    for wacc_range in ((0.12, 0.06, 10), (0.06, 0.12, 0), (0.06, 0.12, 10_000)):
+        try:
+            build_sensitivity_grid(BASE_DATA, wacc_range, (0.0, 0.03, 10), 0.05)
+            assert False, "DCFAnalysisError attendue"
+        except DCFAnalysisError:
+            pass
+
+
+if __name__ == "__main__":
+    test_grid_matches_scalar_valuation()
+    test_invalid_cells_are_none()
+    test_invalid_ranges_rejected()
+    print("✅ Grille de sensibilité DCF validée")
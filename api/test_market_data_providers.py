@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test de l'interface des fournisseurs de données de marché : politique d'appel (délai, nouvelles
+tentatives, débit), rejeu local des fixtures pour chaque capacité et sélection par configuration
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+import data_providers
+import fmp_analysis
+from data_providers import CallPolicy, FixtureProvider, ProviderTimeout
+from database import DatabaseManager
+
+
+def test_retries_then_success():
+    """Les échecs transitoires sont rejoués ; l'erreur de la dernière tentative est propagée"""
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("coupure")
+        return "ok"
+
+    assert CallPolicy("test-retry", retries=2, backoff=0.001).call(flaky) == "ok"
+    assert len(attempts) == 3
+
+    attempts.clear()
+    try:
+        CallPolicy("test-retry", retries=1, backoff=0.001).call(flaky)
+        assert False, "ConnectionError attendue"
+    except ConnectionError:
+        pass
+    assert len(attempts) == 2
+
+
+def test_timeout():
+    """Un appel bloqué au-delà du délai libère l'appelant avec ProviderTimeout"""
+    policy = CallPolicy("test-timeout", timeout=0.05)
+    start = time.perf_counter()
+    try:
+        policy.call(time.sleep, 1.0)
+        assert False, "ProviderTimeout attendue"
+    except ProviderTimeout:
+        pass
+    assert time.perf_counter() - start < 0.5
+    assert policy.call(lambda: 42) == 42
+
+    async def slow():
+        await asyncio.sleep(1.0)
+
+    try:
+        asyncio.run(policy.call_async(slow))
+        assert False, "ProviderTimeout attendue"
+    except ProviderTimeout:
+        pass
+
+
+def test_rate_limit():
+    """Les appels d'un même fournisseur sont espacés de 1 / rate_limit secondes"""
+    policy = CallPolicy("test-rate", rate_limit=20.0)
+    start = time.perf_counter()
+    for _ in range(4):
+        policy.call(lambda: None)
+    assert time.perf_counter() - start >= 0.14
+    assert CallPolicy("test-rate", rate_limit=20.0).limiter is policy.limiter
+
+
+def test_policy_from_env():
+    """Chaque valeur de la politique est surchargeable par <NOM>_TIMEOUT, _RETRIES, _RATE_LIMIT, _BACKOFF"""
+    os.environ.update({"TESTPROV_TIMEOUT": "3", "TESTPROV_RETRIES": "4", "TESTPROV_RATE_LIMIT": "2.5"})
+    try:
+        policy = CallPolicy.from_env("testprov", timeout=10.0, retries=1, backoff=0.2)
+    finally:
+        for name in ("TESTPROV_TIMEOUT", "TESTPROV_RETRIES", "TESTPROV_RATE_LIMIT"):
+            del os.environ[name]
+    assert policy.describe() == {"timeout": 3.0, "retries": 4, "rate_limit": 2.5, "backoff": 0.2}
+
+
+def test_fixture_provider_capabilities():
+    """Cotations, fondamentaux, états financiers et composition des indices rejoués sans réseau"""
+    provider = FixtureProvider()
+    records, latencies = provider.get_quotes(["AAPL", "SAP.DE", "INCONNU"])
+    assert records["AAPL"]["symbol"] == "AAPL" and records["INCONNU"] is None
+    assert set(latencies) == {"AAPL", "SAP.DE", "INCONNU"}
+    assert provider.get_fundamentals("MSFT")["symbol"] == "MSFT"
+
+    report = {}
+    assert provider.get_index_constituents("DAX (Germany)", report) == ["SAP.DE", "SIE.DE"]
+    assert report["source"] == "fixtures"
+    assert asyncio.run(provider.get_index_constituents_async("CAC 40 (France)")) == ["AIR.PA", "MC.PA", "TTE.PA", "BNP.PA"]
+
+    original = fmp_analysis.statements_provider
+    fmp_analysis.statements_provider = provider
+    try:
+        for ticker in provider.statement_symbols():
+            is_df, bs_df, cf_df = fmp_analysis.scrape_financial_statements(ticker)
+            assert list(cf_df.columns) == ["CFO", "CapEx", "FCF"] and not is_df.empty and not bs_df.empty
+    finally:
+        fmp_analysis.statements_provider = original
+
+
+def test_index_symbols_from_provider():
+    """get_index_symbols interroge le fournisseur configuré puis sert la composition depuis la base"""
+    originals = analysis.index_provider, analysis.db_manager
+    analysis.index_provider = FixtureProvider()
+    analysis.db_manager = DatabaseManager(os.path.join(tempfile.mkdtemp(), "providers.db"))
+    try:
+        report = {}
+        assert analysis.get_index_symbols("NASDAQ 100 (USA)", report) == ["AAPL", "MSFT", "INTC"]
+        assert report["source"] == "fixtures"
+        report = {}
+        assert asyncio.run(analysis.get_index_symbols_async("NASDAQ 100 (USA)", report)) == ["AAPL", "MSFT", "INTC"]
+        assert report["source"] == "cache"
+    finally:
+        analysis.index_provider, analysis.db_manager = originals
+
+
+def test_provider_selection():
+    """Sélection par nom ; un nom inconnu est refusé"""
+    assert data_providers.get_statements_provider("fixtures").name == "fixtures"
+    assert data_providers.get_index_provider("wikipedia").name == "wikipedia"
+    assert data_providers.get_quote_provider("fixtures").name == "fixtures"
+    try:
+        data_providers.get_statements_provider("bloomberg")
+        assert False, "ValueError attendue"
+    except ValueError:
+        pass
+    stats = data_providers.describe_providers(index_constituents=data_providers.get_index_provider("wikipedia"))
+    assert stats["index_constituents"]["provider"] == "wikipedia" and stats["index_constituents"]["timeout"] > 0
+
+
+def test_stockdex_calls_are_not_abandoned():
+    """stockdex : jamais de délai (un appel abandonné garderait son navigateur pendant la nouvelle tentative)"""
+    assert data_providers.get_statements_provider("stockdex").policy.timeout == 0
+    provider = data_providers.StockdexProvider(CallPolicy("stockdex", timeout=5.0, retries=1))
+    assert provider.policy.timeout == 0 and provider.policy.retries == 1
+
+
+if __name__ == "__main__":
+    test_retries_then_success()
+    test_timeout()
+    test_rate_limit()
+    test_policy_from_env()
+    test_fixture_provider_capabilities()
+    test_index_symbols_from_provider()
+    test_provider_selection()
+    test_stockdex_calls_are_not_abandoned()
+    print("✅ Tests des fournisseurs de données de marché validés")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test du cache mémoire borné (LRU, budget en octets, TTL et compteurs)
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import MemoryCache
+
+
+def test_lru_eviction_by_entry_count():
+    """Au-delà de max_entries, l'entrée la moins récemment utilisée est évincée"""
+    cache = MemoryCache(max_entries=3, sweep_interval=0)
+    for key in ("a", "b", "c"):
+        cache.set(key, key, ttl=60)
+    assert cache.get("a") == "a"  # "a" devient la plus récente
+    cache.set("d", "d", ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("d") == "d"
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+
+
+def test_byte_budget_is_enforced():
+    """La taille totale estimée ne dépasse jamais max_bytes"""
+    cache = MemoryCache(max_entries=1000, max_bytes=2000, sweep_interval=0)
+    for i in range(50):
+        cache.set(f"k{i}", "x" * 100, ttl=60)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 2000
+    assert stats["evictions"] > 0
+    cache.set("huge", "x" * 5000, ttl=60)
+    assert cache.get("huge") is None
+
+
+def test_ttl_expiration_and_sweeper():
+    """Les entrées expirées sont purgées par le thread de fond sans être relues"""
+    cache = MemoryCache(max_entries=100, sweep_interval=1)
+    try:
+        for i in range(10):
+            cache.set(f"short{i}", i, ttl=0)
+        cache.set("long", "ok", ttl=60)
+        time.sleep(1.5)
+
+        assert len(cache) == 1
+        assert cache.stats()["expirations"] == 10
+        assert cache.get("long") == "ok"
+        assert cache.stats()["hits"] == 1
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_lru_eviction_by_entry_count()
+    test_byte_budget_is_enforced()
+    test_ttl_expiration_and_sweeper()
+    print("✅ Cache mémoire borné validé")
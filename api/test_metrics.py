@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test des métriques Prometheus : requêtes SQLite, consultations du cache par fonction,
+appels amont (succès, réponse vide, erreur), navigateurs Chrome et exposition /metrics
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from prometheus_client import REGISTRY
+
+import metrics
+from data_providers import FakeQuoteProvider
+from database import DatabaseManager, cache_api_response, cache_manager
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_query_labels():
+    """Les étiquettes SQLite se limitent au type de requête et à la table"""
+    assert metrics.query_labels("SELECT id FROM screenings WHERE id = ?") == ("SELECT", "screenings")
+    assert metrics.query_labels("\n  UPDATE screening_jobs SET status = ?") == ("UPDATE", "screening_jobs")
+    assert metrics.query_labels("INSERT OR IGNORE INTO screening_results VALUES (?)") == ("INSERT", "screening_results")
+    assert metrics.query_labels("PRAGMA user_version") == ("PRAGMA", "-")
+
+
+def test_sqlite_queries_are_timed():
+    """Toutes les requêtes passant par le pool sont mesurées, conn.execute compris"""
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "metrics.db"))
+    labels = {"operation": "SELECT", "table": "screenings"}
+    before = _value("screener_sqlite_query_duration_seconds_count", **labels)
+    db.get_screening_history()
+    with db.get_connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM screenings").fetchone()
+    assert _value("screener_sqlite_query_duration_seconds_count", **labels) == before + 2
+
+
+def test_cache_lookups_by_function():
+    """Un premier appel est un 'miss', les suivants des 'hit', comptés par fonction décorée"""
+    cache_manager.clear_pattern("*")
+
+    @cache_api_response
+    def metrics_lookup(symbol):
+        return {"symbol": symbol}
+
+    metrics_lookup("AAA")
+    metrics_lookup("AAA")
+    metrics_lookup("AAA")
+    assert _value("screener_cache_lookups_total", function="metrics_lookup", result="miss") == 1
+    assert _value("screener_cache_lookups_total", function="metrics_lookup", result="hit") == 2
+
+
+def test_upstream_outcomes():
+    """Latence et résultat des appels amont : 'ok', 'empty' ou 'error'"""
+    provider = FakeQuoteProvider({"AAA": {"symbol": "AAA", "currentPrice": 10.0}}, batch_size=1)
+    before = _value("screener_upstream_requests_total", source="fake", operation="quotes_batch", outcome="ok")
+    provider.get_quotes(["AAA", "BBB"])
+    assert _value("screener_upstream_requests_total", source="fake", operation="quotes_batch", outcome="ok") == before + 2
+
+    with metrics.upstream_call("test", "empty") as call:
+        call["outcome"] = "empty"
+    try:
+        with metrics.upstream_call("test", "error"):
+            raise TimeoutError("délai dépassé")
+    except TimeoutError:
+        pass
+    assert _value("screener_upstream_requests_total", source="test", operation="empty", outcome="empty") == 1
+    assert _value("screener_upstream_requests_total", source="test", operation="error", outcome="error") == 1
+    assert _value("screener_upstream_request_duration_seconds_count", source="test", operation="error") == 1
+
+
+def test_chrome_launches_are_counted():
+    """Chaque navigateur lancé ou recyclé par le pool incrémente son compteur"""
+    from selenium_config import ChromeDriverPool
+
+    class FakeDriver:
+        current_url = "about:blank"
+
+        def quit(self):
+            pass
+
+    pool = ChromeDriverPool(max_size=1, max_pages=1, driver_factory=FakeDriver)
+    launches, recycles = _value("screener_chrome_launches_total"), _value("screener_chrome_recycles_total")
+    for _ in range(2):
+        with pool.driver():
+            pass
+    assert _value("screener_chrome_launches_total") == launches + 2
+    assert _value("screener_chrome_recycles_total") == recycles + 2
+
+
+def test_render_exposition_format():
+    """L'exposition texte contient les familles de métriques attendues"""
+    metrics.observe_request("GET", "/dcf-valuation/{ticker}", 200, 0.12)
+    content, content_type = metrics.render()
+    text = content.decode()
+    assert content_type.startswith("text/plain")
+    for name in ("screener_http_request_duration_seconds", "screener_upstream_request_duration_seconds",
+                 "screener_macrotrends_scrape_duration_seconds", "screener_cache_lookups",
+                 "screener_sqlite_query_duration_seconds", "screener_chrome_launches"):
+        assert f"# TYPE {name}" in text
+    assert 'route="/dcf-valuation/{ticker}"' in text
+
+
+if __name__ == "__main__":
+    test_query_labels()
+    test_sqlite_queries_are_timed()
+    test_cache_lookups_by_function()
+    test_upstream_outcomes()
+    test_chrome_launches_are_counted()
+    test_render_exposition_format()
+    print("✅ Tests des métriques validés")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test du mode DCF Monte Carlo : ajustement des lois, reproductibilité, budget de latence
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fmp_analysis
+from database import get_cache_key
+from fmp_analysis import fit_growth_distributions, run_dcf_valuation, run_monte_carlo_dcf
+
+BASE_DATA = {
+    "ticker": "TEST", "latest_year": 2024, "base_fcf": 1.2e10, "total_debt": 3e9,
+    "cash": 5e9, "shares_outstanding": 2_000_000_000, "wacc": 0.0863
+}
+FCF = pd.Series([8.0e9, 9.0e9, 9.5e9, 11.0e9, 12.0e9])
+EBITDA = pd.Series([15.0e9, 16.0e9, 16.5e9, 17.5e9, 18.0e9])
+
+
+def test_fit_growth_distributions():
+    """Les lois sont centrées sur l'historique et la croissance perpétuelle est plafonnée"""
+    distributions = fit_growth_distributions(FCF, EBITDA, 0.09)
+    assert distributions["fcf_growth"]["observations"] == 4
+    assert abs(distributions["fcf_growth"]["mean"] - np.mean(FCF.pct_change().dropna())) < 1e-12
+    assert 0 <= distributions["perpetual_growth"]["mean"] <= fmp_analysis.MAX_PERPETUAL_GROWTH
+    assert distributions["wacc"]["mean"] == 0.09
+
+    # Historique inutilisable : hypothèses du scénario prospectif
+    fallback = fit_growth_distributions(pd.Series([-1.0, 2.0]), pd.Series([1.0]), 0.09)
+    assert fallback["fcf_growth"]["mean"] == 0.05 and fallback["perpetual_growth"]["mean"] == 0.025
+
+
+def test_simulation_is_seeded_and_consistent():
+    """100k trajectoires : même graine, même résultat ; sans dispersion, le DCF déterministe est retrouvé"""
+    distributions = fit_growth_distributions(FCF, EBITDA, 0.0863)
+    start = time.perf_counter()
+    first = run_monte_carlo_dcf(BASE_DATA, distributions, current_price=100.0, n_paths=100_000, seed=7)
+    assert time.perf_counter() - start < 2.0
+    second = run_monte_carlo_dcf(BASE_DATA, distributions, current_price=100.0, n_paths=100_000, seed=7)
+    assert first["intrinsic_value"] == second["intrinsic_value"]
+    assert first["paths_simulated"] == 100_000 and not first["budget_exhausted"]
+    assert 0.0 <= first["probability_undervalued"] <= 1.0
+    percentiles = list(first["intrinsic_value"]["percentiles"].values())
+    assert percentiles == sorted(percentiles)
+
+    fixed = {
+        "fcf_growth": {"mean": 0.05, "std": 0.0},
+        "perpetual_growth": {"mean": 0.025, "std": 0.0},
+        "wacc": {"mean": 0.0863, "std": 0.0}
+    }
+    result = run_monte_carlo_dcf(BASE_DATA, fixed, n_paths=1000, seed=1)
+    expected = run_dcf_valuation(0.05, 0.025, BASE_DATA["base_fcf"], BASE_DATA["total_debt"],
+                                 BASE_DATA["cash"], BASE_DATA["shares_outstanding"], 0.0863)[0]
+    assert abs(result["intrinsic_value"]["percentiles"]["p50"] - expected) < 1e-9 * expected
+    assert result["probability_undervalued"] is None
+
+
+def test_latency_budget_stops_early():
+    """Un budget nul arrête la simulation après le premier lot"""
+    distributions = fit_growth_distributions(FCF, EBITDA, 0.0863)
+    result = run_monte_carlo_dcf(BASE_DATA, distributions, n_paths=500_000, seed=3, latency_budget_ms=0)
+    assert result["budget_exhausted"]
+    assert result["paths_simulated"] == fmp_analysis.MONTE_CARLO_CHUNK_PATHS
+
+
+def test_reuses_cached_dcf_analysis():
+    """Sans WACC explicite, le mode Monte Carlo réutilise l'analyse DCF mise en cache par /dcf-valuation"""
+    import benchmark
+
+    with benchmark.BenchmarkEnvironment() as env:
+        assert fmp_analysis.get_dcf_analysis("AAPL")["success"]
+        calls = []
+        processed = fmp_analysis.get_processed_financial_data
+        fmp_analysis.get_processed_financial_data = lambda *args: calls.append(args) or processed(*args)
+        try:
+            result = fmp_analysis.get_monte_carlo_dcf("AAPL", n_paths=1000, seed=1)
+        finally:
+            fmp_analysis.get_processed_financial_data = processed
+        assert result["paths_simulated"] == 1000
+        assert len(calls) == 1  # historiques FCF/EBITDA uniquement, l'analyse DCF vient du cache
+        assert env.cache.get(get_cache_key("get_dcf_analysis", "AAPL", None)) is None
+
+
+def test_endpoint_maps_failed_analysis_to_404():
+    """Analyse DCF indisponible : 404 comme /dcf-valuation et /sensitivity"""
+    from fastapi import HTTPException
+    import main
+
+    original = fmp_analysis.get_dcf_analysis
+    fmp_analysis.get_dcf_analysis = lambda ticker, wacc=None: {"error": "Ticker inconnu"}
+    try:
+        asyncio.run(main.get_dcf_monte_carlo("INCONNU", paths=100, wacc=0.09))
+        assert False, "HTTPException attendue"
+    except HTTPException as e:
+        assert e.status_code == 404
+    finally:
+        fmp_analysis.get_dcf_analysis = original
+
+
+if __name__ == "__main__":
+    test_fit_growth_distributions()
+    test_simulation_is_seeded_and_consistent()
+    test_latency_budget_stops_early()
+    test_reuses_cached_dcf_analysis()
+    test_endpoint_maps_failed_analysis_to_404()
+    print("✅ Mode DCF Monte Carlo validé")
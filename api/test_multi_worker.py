@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test du déploiement multi-workers : cache SQLite partagé entre processus, verrous inter-workers,
+écritures concurrentes sérialisées, reprise des seuls jobs orphelins et budget Chrome par worker
+"""
+
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import CacheManager, DatabaseManager, SQLiteCache, worker_id
+
+CRITERIA = {"index_name": "CAC 40 (France)", "pe_max": 15.0}
+
+
+def _read_shared(path, key):
+    return SQLiteCache(path, sweep_interval=0).get(key)
+
+
+def _try_lock(path, name):
+    return SQLiteCache(path, sweep_interval=0).acquire_lock(name)
+
+
+def _save_screenings(path, worker, count):
+    db = DatabaseManager(path, pool_size=2)
+    for i in range(count):
+        db.save_screening_result("CAC 40 (France)", CRITERIA, [{"symbol": f"W{worker}-{i}", "score": float(i)}], 0.01)
+        job_id = db.create_screening_job("CAC 40 (France)", CRITERIA)
+        db.finish_screening_job(job_id, total_results=1)
+        db.add_to_watchlist(f"worker-{worker}", f"W{worker}-{i}")
+        db.cache_index_symbols(f"INDEX {worker}", [f"W{worker}-{i}"])
+
+
+def _dead_pid():
+    process = multiprocessing.Process(target=int)
+    process.start()
+    process.join()
+    return process.pid
+
+
+def test_shared_cache_across_processes():
+    """Une valeur écrite par un worker est lue par un autre processus, expiration comprise"""
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache = SQLiteCache(path, sweep_interval=0)
+    cache.set("get_stock_data:AAA", {"symbol": "AAA", "current_price": 12.5})
+    cache.set("get_stock_data:OLD", {"symbol": "OLD"}, ttl=-1)
+
+    with multiprocessing.Pool(2) as pool:
+        assert pool.apply(_read_shared, (path, "get_stock_data:AAA")) == {"symbol": "AAA", "current_price": 12.5}
+        assert pool.apply(_read_shared, (path, "get_stock_data:OLD")) is None
+
+    assert cache.delete_matching("get_stock_data") == 1
+    assert cache.get("get_stock_data:AAA") is None
+
+
+def test_lock_is_exclusive_between_processes():
+    """Le verrou single-flight détenu par un worker bloque les autres jusqu'à sa libération"""
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache = SQLiteCache(path, sweep_interval=0)
+    token = cache.acquire_lock("lock:get_dcf_analysis:AAA")
+    assert token and cache.is_locked("lock:get_dcf_analysis:AAA")
+
+    with multiprocessing.Pool(1) as pool:
+        assert pool.apply(_try_lock, (path, "lock:get_dcf_analysis:AAA")) is None
+        cache.release_lock("lock:get_dcf_analysis:AAA", token)
+        assert pool.apply(_try_lock, (path, "lock:get_dcf_analysis:AAA")) is not None
+
+    # Un verrou expiré (worker arrêté pendant le calcul) peut être repris
+    assert cache.acquire_lock("lock:expired", ttl=0) is not None
+    assert cache.acquire_lock("lock:expired") is not None
+
+
+def test_cache_manager_uses_shared_backend():
+    """CACHE_BACKEND=sqlite : valeurs stale-while-revalidate et verrous passent par le cache partagé"""
+    manager = CacheManager(backend="sqlite", shared_cache_path=os.path.join(tempfile.mkdtemp(), "cache.db"))
+    manager.set("get_dcf_analysis:AAA", {"success": True}, ttl=60, stale_ttl=60)
+    assert manager.get_entry("get_dcf_analysis:AAA") == ({"success": True}, False)
+    assert manager.stats()["backend"] == "sqlite"
+
+    token = manager.acquire_lock("lock:get_dcf_analysis:AAA")
+    assert token not in (None, "local")
+    assert manager.acquire_lock("lock:get_dcf_analysis:AAA") is None
+    manager.release_lock("lock:get_dcf_analysis:AAA", token)
+    assert not manager.is_locked("lock:get_dcf_analysis:AAA")
+
+
+
+def test_fallback_lock_released_after_redis_failover():
+    """Un verrou posé sur le cache partagé pendant une panne Redis est libéré sur ce même cache"""
+    class DownRedis:
+        evals = 0
+
+        def eval(self, *args):
+            DownRedis.evals += 1
+
+    manager = CacheManager(backend="sqlite", shared_cache_path=os.path.join(tempfile.mkdtemp(), "cache.db"))
+    manager.redis_client, manager._redis_available = DownRedis(), False
+    token = manager.acquire_lock("lock:get_dcf_analysis:AAA")
+    assert token and not token.startswith("redis:") and manager.is_locked("lock:get_dcf_analysis:AAA")
+    manager.release_lock("lock:get_dcf_analysis:AAA", token)
+    assert not manager.is_locked("lock:get_dcf_analysis:AAA")
+    assert DownRedis.evals == 0
+
+def test_concurrent_writes_from_workers():
+    """4 processus écrivent (screenings, jobs, watchlists, indices) et migrent la même base en parallèle sans 'database is locked'"""
+    path = os.path.join(tempfile.mkdtemp(), "screener.db")
+    processes = [multiprocessing.Process(target=_save_screenings, args=(path, w, 25)) for w in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert all(process.exitcode == 0 for process in processes)
+
+    db = DatabaseManager(path)
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM screenings").fetchone()[0] == 100
+        assert conn.execute("SELECT COUNT(*) FROM screening_results").fetchone()[0] == 100
+        assert conn.execute("SELECT COUNT(*) FROM screening_jobs WHERE status = 'completed'").fetchone()[0] == 100
+        assert conn.execute("SELECT COUNT(*) FROM watchlists").fetchone()[0] == 100
+
+
+def test_only_orphaned_jobs_are_requeued():
+    """Un worker qui démarre ne reprend pas les jobs en cours dans un autre worker vivant"""
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+    alive_job = db.create_screening_job("CAC 40 (France)", CRITERIA)
+    orphan_job = db.create_screening_job("DAX (Germany)", CRITERIA)
+    db.claim_next_screening_job()
+    db.claim_next_screening_job()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE screening_jobs SET worker = ? WHERE id = ?", (f"{socket.gethostname()}:{os.getppid()}", alive_job))
+        conn.execute("UPDATE screening_jobs SET worker = ? WHERE id = ?", (f"{socket.gethostname()}:{_dead_pid()}", orphan_job))
+        conn.commit()
+
+    assert db.requeue_running_screening_jobs() == 1
+    assert db.get_screening_job(alive_job)["status"] == "running"
+    assert db.get_screening_job(orphan_job)["status"] == "pending"
+
+    dcf_job = db.create_dcf_job("CAC 40 (France)", ["AAA"])
+    assert db.claim_unfinished_dcf_jobs() == [dcf_job]  # job du worker courant
+    with db.get_connection() as conn:
+        conn.execute("UPDATE dcf_jobs SET worker = ? WHERE id = ?", (f"{socket.gethostname()}:{os.getppid()}", dcf_job))
+        conn.commit()
+    assert db.claim_unfinished_dcf_jobs() == []
+    assert worker_id().endswith(f":{os.getpid()}")
+
+
+def test_chrome_budget_per_worker():
+    """Le budget de navigateurs de l'hôte est réparti entre les workers, au moins un chacun"""
+    from selenium_config import per_worker_chrome_budget
+    assert per_worker_chrome_budget(4, 2) == 2
+    assert per_worker_chrome_budget(5, 2) == 2
+    assert per_worker_chrome_budget(2, 4) == 1
+    assert per_worker_chrome_budget(2, 0) == 2
+
+
+if __name__ == "__main__":
+    test_shared_cache_across_processes()
+    test_lock_is_exclusive_between_processes()
+    test_cache_manager_uses_shared_backend()
+    test_fallback_lock_released_after_redis_failover()
+    test_concurrent_writes_from_workers()
+    test_only_orphaned_jobs_are_requeued()
+    test_chrome_budget_per_worker()
+    print("✅ Tests multi-workers validés")
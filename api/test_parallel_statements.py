@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test de la récupération parallèle des états financiers Macrotrends avec un ticker simulé
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fmp_analysis import DCFAnalysisError, fetch_macrotrends_statements
+
+
+class FakeTicker:
+    """Ticker imitant les méthodes Macrotrends de stockdex, avec une latence par état"""
+
+    def __init__(self, delay=0.2, failing=None):
+        self.delay = delay
+        self.failing = failing
+
+    def _statement(self, name):
+        time.sleep(self.delay)
+        if name == self.failing:
+            raise RuntimeError("page introuvable")
+        return pd.DataFrame({"2023-12-31": [1.0]}, index=[name])
+
+    def macrotrends_income_statement(self, frequency):
+        return self._statement("income_statement")
+
+    def macrotrends_balance_sheet(self, frequency):
+        return self._statement("balance_sheet")
+
+    def macrotrends_cash_flow(self, frequency):
+        return self._statement("cash_flow")
+
+
+def test_statements_fetched_concurrently():
+    """Avec 3 workers, la durée totale est proche de l'état le plus lent, pas de la somme"""
+    report = {}
+    start = time.perf_counter()
+    statements = fetch_macrotrends_statements(FakeTicker(), "TEST", report=report, max_workers=3)
+    elapsed = time.perf_counter() - start
+
+    assert set(statements) == {"income_statement", "balance_sheet", "cash_flow"}
+    assert elapsed < 0.45
+    assert all(entry["error"] is None and entry["seconds"] >= 0.2 for entry in report.values())
+
+
+def test_workers_bound_serializes():
+    """Un seul worker (pool d'un navigateur) revient à une récupération séquentielle"""
+    start = time.perf_counter()
+    fetch_macrotrends_statements(FakeTicker(delay=0.1), "TEST", max_workers=1)
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_partial_failure_is_reported():
+    """Un état en échec est nommé dans l'erreur, les autres sont signalés comme récupérés"""
+    report = {}
+    try:
+        fetch_macrotrends_statements(FakeTicker(delay=0.01, failing="balance_sheet"), "TEST", report=report, max_workers=3)
+        assert False, "DCFAnalysisError attendue"
+    except DCFAnalysisError as e:
+        message = str(e)
+    assert "balance_sheet (page introuvable)" in message
+    assert "income_statement, cash_flow" in message
+    assert report["balance_sheet"]["error"] == "page introuvable"
+    assert report["cash_flow"]["error"] is None
+
+
+if __name__ == "__main__":
+    test_statements_fetched_concurrently()
+    test_workers_bound_serializes()
+    test_partial_failure_is_reported()
+    print("✅ Récupération parallèle des états financiers validée")
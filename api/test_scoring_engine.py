@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test du moteur de notation vectorisé (score_stocks) contre la version ligne à ligne
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from analysis import calculate_value, score_stocks
+
+CRITERIA = {"index_name": "CAC 40 (France)", "pe_max": 15.0, "pb_max": 1.5, "de_max": 100.0, "roe_min": 0.12}
+
+
+def _random_stock(rng, i):
+    def maybe(value):
+        return None if rng.random() < 0.15 else value
+
+    return {
+        "symbol": f"SYM{i}", "company_name": f"Company {i}", "currency": "USD",
+        "current_price": rng.uniform(1, 500), "market_cap": rng.randint(10**6, 10**12),
+        "pe_ratio": maybe(rng.uniform(-20, 60)), "pb_ratio": maybe(rng.uniform(-1, 10)),
+        "debt_to_equity": maybe(rng.uniform(0, 300)), "roe": maybe(rng.uniform(-0.5, 0.6)),
+        "dividend_yield": 0, "eps": maybe(rng.uniform(-5, 20)), "bvps": maybe(rng.uniform(-5, 80)),
+    }
+
+
+def _reference(stocks, criteria):
+    results = [calculate_value(s, criteria) for s in stocks if s]
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+
+def test_vectorized_matches_row_by_row():
+    """Chaque ligne et l'ordre final sont identiques à calculate_value"""
+    rng = random.Random(42)
+    stocks = [_random_stock(rng, i) for i in range(500)] + [None]
+
+    assert score_stocks(stocks, CRITERIA) == _reference(stocks, CRITERIA)
+
+
+def test_pe_only_matches_previous_output():
+    """Avec le seul critère P/E, le score est celui de l'ancienne notation"""
+    rng = random.Random(7)
+    stocks = [_random_stock(rng, i) for i in range(200)]
+    results = score_stocks(stocks, {"pe_max": 15.0})
+
+    for result in results:
+        pe = result["pe_ratio"]
+        expected = (100.0 if pe < 15.0 else 0.0) if pe and pe > 0 else 0
+        assert result["score"] == expected
+    assert [r["symbol"] for r in results] == [r["symbol"] for r in _reference(stocks, {"pe_max": 15.0})]
+
+
+def test_all_criteria_are_applied():
+    """P/B, D/E et ROE sont maintenant pris en compte"""
+    stock = {"symbol": "X", "pe_ratio": 10.0, "pb_ratio": 3.0, "debt_to_equity": 50.0, "roe": 0.05,
+             "eps": 4.0, "bvps": 10.0}
+    result = score_stocks([stock], CRITERIA)[0]
+
+    assert result["score"] == 50.0
+    assert abs(result["intrinsic_value"] - (22.5 * 4.0 * 10.0) ** 0.5) < 1e-12
+
+
+def test_scoring_large_universe_is_fast():
+    """Noter un univers de 5000 symboles reste bien en dessous de la seconde"""
+    rng = random.Random(1)
+    stocks = [_random_stock(rng, i) for i in range(5000)]
+    start = time.perf_counter()
+    results = score_stocks(stocks, CRITERIA)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 5000
+    assert elapsed < 1.0
+    print(f"⏱️  Notation de 5000 symboles: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_row_by_row()
+    test_pe_only_matches_previous_output()
+    test_all_criteria_are_applied()
+    test_scoring_large_universe_is_fast()
+    print("✅ Moteur de notation vectorisé validé")
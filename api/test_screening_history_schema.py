@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test de la migration du schéma d'historique (index + table normalisée screening_results)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import DatabaseManager, SCHEMA_VERSION
+
+RESULTS = [
+    {"symbol": "AIR.PA", "company_name": "Airbus SE", "currency": "EUR", "current_price": 180.5,
+     "market_cap": 142000000000, "pe_ratio": 12.0, "pb_ratio": 1.4, "debt_to_equity": 80.0,
+     "roe": 0.15, "dividend_yield": 1.2, "eps": 5.0, "bvps": 30.0, "score": 100.0,
+     "intrinsic_value": 58.09475019311125},
+    {"symbol": "BNP.PA", "company_name": "BNP Paribas SA", "currency": "EUR", "current_price": 60.0,
+     "market_cap": 70000000000, "pe_ratio": 20.0, "pb_ratio": None, "debt_to_equity": None,
+     "roe": None, "dividend_yield": 0, "eps": 3.0, "bvps": None, "score": 0.0, "intrinsic_value": None},
+]
+
+
+def _legacy_database():
+    """Crée un fichier screener.db au schéma d'origine, sans index ni table normalisée"""
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE screenings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            index_name TEXT NOT NULL,
+            criteria TEXT NOT NULL,
+            results TEXT NOT NULL,
+            total_results INTEGER,
+            execution_time REAL
+        )
+    """)
+    conn.execute(
+        "INSERT INTO screenings (index_name, criteria, results, total_results, execution_time) VALUES (?, ?, ?, ?, ?)",
+        ("CAC 40 (France)", json.dumps({"pe_max": 15}), json.dumps(RESULTS), len(RESULTS), 1.5),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_migration_backfills_existing_screenings():
+    """La migration normalise les screenings existants et reste idempotente"""
+    path = _legacy_database()
+    manager = DatabaseManager(path)
+    DatabaseManager(path).pool.close_all()  # seconde initialisation : aucun doublon
+
+    with manager.get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_screenings_timestamp", "idx_screenings_index_name", "idx_screening_results_symbol"} <= indexes
+        assert conn.execute("SELECT COUNT(*) FROM screening_results").fetchone()[0] == 2
+
+    screening = manager.get_screening(1)
+    assert screening["results"] == RESULTS
+    assert screening["criteria"] == {"pe_max": 15}
+    manager.pool.close_all()
+
+
+def test_symbol_history_is_indexed():
+    """La recherche d'un symbole dans l'historique passe par l'index (symbol, score)"""
+    manager = DatabaseManager(os.path.join(tempfile.mkdtemp(), "history.db"))
+    first = manager.save_screening_result("CAC 40 (France)", {"pe_max": 15}, RESULTS, 1.0)
+    manager.save_screening_result("CAC 40 (France)", {"pe_max": 5}, [dict(RESULTS[0], score=0.0)], 1.0)
+
+    history = manager.get_symbol_history("AIR.PA", min_score=100)
+    assert [h["screening_id"] for h in history] == [first]
+    assert len(manager.get_symbol_history("AIR.PA")) == 2
+
+    with manager.get_connection() as conn:
+        plan = " ".join(str(tuple(row)) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT screening_id FROM screening_results WHERE symbol = ? AND score >= ?",
+            ("AIR.PA", 100)))
+    assert "idx_screening_results_symbol" in plan
+
+    assert manager.delete_screening(first)
+    assert len(manager.get_symbol_history("AIR.PA")) == 1
+    manager.pool.close_all()
+
+
+if __name__ == "__main__":
+    test_migration_backfills_existing_screenings()
+    test_symbol_history_is_indexed()
+    print("✅ Migration de l'historique des screenings validée")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test de l'instantané d'indice : un second screening avec d'autres critères ne refait que la notation
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+from data_providers import FakeQuoteProvider
+
+INDEX_NAME = "CAC 40 (France)"
+SYMBOLS = [f"T{i}.PA" for i in range(40)]
+
+
+def _info(i):
+    return {"symbol": SYMBOLS[i], "longName": f"Société {i}", "currency": "EUR",
+            "currentPrice": 10.0 + i, "trailingPE": 5.0 + i, "priceToBook": 1.0,
+            "trailingEps": 2.0, "bookValue": 15.0}
+
+
+def test_rescreening_reuses_snapshot(stub_screening):
+    """Changer pe_max ne relance pas le téléchargement et répond en moins de 50 ms"""
+    provider = FakeQuoteProvider({SYMBOLS[i]: _info(i) for i in range(40)}, latency=0.2)
+    saved = stub_screening(INDEX_NAME, SYMBOLS, provider)
+
+    first = analysis.perform_screening(INDEX_NAME, {"pe_max": 15.0})
+    start = time.perf_counter()
+    second = analysis.perform_screening(INDEX_NAME, {"pe_max": 30.0})
+    elapsed = time.perf_counter() - start
+
+    assert provider.request_count == 1
+    assert sum(r["score"] == 100.0 for r in first) == 10
+    assert sum(r["score"] == 100.0 for r in second) == 25
+    assert len(saved) == 2
+    assert elapsed < 0.05
+    print(f"⏱️  Nouveau screening depuis l'instantané: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    import pytest
+    if pytest.main([__file__, "-q"]) == 0:
+        print("✅ Instantané de screening validé")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test du screening en flux : premières actions émises avant la fin du téléchargement, résumé final trié
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+from data_providers import FakeQuoteProvider
+
+INDEX_NAME = "S&P 500 (USA)"
+SYMBOLS = [f"S{i}" for i in range(150)]
+
+
+def _info(i):
+    return {"symbol": SYMBOLS[i], "longName": f"Société {i}", "currency": "USD",
+            "currentPrice": 10.0 + i, "trailingPE": 5.0 + i % 30, "priceToBook": 1.0,
+            "trailingEps": 2.0, "bookValue": 15.0}
+
+
+def _run_stream(stub_screening, provider, criteria):
+    """Consomme iter_screening en notant l'instant de chaque événement"""
+    saved = stub_screening(INDEX_NAME, SYMBOLS, provider)
+    start = time.perf_counter()
+    events = [(time.perf_counter() - start, event) for event in analysis.iter_screening(INDEX_NAME, criteria)]
+    cached = analysis.perform_screening(INDEX_NAME, criteria)
+    return events, cached, saved
+
+
+def test_first_results_arrive_before_completion(stub_screening):
+    """Les premières actions arrivent après un lot, le résumé trié arrive en dernier"""
+    provider = FakeQuoteProvider({SYMBOLS[i]: _info(i) for i in range(150)}, batch_size=100, latency=0.2)
+    events, cached, saved = _run_stream(stub_screening, provider, {"pe_max": 15.0})
+
+    stocks = [(elapsed, event) for elapsed, event in events if event["type"] == "stock"]
+    elapsed_summary, summary = events[-1]
+    assert summary["type"] == "summary"
+    assert len(stocks) == 150 and summary["total_results"] == 150
+    assert stocks[0][0] < 0.35 and stocks[0][0] < elapsed_summary
+    assert [r["symbol"] for r in summary["results"]] == [r["symbol"] for r in cached]
+    assert summary["screening_id"] == 1 and len(saved) == 2
+    # Le second screening a réutilisé l'instantané écrit par le flux
+    assert provider.request_count == len(analysis.stream_chunks(SYMBOLS, analysis.SCREENING_STREAM_FIRST_CHUNK, 100))
+
+
+def test_stream_chunks_grow():
+    """Un premier lot court puis des lots doublés, plafonnés à la taille de lot du fournisseur"""
+    chunks = analysis.stream_chunks(SYMBOLS, 10, 40)
+    assert [len(chunk) for chunk in chunks] == [10, 20, 40, 40, 40]
+    assert sum(chunks, []) == SYMBOLS
+
+
+if __name__ == "__main__":
+    import pytest
+    if pytest.main([__file__, "-q"]) == 0:
+        print("✅ Screening en flux validé")
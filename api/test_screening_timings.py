@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test de la décomposition du temps de screening : résolution des symboles, distribution des latences
+de récupération, taux de succès du cache, notation et sauvegarde, relue via get_screening
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analysis
+from data_providers import FakeQuoteProvider
+from database import DatabaseManager
+
+INDEX_NAME = "DAX (Germany)"
+SYMBOLS = [f"T{i}.DE" for i in range(20)]
+STAGES = ("symbol_resolution", "fetch", "scoring", "save", "total_seconds")
+
+
+def _info(i):
+    return {"symbol": SYMBOLS[i], "longName": f"Société {i}", "currency": "EUR",
+            "currentPrice": 10.0 + i, "trailingPE": 5.0 + i, "priceToBook": 1.0,
+            "trailingEps": 2.0, "bookValue": 15.0}
+
+
+def _fake_symbols(index_name, report=None):
+    if report is not None:
+        report["source"] = "wikipedia"
+    return SYMBOLS
+
+
+def _clear():
+    analysis.invalidate_index_snapshot(INDEX_NAME)
+    for symbol in SYMBOLS:
+        analysis.cache_manager.delete(analysis.get_cache_key("get_stock_data", symbol))
+
+
+def _run(scenario):
+    provider = FakeQuoteProvider({SYMBOLS[i]: _info(i) for i in range(20)}, latency=0.01)
+    originals = analysis.get_index_symbols, analysis.quote_provider, analysis.db_manager
+    analysis.get_index_symbols, analysis.quote_provider = _fake_symbols, provider
+    analysis.db_manager = DatabaseManager(os.path.join(tempfile.mkdtemp(), "timings.db"))
+    _clear()
+    try:
+        return scenario(analysis.db_manager)
+    finally:
+        _clear()
+        analysis.get_index_symbols, analysis.quote_provider, analysis.db_manager = originals
+
+
+def _latest(db):
+    with db.get_connection() as conn:
+        return db.get_screening(conn.execute("SELECT MAX(id) FROM screenings").fetchone()[0])
+
+
+def test_summarize_latencies():
+    """Percentiles de la distribution des latences par symbole"""
+    summary = analysis.summarize_latencies({f"S{i}": i / 100 for i in range(1, 101)})
+    assert summary["count"] == 100 and summary["min"] == 0.01 and summary["max"] == 1.0
+    assert abs(summary["p50"] - 0.505) < 1e-3 and summary["p90"] < summary["p99"] <= 1.0
+    assert analysis.summarize_latencies({}) == {"count": 0}
+
+
+def test_perform_screening_persists_timings():
+    """Chaque étape est enregistrée ; un nouveau téléchargement après invalidation est servi par le cache"""
+    def scenario(db):
+        analysis.perform_screening(INDEX_NAME, {"pe_max": 15.0})
+        first = _latest(db)["timings"]
+        analysis.perform_screening(INDEX_NAME, {"pe_max": 20.0})
+        snapshot = _latest(db)["timings"]
+        analysis.invalidate_index_snapshot(INDEX_NAME)
+        resolutions = []
+        analysis.get_index_symbols = lambda index_name, report=None: resolutions.append(index_name) or SYMBOLS
+        analysis.perform_screening(INDEX_NAME, {"pe_max": 15.0}, symbols=SYMBOLS,
+                                   symbol_report={"source": "cache", "seconds": 0.001})
+        refetched = _latest(db)["timings"]
+        assert resolutions == []  # symboles fournis par l'appelant : pas de seconde résolution
+        return first, snapshot, refetched
+
+    first, snapshot, refetched = _run(scenario)
+    assert all(stage in first for stage in STAGES)
+    assert first["symbol_resolution"]["source"] == "wikipedia"
+    assert first["symbol_resolution"]["symbols"] == 20
+    assert first["fetch"]["cache_hits"] == 0 and first["fetch"]["fetched"] == 20
+    assert first["fetch"]["cache_hit_ratio"] == 0.0
+    assert first["fetch"]["latency"]["count"] == 20 and first["fetch"]["provider"] == "fake"
+    assert first["scoring"]["stocks"] == 20 and first["save"]["rows"] == 20
+
+    assert snapshot["symbol_resolution"]["source"] == "snapshot"
+    assert snapshot["fetch"]["cache_hit_ratio"] == 1.0
+
+    assert refetched["symbol_resolution"] == {"source": "cache", "seconds": 0.001, "symbols": 20}
+    assert refetched["fetch"]["cache_hits"] == 20 and refetched["fetch"]["cache_hit_ratio"] == 1.0
+
+
+def test_streamed_screening_timings():
+    """Le flux renvoie la décomposition dans son résumé et l'enregistre avec le screening"""
+    def scenario(db):
+        events = list(analysis.iter_screening(INDEX_NAME, {"pe_max": 15.0}, use_snapshot=False))
+        return events[-1], _latest(db)["timings"]
+
+    summary, stored = _run(scenario)
+    assert summary["type"] == "summary"
+    assert all(stage in stored for stage in STAGES)
+    assert stored["fetch"]["symbols"] == 20 and stored["fetch"]["latency"]["count"] == 20
+    assert summary["timings"]["scoring"] == stored["scoring"]
+
+
+def test_history_without_timings():
+    """Les screenings enregistrés sans décomposition renvoient timings = None"""
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "legacy.db"))
+    screening_id = db.save_screening_result(INDEX_NAME, {}, [{"symbol": "AAA", "score": 50.0}], 0.5)
+    assert db.get_screening(screening_id)["timings"] is None
+
+
+if __name__ == "__main__":
+    test_summarize_latencies()
+    test_perform_screening_persists_timings()
+    test_streamed_screening_timings()
+    test_history_without_timings()
+    print("✅ Décomposition du temps de screening validée")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test du regroupement des appels concurrents (single-flight) dans cache_api_response
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import cache_api_response, cache_manager, get_cache_key, single_flight
+
+
+def _run_concurrently(fn, count):
+    results, errors = [], []
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_cold_calls_are_coalesced():
+    """10 appels simultanés sur un cache froid ne déclenchent qu'un seul calcul"""
+    executions = []
+
+    @cache_api_response
+    def single_flight_scrape(ticker):
+        executions.append(ticker)
+        time.sleep(0.3)
+        return {"ticker": ticker, "value": 42}
+
+    cache_manager.delete(get_cache_key("single_flight_scrape", "AAPL"))
+    before = single_flight.stats()["coalesced_local"]
+    try:
+        results, errors = _run_concurrently(lambda: single_flight_scrape("AAPL"), 10)
+    finally:
+        cache_manager.delete(get_cache_key("single_flight_scrape", "AAPL"))
+
+    assert not errors
+    assert executions == ["AAPL"]
+    assert results == [{"ticker": "AAPL", "value": 42}] * 10
+    assert single_flight.stats()["coalesced_local"] - before == 9
+    assert single_flight_scrape.__name__ == "single_flight_scrape"
+
+
+def test_errors_are_shared_and_not_cached():
+    """Une exception du calcul est transmise à tous les appelants en attente"""
+    executions = []
+
+    @cache_api_response
+    def single_flight_failure(ticker):
+        executions.append(ticker)
+        time.sleep(0.2)
+        raise RuntimeError("scraping impossible")
+
+    results, errors = _run_concurrently(lambda: single_flight_failure("FAIL"), 5)
+
+    assert results == []
+    assert len(errors) == 5 and all(isinstance(e, RuntimeError) for e in errors)
+    assert len(executions) == 1
+    assert single_flight.stats()["in_flight"] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_cold_calls_are_coalesced()
+    test_errors_are_shared_and_not_cached()
+    print("✅ Regroupement des appels concurrents validé")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test du mode stale-while-revalidate de CacheManager et cache_api_response
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import background_refresher, cache_api_response, cache_manager, get_cache_key
+
+
+def test_soft_and_hard_ttl():
+    """Entre les deux TTL la valeur est servie mais signalée périmée ; get() reste compatible"""
+    cache_manager.set("swr_test:fresh", {"v": 1}, ttl=60, stale_ttl=60)
+    cache_manager.set("swr_test:stale", {"v": 2}, ttl=0, stale_ttl=60)
+    try:
+        assert cache_manager.get_entry("swr_test:fresh") == ({"v": 1}, False)
+        assert cache_manager.get_entry("swr_test:stale") == ({"v": 2}, True)
+        assert cache_manager.get("swr_test:stale") == {"v": 2}
+    finally:
+        cache_manager.delete("swr_test:fresh")
+        cache_manager.delete("swr_test:stale")
+
+
+def test_stale_value_is_served_then_refreshed():
+    """Une entrée périmée est renvoyée sans attendre et rafraîchie en arrière-plan"""
+    calls = []
+
+    @cache_api_response(ttl=0, stale_ttl=60)
+    def swr_slow_fetch(ticker):
+        calls.append(ticker)
+        time.sleep(0.3)
+        return {"ticker": ticker, "version": len(calls)}
+
+    key = get_cache_key("swr_slow_fetch", "MSFT")
+    cache_manager.delete(key)
+    try:
+        assert swr_slow_fetch("MSFT") == {"ticker": "MSFT", "version": 1}
+
+        start = time.perf_counter()
+        stale = swr_slow_fetch("MSFT")
+        elapsed = time.perf_counter() - start
+        assert stale == {"ticker": "MSFT", "version": 1}
+        assert elapsed < 0.1
+
+        # Un second appel pendant le rafraîchissement ne relance pas de calcul
+        swr_slow_fetch("MSFT")
+        time.sleep(0.6)
+        assert calls == ["MSFT", "MSFT"]
+        assert cache_manager.get(key) == {"ticker": "MSFT", "version": 2}
+        assert background_refresher.stats()["refreshing"] == 0
+    finally:
+        cache_manager.delete(key)
+
+
+def test_failed_refresh_keeps_stale_value():
+    """Un rafraîchissement qui renvoie une erreur ne remplace pas la valeur périmée"""
+    calls = []
+
+    @cache_api_response(ttl=0, stale_ttl=60)
+    def swr_flaky_scrape(ticker):
+        calls.append(ticker)
+        if len(calls) > 1:
+            return {"success": False, "error": "scraping impossible"}
+        return {"success": True, "ticker": ticker}
+
+    key = get_cache_key("swr_flaky_scrape", "AAPL")
+    cache_manager.delete(key)
+    failures = background_refresher.stats()["refresh_failures"]
+    try:
+        assert swr_flaky_scrape("AAPL") == {"success": True, "ticker": "AAPL"}
+        assert swr_flaky_scrape("AAPL") == {"success": True, "ticker": "AAPL"}
+        time.sleep(0.3)
+        assert calls == ["AAPL", "AAPL"]
+        assert background_refresher.stats()["refresh_failures"] == failures + 1
+        assert cache_manager.get_entry(key) == ({"success": True, "ticker": "AAPL"}, True)
+        assert swr_flaky_scrape("AAPL") == {"success": True, "ticker": "AAPL"}
+    finally:
+        time.sleep(0.1)
+        cache_manager.delete(key)
+
+
+if __name__ == "__main__":
+    test_soft_and_hard_ttl()
+    test_stale_value_is_served_then_refreshed()
+    test_failed_refresh_keeps_stale_value()
+    print("✅ Stale-while-revalidate validé")
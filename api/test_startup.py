@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test du démarrage : selenium et stockdex ne doivent pas être chargés à l'import de l'API
+"""
+
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import startup
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_analysis_import_does_not_load_selenium():
+    """Importer analysis et fmp_analysis ne charge ni stockdex ni selenium (processus isolé)"""
+    code = (
+        "import sys, analysis, fmp_analysis\n"
+        "print('stockdex' in sys.modules, 'selenium' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=API_DIR, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "False False"
+
+
+def test_timed_import_records_first_import_only():
+    """Seul le premier import d'un module est chronométré"""
+    sys.modules.pop("colorsys", None)
+    startup._import_timings.pop("colorsys", None)
+    startup.timed_import("colorsys")
+    first = startup.get_report()["imports_seconds"]["colorsys"]
+    startup.timed_import("colorsys")
+    assert startup.get_report()["imports_seconds"]["colorsys"] == first
+
+
+def test_report_before_warmup():
+    """Le rapport expose l'état de selenium et le pool n'existe pas avant le chargement"""
+    report = startup.get_report()
+    assert "imports_seconds" in report
+    assert report["selenium"]["status"] in ("not_loaded", "loading", "loaded", "ready", "failed")
+    if "selenium_config" not in sys.modules:
+        assert startup.chrome_pool_stats() is None
+
+
+def test_warmup_disabled():
+    """SELENIUM_WARMUP=off ne lance aucun thread de préchauffage"""
+    previous = startup.SELENIUM_WARMUP
+    startup.SELENIUM_WARMUP = "off"
+    try:
+        assert startup.start_background_warmup() is None
+    finally:
+        startup.SELENIUM_WARMUP = previous
+
+
+if __name__ == "__main__":
+    test_analysis_import_does_not_load_selenium()
+    test_timed_import_records_first_import_only()
+    test_report_before_warmup()
+    test_warmup_disabled()
+    print("✅ Démarrage paresseux de selenium validé")
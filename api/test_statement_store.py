@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test du magasin local des états financiers : une DCF ne re-scrape pas tant qu'aucun nouvel exercice n'est probable
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fmp_analysis
+from database import DatabaseManager
+
+PERIODS = pd.to_datetime(["2021-12-31", "2022-12-31", "2023-12-31"])
+
+
+def _frames(last_period="2023-12-31"):
+    """États nettoyés tels que retournés par scrape_financial_statements"""
+    periods = PERIODS[:-1].append(pd.DatetimeIndex([last_period]))
+    is_df = pd.DataFrame({"Revenue": [100.0, 110.0, 120.0], "Ebitda": [30.0, 33.0, 36.0]}, index=periods)
+    is_df["Shares Outstanding"] = 1_000_000.0
+    bs_df = pd.DataFrame({"Cash": [10.0, 12.0, 15.0], "Total Long Term Debt": [50.0, 45.0, float("nan")]}, index=periods)
+    cf_df = pd.DataFrame({"CFO": [40.0, 44.0, 48.0], "CapEx": [10.0, 11.0, 12.0]}, index=periods)
+    cf_df["FCF"] = cf_df["CFO"] - cf_df["CapEx"]
+    return is_df, bs_df, cf_df
+
+
+class FakeScraper:
+    """Remplace scrape_financial_statements et compte les appels"""
+
+    def __init__(self, frames=None, error=None):
+        self.frames = frames
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, ticker_symbol, fetch_report=None):
+        self.calls += 1
+        if fetch_report is not None:
+            fetch_report["income_statement"] = {"seconds": 0.1, "error": None}  # rapport partiel avant l'échec
+        if self.error:
+            raise self.error
+        return self.frames
+
+
+def _with_store(scraper, test):
+    original_db, original_scrape = fmp_analysis.db_manager, fmp_analysis.scrape_financial_statements
+    fmp_analysis.db_manager = DatabaseManager(os.path.join(tempfile.mkdtemp(), "store.db"))
+    fmp_analysis.scrape_financial_statements = scraper
+    try:
+        test()
+    finally:
+        fmp_analysis.db_manager.pool.close_all()
+        fmp_analysis.db_manager = original_db
+        fmp_analysis.scrape_financial_statements = original_scrape
+
+
+def test_store_round_trip_and_no_rescrape():
+    """Le second appel lit le magasin et retourne les mêmes données que le scraping"""
+    scraper = FakeScraper(_frames())
+
+    def run():
+        is_df, cf_df, balance_sheet, latest_year = fmp_analysis.get_processed_financial_data("TEST")
+        stored_is_df, stored_cf_df, stored_balance_sheet, stored_year = fmp_analysis.get_processed_financial_data("TEST")
+        assert scraper.calls == 1
+        assert latest_year == stored_year == 2023
+        pd.testing.assert_frame_equal(is_df, stored_is_df, check_freq=False)
+        pd.testing.assert_frame_equal(cf_df, stored_cf_df, check_freq=False)
+        assert stored_balance_sheet["Cash"] == 15.0
+        assert pd.isna(stored_balance_sheet["Total Long Term Debt"]) == pd.isna(balance_sheet["Total Long Term Debt"])
+
+    _with_store(scraper, run)
+
+
+def test_new_fiscal_year_triggers_rescrape_with_fallback():
+    """Un exercice ancien déclenche un nouveau scraping ; en cas d'échec, les états stockés sont servis"""
+    def run():
+        fmp_analysis.store_financial_statements("OLD", _frames())
+        failing = FakeScraper(error=RuntimeError("Macrotrends indisponible"))
+        fmp_analysis.scrape_financial_statements = failing
+        fmp_analysis.STATEMENT_RECHECK_HOURS, recheck = 0, fmp_analysis.STATEMENT_RECHECK_HOURS
+        try:
+            _, _, _, latest_year = fmp_analysis.get_processed_financial_data("OLD")
+        finally:
+            fmp_analysis.STATEMENT_RECHECK_HOURS = recheck
+        assert failing.calls == 1
+        assert latest_year == 2023
+
+    _with_store(FakeScraper(), run)
+
+
+def test_reported_source_follows_fallback():
+    """Un nouveau scraping partiellement rapporté puis en échec est signalé comme lecture du magasin"""
+    def run():
+        fmp_analysis.store_financial_statements("OLD", _frames())
+        fmp_analysis.scrape_financial_statements = FakeScraper(error=RuntimeError("Macrotrends indisponible"))
+        fmp_analysis.STATEMENT_RECHECK_HOURS, recheck = 0, fmp_analysis.STATEMENT_RECHECK_HOURS
+        try:
+            source_report = {}
+            fmp_analysis.get_processed_financial_data("OLD", {}, source_report=source_report)
+            result = fmp_analysis.get_dcf_analysis.__wrapped__("OLD")
+        finally:
+            fmp_analysis.STATEMENT_RECHECK_HOURS = recheck
+        assert source_report == {"source": "store", "refresh_error": "Macrotrends indisponible"}
+        assert result["success"], result.get("error")
+        assert result["statement_fetch"] and result["statement_source"] == "store"
+        assert result["statement_refresh_error"] == "Macrotrends indisponible"
+
+        fmp_analysis.scrape_financial_statements = FakeScraper(_frames())
+        source_report = {}
+        fmp_analysis.get_processed_financial_data("NEW", source_report=source_report)
+        assert source_report == {"source": "scrape"}
+
+    _with_store(FakeScraper(), run)
+
+
+def test_new_fiscal_year_likely():
+    """Pas de nouvel exercice avant clôture + 1 an + délai de publication, ni juste après une vérification"""
+    period_end = datetime(2024, 12, 31)
+    assert not fmp_analysis.new_fiscal_year_likely(period_end, datetime(2025, 1, 10), now=datetime(2025, 6, 1))
+    assert fmp_analysis.new_fiscal_year_likely(period_end, datetime(2025, 1, 10), now=datetime(2026, 4, 15))
+    assert not fmp_analysis.new_fiscal_year_likely(period_end, datetime(2026, 4, 15, 1), now=datetime(2026, 4, 15, 6))
+
+
+if __name__ == "__main__":
+    test_store_round_trip_and_no_rescrape()
+    test_new_fiscal_year_triggers_rescrape_with_fallback()
+    test_reported_source_follows_fallback()
+    test_new_fiscal_year_likely()
+    print("✅ Magasin des états financiers validé")
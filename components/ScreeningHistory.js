@@ -191,6 +191,29 @@ const ScreeningHistory = () => {
               <p><strong>Results:</strong> {selectedScreening.total_results}</p>
               <p><strong>Execution Time:</strong> {selectedScreening.execution_time}s</p>
 
+              {selectedScreening.timings && (
+                <div>
+                  <h4>Stage Timings</h4>
+                  {selectedScreening.timings.symbol_resolution && (
+                    <p><strong>Symbol resolution:</strong> {selectedScreening.timings.symbol_resolution.seconds}s ({selectedScreening.timings.symbol_resolution.source})</p>
+                  )}
+                  {selectedScreening.timings.fetch && (
+                    <p>
+                      <strong>Data fetch:</strong> {selectedScreening.timings.fetch.seconds}s
+                      {selectedScreening.timings.fetch.cache_hit_ratio != null && ` — cache hits ${Math.round(selectedScreening.timings.fetch.cache_hit_ratio * 100)}%`}
+                      {selectedScreening.timings.fetch.latency && selectedScreening.timings.fetch.latency.count > 0 &&
+                        ` — p50 ${selectedScreening.timings.fetch.latency.p50}s, p90 ${selectedScreening.timings.fetch.latency.p90}s`}
+                    </p>
+                  )}
+                  {selectedScreening.timings.scoring && (
+                    <p><strong>Scoring:</strong> {selectedScreening.timings.scoring.seconds}s</p>
+                  )}
+                  {selectedScreening.timings.save && (
+                    <p><strong>Save:</strong> {selectedScreening.timings.save.seconds}s</p>
+                  )}
+                </div>
+              )}
+
               {selectedScreening.criteria && (
                 <div>
                   <h4>Criteria Used</h4>